@@ -0,0 +1,18 @@
+"""
+Churn model engines side by side: fit time, peak memory, ROC-AUC (common/engines.py).
+Run from project root: python scripts/benchmark_engines.py [engine ...]
+"""
+import sys
+
+from run_analysis import load_and_eda, clean_and_prepare, RANDOM_STATE
+from common.engines import ENGINES, benchmark, print_benchmark
+
+def main():
+    engines = sys.argv[1:] or list(ENGINES)
+    df, _ = load_and_eda()
+    X_train, X_test, _, _, y_train, y_test, _, _ = clean_and_prepare(df)
+    print(f"Train {len(y_train):,} rows x {X_train.shape[1]} features")
+    print_benchmark(benchmark(X_train, y_train, X_test, y_test, engines, RANDOM_STATE))
+
+if __name__ == '__main__':
+    main()
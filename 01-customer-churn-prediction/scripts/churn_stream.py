@@ -0,0 +1,241 @@
+"""
+Scalable churn mode: streamed columnar ingestion and out-of-core model fitting.
+Customers are read in Arrow record batches (Parquet or CSV) - only the model columns,
+never the whole file. Geography/Gender are encoded against a vocabulary learned once
+and frozen, so every chunk gets the same dummy columns (per-chunk get_dummies would not).
+StandardScaler and an SGD logistic regression are fitted incrementally with partial_fit;
+every HOLDOUT_EVERY-th customer is held out for evaluation.
+
+Run from project root:
+    python scripts/churn_stream.py fit --input data/raw/churn_10M.parquet [--epochs 2] [--cleaned-out out.parquet]
+    python scripts/churn_stream.py benchmark --rows 1000000 10000000 50000000
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from sklearn.preprocessing import StandardScaler
+from sklearn.linear_model import SGDClassifier
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.evaluation import ScoreEvaluation
+from common.engines import peak_rss_mb
+from generate_churn_data import generate
+
+NUMERIC = ['CreditScore', 'Age', 'Tenure', 'Balance', 'NumOfProducts', 'HasCrCard', 'IsActiveMember',
+           'EstimatedSalary']
+CATEGORICAL = ['Geography', 'Gender']
+TARGET = 'Exited'
+CHUNK_ROWS = 1_000_000
+HOLDOUT_EVERY = 5  # customers with RowNumber % 5 == 0 form the test set (20%)
+RANDOM_STATE = 42
+PARQUET_BUFFER_BYTES = 1 << 20
+SCORE_BINS = 10_000  # holdout scores are counted in 1e-4 bins
+
+def iter_batches(path, columns, chunk_rows=CHUNK_ROWS):
+    """Arrow record batches of the given columns from a Parquet or CSV file."""
+    if path.endswith('.parquet'):
+        # pre_buffer would read ahead many row groups; a plain buffered stream keeps memory per batch
+        parquet = pq.ParquetFile(path, pre_buffer=False, buffer_size=PARQUET_BUFFER_BYTES)
+        yield from parquet.iter_batches(batch_size=chunk_rows, columns=columns)
+        return
+    reader = pacsv.open_csv(path, read_options=pacsv.ReadOptions(block_size=64 << 20),
+                            convert_options=pacsv.ConvertOptions(include_columns=columns or []))
+    for batch in reader:
+        for offset in range(0, batch.num_rows, chunk_rows):
+            yield batch.slice(offset, chunk_rows)
+
+class Vocabulary:
+    """Frozen category list per column; encodes chunks to one-hot columns in a fixed layout."""
+
+    def __init__(self, categories):
+        self.categories = {col: list(values) for col, values in categories.items()}
+
+    @classmethod
+    def learn(cls, path, columns=CATEGORICAL, chunk_rows=CHUNK_ROWS):
+        """One pass over the categorical columns only; categories are sorted like get_dummies."""
+        seen = {col: set() for col in columns}
+        for batch in iter_batches(path, columns, chunk_rows):
+            for col in columns:
+                seen[col].update(v for v in pc.unique(batch.column(col)).to_pylist() if v is not None)
+        return cls({col: sorted(values) for col, values in seen.items()})
+
+    def codes(self, col, array):
+        """Index into categories[col] per row; -1 for values not in the vocabulary."""
+        encoded = pc.dictionary_encode(array)
+        if isinstance(encoded, pa.ChunkedArray):
+            encoded = encoded.combine_chunks()
+        lookup = {v: i for i, v in enumerate(self.categories[col])}
+        mapping = np.array([lookup.get(v, -1) for v in encoded.dictionary.to_pylist()] + [-1], dtype=np.int16)
+        indices = encoded.indices.to_numpy(zero_copy_only=False)
+        if encoded.null_count:
+            indices = np.where(encoded.is_null().to_numpy(zero_copy_only=False), len(mapping) - 1, indices)
+        return mapping[indices]
+
+    def feature_names(self, drop_first=True):
+        return [f'{col}_{v}' for col, values in self.categories.items() for v in values[int(drop_first):]]
+
+    def one_hot(self, batch, drop_first=True):
+        """float32 (rows, n_dummies) block; unknown categories encode as all zeros."""
+        blocks = []
+        for col, values in self.categories.items():
+            codes = self.codes(col, batch.column(col))
+            levels = np.arange(int(drop_first), len(values))
+            blocks.append((codes[:, None] == levels[None, :]).astype(np.float32))
+        return np.hstack(blocks)
+
+def encode(batch, vocab):
+    """Model matrix (numeric columns, then drop-first dummies) and target for one batch."""
+    numeric = np.column_stack([batch.column(c).to_numpy(zero_copy_only=False) for c in NUMERIC]).astype(np.float32)
+    X = np.hstack([numeric, vocab.one_hot(batch)])
+    y = batch.column(TARGET).to_numpy(zero_copy_only=False).astype(np.int8)
+    holdout = batch.column('RowNumber').to_numpy(zero_copy_only=False) % HOLDOUT_EVERY == 0
+    return X, y, holdout
+
+class StreamingChurnModel:
+    """Vocabulary + incremental StandardScaler (numeric columns) + SGD logistic regression."""
+
+    def __init__(self, vocab, alpha=1e-4, random_state=RANDOM_STATE):
+        self.vocab = vocab
+        self.scaler = StandardScaler()
+        self.model = SGDClassifier(loss='log_loss', alpha=alpha, random_state=random_state)
+        self.n_numeric = len(NUMERIC)
+
+    @property
+    def feature_names(self):
+        return NUMERIC + self.vocab.feature_names()
+
+    def transform(self, X):
+        X[:, :self.n_numeric] = self.scaler.transform(X[:, :self.n_numeric])  # dummies stay 0/1
+        return X
+
+    def fit_scaler(self, batches):
+        for X, y, holdout in batches:
+            self.scaler.partial_fit(X[~holdout, :self.n_numeric])
+
+    def fit_epoch(self, batches, rng):
+        for X, y, holdout in batches:
+            train = np.flatnonzero(~holdout)
+            rng.shuffle(train)  # SGD converges poorly on ordered data
+            self.model.partial_fit(self.transform(X[train]), y[train], classes=[0, 1])
+
+    def predict_proba(self, X):
+        return self.model.predict_proba(self.transform(X))[:, 1]
+
+def evaluate(model, batches):
+    """ScoreEvaluation of the holdout rows from per-bin label counts (memory independent of size).
+
+    Scores are rounded to 1/SCORE_BINS, so the curve has at most SCORE_BINS + 1 points.
+    """
+    counts = np.zeros((2, SCORE_BINS + 1), dtype=np.int64)
+    for X, y, holdout in batches:
+        bins = np.rint(model.predict_proba(X[holdout]) * SCORE_BINS).astype(np.int64)
+        counts += [np.bincount(bins[y[holdout] == label], minlength=SCORE_BINS + 1) for label in (0, 1)]
+    label, b = np.nonzero(counts)
+    return ScoreEvaluation(label, b / SCORE_BINS, sample_weight=counts[label, b])
+
+def fit_stream(path, epochs=1, chunk_rows=CHUNK_ROWS, cleaned_out=None, verbose=True):
+    """Learn vocabulary, scaler and SGD model in passes over path; returns (model, evaluation, timings).
+
+    timings maps phase -> seconds; every phase reads the full file once.
+    """
+    columns = ['RowNumber'] + NUMERIC + CATEGORICAL + [TARGET]
+
+    def batches():
+        for batch in iter_batches(path, columns, chunk_rows):
+            yield encode(batch, vocab)
+
+    timings = {}
+    t0 = time.perf_counter()
+    vocab = Vocabulary.learn(path, chunk_rows=chunk_rows)
+    timings['vocabulary'] = time.perf_counter() - t0
+    model = StreamingChurnModel(vocab)
+
+    t0 = time.perf_counter()
+    model.fit_scaler(batches())
+    timings['scaler'] = time.perf_counter() - t0
+
+    rng = np.random.default_rng(RANDOM_STATE)
+    for epoch in range(epochs):
+        t0 = time.perf_counter()
+        model.fit_epoch(batches(), rng)
+        timings[f'sgd epoch {epoch + 1}'] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    evaluation = evaluate(model, batches())
+    timings['evaluate'] = time.perf_counter() - t0
+
+    if cleaned_out:
+        t0 = time.perf_counter()
+        write_cleaned(path, vocab, cleaned_out, chunk_rows)
+        timings['cleaned output'] = time.perf_counter() - t0
+    if verbose:
+        print(f"Vocabulary: {vocab.categories}")
+        print(f"Holdout AUC: {evaluation.auc:.4f} on {evaluation.sample_weight.sum():,} customers")
+    return model, evaluation, timings
+
+def write_cleaned(path, vocab, out_path, chunk_rows=CHUNK_ROWS):
+    """Input rows plus full one-hot columns (e.g. Geography_France) as Parquet, batch by batch."""
+    names = vocab.feature_names(drop_first=False)
+    writer = None
+    try:
+        for batch in iter_batches(path, None, chunk_rows):
+            dummies = vocab.one_hot(batch, drop_first=False).astype(np.int8)
+            table = pa.Table.from_batches([batch])
+            for i, name in enumerate(names):
+                table = table.append_column(name, pa.array(dummies[:, i]))
+            writer = writer or pq.ParquetWriter(out_path + '.tmp', table.schema)
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(out_path + '.tmp', out_path)
+
+def benchmark(sizes, data_dir, epochs=1, chunk_rows=CHUNK_ROWS):
+    """Generate each size as Parquet (reused if present), fit, and print rows/s per phase."""
+    os.makedirs(data_dir, exist_ok=True)
+    print(f"{'rows':>12}{'generate r/s':>14}{'scaler r/s':>12}{'sgd r/s':>12}{'eval r/s':>12}"
+          f"{'total s':>10}{'peak RSS MB':>13}{'AUC':>8}")
+    for rows in sizes:
+        path = os.path.join(data_dir, f'churn_{rows}.parquet')
+        gen_rate = 'reused'
+        if not os.path.exists(path):
+            gen_rate = f"{rows / generate(path, rows, chunk_rows):,.0f}"
+        _, evaluation, timings = fit_stream(path, epochs, chunk_rows, verbose=False)
+        sgd = sum(v for k, v in timings.items() if k.startswith('sgd'))
+        print(f"{rows:>12,}{gen_rate:>14}{rows / timings['scaler']:>12,.0f}{rows * epochs / sgd:>12,.0f}"
+              f"{rows / timings['evaluate']:>12,.0f}{sum(timings.values()):>10.1f}{peak_rss_mb():>13.0f}"
+              f"{evaluation.auc:>8.4f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Scalable churn mode')
+    sub = parser.add_subparsers(dest='command', required=True)
+    fit = sub.add_parser('fit', help='fit and evaluate on a Parquet/CSV file')
+    fit.add_argument('--input', required=True)
+    fit.add_argument('--epochs', type=int, default=1)
+    fit.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    fit.add_argument('--cleaned-out', help='also write input + one-hot columns to this Parquet file')
+    bench = sub.add_parser('benchmark', help='rows/s at several synthetic sizes')
+    bench.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000, 50_000_000])
+    bench.add_argument('--data-dir', default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                                          'data', 'raw', 'synthetic'))
+    bench.add_argument('--epochs', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.command == 'benchmark':
+        benchmark(args.rows, args.data_dir, args.epochs)
+        return
+    _, evaluation, timings = fit_stream(args.input, args.epochs, args.chunk_rows, args.cleaned_out)
+    print(evaluation.report())
+    for phase, seconds in timings.items():
+        print(f"{phase:<16}{seconds:>8.1f}s")
+    print(f"Peak RSS: {peak_rss_mb():.0f} MB")
+
+if __name__ == '__main__':
+    main()
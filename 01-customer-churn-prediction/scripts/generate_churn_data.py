@@ -0,0 +1,82 @@
+"""
+Generate synthetic bank customers in the Churn_Modelling.csv layout, at any scale.
+Rows are produced and written in chunks, so memory does not grow with --rows.
+Run from project root: python scripts/generate_churn_data.py --rows 10000000 --out data/raw/churn_10M.parquet
+"""
+import os
+import time
+import argparse
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+CHUNK_ROWS = 1_000_000
+GEOGRAPHIES = ['France', 'Germany', 'Spain']
+SURNAMES = ['Smith', 'Chen', 'Rossi', 'Martin', 'Garcia', 'Muller', 'Novak', 'Okafor', 'Tanaka', 'Silva']
+
+def customer_chunk(start, n, rng):
+    """n customers with row numbers from start + 1, as an Arrow table."""
+    geo = rng.choice(3, n, p=[0.5, 0.25, 0.25]).astype(np.int8)
+    male = rng.random(n) < 0.55
+    age = np.clip(rng.normal(38.9, 10.5, n), 18, 92).astype(np.int16)
+    tenure = rng.integers(0, 11, n, dtype=np.int8)
+    balance = np.where(rng.random(n) < 0.36, 0.0, np.clip(rng.normal(119_800, 30_000, n), 0, None)).round(2)
+    products = (rng.choice(4, n, p=[0.508, 0.459, 0.027, 0.006]) + 1).astype(np.int8)
+    active = rng.random(n) < 0.515
+    # Churn drivers as in the Kaggle data: older, German, female, inactive, 3+ products
+    logit = (-1.1 + 0.07 * (age - 38.9) + 0.75 * (geo == 1) - 0.5 * male - 0.95 * active
+             + np.select([products == 2, products >= 3], [-1.3, 2.6], 0.0) + 0.25 * (balance > 0))
+    exited = rng.random(n) < 1 / (1 + np.exp(-logit))
+    return pa.table({
+        'RowNumber': np.arange(start + 1, start + n + 1, dtype=np.int64),
+        'CustomerId': 15_000_000 + np.arange(start, start + n, dtype=np.int64),
+        'Surname': pa.DictionaryArray.from_arrays(rng.integers(0, len(SURNAMES), n, dtype=np.int8), SURNAMES),
+        'CreditScore': np.clip(rng.normal(650, 96.7, n), 350, 850).astype(np.int16),
+        'Geography': pa.DictionaryArray.from_arrays(geo, GEOGRAPHIES),
+        'Gender': pa.DictionaryArray.from_arrays(male.astype(np.int8), ['Female', 'Male']),
+        'Age': age,
+        'Tenure': tenure,
+        'Balance': balance,
+        'NumOfProducts': products,
+        'HasCrCard': (rng.random(n) < 0.7).astype(np.int8),
+        'IsActiveMember': active.astype(np.int8),
+        'EstimatedSalary': rng.uniform(11.58, 199_992.48, n).round(2),
+        'Exited': exited.astype(np.int8),
+    })
+
+def generate(out_path, rows, chunk_rows=CHUNK_ROWS, seed=42):
+    """Write rows synthetic customers to out_path (.parquet or .csv); returns seconds taken."""
+    rng = np.random.default_rng(seed)
+    t0 = time.perf_counter()
+    tmp = out_path + '.tmp'
+    writer = None
+    try:
+        for start in range(0, rows, chunk_rows):
+            table = customer_chunk(start, min(chunk_rows, rows - start), rng)
+            if out_path.endswith('.parquet'):
+                writer = writer or pq.ParquetWriter(tmp, table.schema)
+            else:
+                table = table.cast(pa.schema([pa.field(f.name, pa.string()) if pa.types.is_dictionary(f.type) else f
+                                              for f in table.schema]))
+                writer = writer or pacsv.CSVWriter(tmp, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp, out_path)
+    return time.perf_counter() - t0
+
+def main():
+    parser = argparse.ArgumentParser(description='Synthetic churn customers')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--out', required=True, help='.parquet (columnar) or .csv')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    elapsed = generate(args.out, args.rows, seed=args.seed)
+    print(f"Generated {args.rows:,} rows in {elapsed:.1f}s ({args.rows / elapsed:,.0f} rows/s) -> {args.out}")
+
+if __name__ == '__main__':
+    main()
@@ -6,27 +6,30 @@ import os
 import sys
 import pandas as pd
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import seaborn as sns
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import (
-    confusion_matrix, classification_report,
-    roc_auc_score, roc_curve, precision_recall_fscore_support
-)
+from sklearn.metrics import confusion_matrix
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.evaluation import Evaluator
+from common.engines import ENGINE_LABELS, feature_importance, make_model, n_iterations
+from common.search import search
+from common.render import Chart, plot_confusion_matrix, plot_feature_importance, render
 
 RANDOM_STATE = 42
 np.random.seed(RANDOM_STATE)
 
+# Tree model engine (common/engines.py): random_forest or hist_gb
+ENGINE = os.environ.get('CHURN_ENGINE', 'random_forest')
+# Hyperparameter search before the final fit: unset, 'halving' or 'hyperband' (common/search.py)
+TUNE = os.environ.get('CHURN_TUNE')
+
 # Paths (run from 01-customer-churn-prediction/)
 BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 RAW = os.path.join(BASE, 'data', 'raw', 'Churn_Modelling.csv')
 PROCESSED = os.path.join(BASE, 'data', 'processed', 'churn_cleaned.csv')
 VIZ = os.path.join(BASE, 'visualizations')
+SEARCH_DIR = os.path.join(BASE, 'data', 'processed', 'search')
 os.makedirs(VIZ, exist_ok=True)
 os.makedirs(os.path.join(BASE, 'data', 'processed'), exist_ok=True)
 
@@ -59,49 +62,53 @@ def clean_and_prepare(df):
     out.to_csv(PROCESSED, index=False)
     return X_train, X_test, X_train_sc, X_test_sc, y_train, y_test, X.columns.tolist(), scaler
 
-def train_and_evaluate(X_train_sc, X_test_sc, y_train, y_test, feature_names):
+def train_and_evaluate(X_train_sc, X_test_sc, y_train, y_test, feature_names, X_train=None, X_test=None,
+                       engine=ENGINE, tune=TUNE):
+    """Logistic Regression on scaled features plus the tree engine on raw features (X_train/X_test)."""
+    evaluator = Evaluator(X_test_sc, y_test)
+
     # Logistic Regression
-    lr = LogisticRegression(max_iter=1000, random_state=RANDOM_STATE)
+    lr = make_model('logistic', RANDOM_STATE)
     lr.fit(X_train_sc, y_train)
-    y_pred_lr = lr.predict(X_test_sc)
-    auc_lr = roc_auc_score(y_test, lr.predict_proba(X_test_sc)[:, 1])
+    ev_lr = evaluator.evaluate('lr', lr)
     print("\n--- Logistic Regression ---")
-    print(classification_report(y_test, y_pred_lr))
-    print("AUC:", round(auc_lr, 4))
-
-    # Random Forest
-    rf = RandomForestClassifier(n_estimators=100, random_state=RANDOM_STATE)
-    rf.fit(X_train_sc, y_train)  # RF doesn't need scaling but we use same split
-    y_pred_rf = rf.predict(X_test_sc)
-    auc_rf = roc_auc_score(y_test, rf.predict_proba(X_test_sc)[:, 1])
-    print("\n--- Random Forest ---")
-    print(classification_report(y_test, y_pred_rf))
-    print("AUC:", round(auc_rf, 4))
+    print(ev_lr.report())
+    print("AUC:", round(ev_lr.auc, 4))
 
-    # Feature importance
-    imp = pd.Series(rf.feature_importances_, index=feature_names).sort_values(ascending=False)
-    fig, ax = plt.subplots(figsize=(8, 5))
-    imp.plot(kind='barh', ax=ax)
-    ax.set_title('Feature Importance (Random Forest)')
-    plt.tight_layout()
-    plt.savefig(os.path.join(VIZ, 'feature_importance.png'), dpi=100)
-    plt.close()
+    # Tree engine (all cores); trees don't need scaling, so use raw features when given
+    if X_train is None:
+        X_train, X_test = X_train_sc, X_test_sc
+    X_train = np.asarray(X_train, dtype=np.float32)
+    X_test = np.asarray(X_test, dtype=np.float32)
+    params = {}
+    if tune:
+        print(f"\n--- Tuning {engine} ({tune}) ---")
+        params, _ = search(engine, X_train, y_train, os.path.join(SEARCH_DIR, engine), method=tune,
+                           random_state=RANDOM_STATE)
+        print("Best params:", params)
+    model = make_model(engine, RANDOM_STATE, n_jobs=-1, **params)
+    model.fit(X_train, y_train)
+    ev_model = evaluator.evaluate(engine, model, X_test)
+    y_pred_model = ev_model.predict()
+    label = ENGINE_LABELS[engine]
+    print(f"\n--- {label} ({n_iterations(model)} iterations) ---")
+    print(ev_model.report())
+    print("AUC:", round(ev_model.auc, 4))
 
-    # Confusion matrix RF
-    cm = confusion_matrix(y_test, y_pred_rf)
-    fig, ax = plt.subplots(figsize=(5, 4))
-    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', ax=ax)
-    ax.set_xlabel('Predicted')
-    ax.set_ylabel('Actual')
-    ax.set_title('Confusion Matrix (Random Forest)')
-    plt.tight_layout()
-    plt.savefig(os.path.join(VIZ, 'confusion_matrix.png'), dpi=100)
-    plt.close()
+    # Feature importance and confusion matrix (tree engine), rendered unless unchanged
+    imp = feature_importance(model, feature_names, X_test, y_test, RANDOM_STATE)
+    cm = confusion_matrix(y_test, y_pred_model)
+    render([
+        Chart(os.path.join(VIZ, 'feature_importance.png'), plot_feature_importance,
+              {'imp': imp, 'title': f'Feature Importance ({label})'}),
+        Chart(os.path.join(VIZ, 'confusion_matrix.png'), plot_confusion_matrix,
+              {'cm': cm, 'title': f'Confusion Matrix ({label})', 'figsize': (5, 4)}),
+    ])
 
     return {
-        'auc_lr': auc_lr, 'auc_rf': auc_rf,
-        'classification_report_lr': classification_report(y_test, y_pred_lr),
-        'classification_report_rf': classification_report(y_test, y_pred_rf),
+        'auc_lr': ev_lr.auc, 'auc_rf': ev_model.auc,
+        'classification_report_lr': ev_lr.report(),
+        'classification_report_rf': ev_model.report(),
         'feature_importance': imp,
         'confusion_matrix': cm,
     }
@@ -112,7 +119,7 @@ def main():
     print("Cleaning and train/test split...")
     X_train, X_test, X_train_sc, X_test_sc, y_train, y_test, feat_names, _ = clean_and_prepare(df)
     print("Training and evaluating...")
-    results = train_and_evaluate(X_train_sc, X_test_sc, y_train, y_test, feat_names)
+    results = train_and_evaluate(X_train_sc, X_test_sc, y_train, y_test, feat_names, X_train, X_test)
     print("\nDone. Processed data:", PROCESSED)
     print("Visualizations:", VIZ)
     return df, churn_rate, results
@@ -0,0 +1,49 @@
+"""
+Run the segment queries in sql/queries.sql against an embedded SQLite database.
+bank_churn is loaded from the raw CSV (schema and indexes from sql/database_schema.sql) only
+when the CSV changes; query results are cached until the table is reloaded.
+
+Run from project root:
+    python scripts/run_queries.py                   # all queries
+    python scripts/run_queries.py geography tenure  # queries whose name contains a word
+    python scripts/run_queries.py --csv data/raw/churn_10M.csv
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.sql_runner import QueryRunner
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW = os.path.join(BASE, 'data', 'raw', 'Churn_Modelling.csv')
+DB = os.path.join(BASE, 'data', 'processed', 'churn.sqlite')
+SQL = os.path.join(BASE, 'sql')
+
+def main():
+    parser = argparse.ArgumentParser(description='Churn segment queries (SQLite)')
+    parser.add_argument('names', nargs='*', help='run only queries whose name contains one of these')
+    parser.add_argument('--csv', default=RAW, help='bank_churn source CSV')
+    parser.add_argument('--db', default=DB)
+    parser.add_argument('--reload', action='store_true', help='reload the table even if the CSV is unchanged')
+    parser.add_argument('--list', action='store_true', help='list query names and exit')
+    args = parser.parse_args()
+
+    runner = QueryRunner(args.db, {'bank_churn': args.csv}, os.path.join(SQL, 'queries.sql'),
+                         os.path.join(SQL, 'database_schema.sql'))
+    if args.list:
+        print('\n'.join(runner.queries))
+        return
+    t0 = time.perf_counter()
+    loaded = runner.load(force=args.reload)
+    for table, rows in loaded.items():
+        print(f"Loaded {table}: {rows:,} rows in {(time.perf_counter() - t0) * 1000:.0f} ms")
+    if not loaded:
+        print(f"bank_churn unchanged since last load (version {runner.table_version('bank_churn')})")
+    names = [n for n in runner.queries if not args.names or any(w.lower() in n.lower() for w in args.names)]
+    runner.run_all(names)
+    runner.close()
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,6 @@
--- Optional: Table definitions for Bank Customer Churn dataset
--- Adapt to your actual DB (e.g. SQLite, PostgreSQL). Column names from Kaggle.
+-- Table definitions for Bank Customer Churn dataset
+-- Used by scripts/run_queries.py (SQLite); portable to PostgreSQL. Column names from Kaggle.
 
-/*
 CREATE TABLE bank_churn (
     RowNumber      INT,
     CustomerId     INT,
@@ -23,4 +22,3 @@ CREATE TABLE bank_churn (
 CREATE INDEX idx_churn_geography ON bank_churn(Geography);
 CREATE INDEX idx_churn_exited ON bank_churn(Exited);
 CREATE INDEX idx_churn_tenure ON bank_churn(Tenure);
-*/
@@ -0,0 +1,126 @@
+"""
+Out-of-core batch scoring of a credit-risk model artifact into Parquet.
+Feature rows are read in blocks (from a DataFrame, or streamed from a Parquet/CSV file),
+scored on a thread pool (tree prediction releases the GIL) and appended to the output
+file in input order, one row group per block. At most 2 x n_jobs blocks are held at
+once, so memory is bounded by chunk size, not population size.
+
+    python scripts/batch_scoring.py --input features.parquet --output scores.parquet [--version V]
+"""
+import os
+import sys
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from risk_scoring import RISK_TIER_LABELS, load_artifact, risk_tier_codes
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.engines import peak_rss_mb
+
+CHUNK_ROWS = 50_000
+
+def iter_blocks(source, chunk_rows=CHUNK_ROWS):
+    """DataFrame blocks of a DataFrame, or of a Parquet/CSV file read incrementally."""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunk_rows):
+            yield source.iloc[start:start + chunk_rows]
+    elif str(source).endswith(".parquet"):
+        # pre_buffer would read ahead many row groups; a plain buffered stream keeps memory per block
+        for batch in pq.ParquetFile(source, pre_buffer=False, buffer_size=1 << 20).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, chunksize=chunk_rows)
+
+def score_block(model, block, extra=None):
+    """Arrow table of the block's features plus default_prob (float32) and risk_tier (dictionary)."""
+    prob = model.predict_proba(model.matrix(block))
+    table = pa.Table.from_pandas(block, preserve_index=False)
+    for name, values in (extra or {}).items():
+        table = table.append_column(name, pa.array(values))
+    tiers = pa.DictionaryArray.from_arrays(pa.array(risk_tier_codes(prob)), pa.array(RISK_TIER_LABELS))
+    table = table.append_column("default_prob", pa.array(prob.astype(np.float32)))
+    return table.append_column("risk_tier", tiers)
+
+def empty_scores(source, extra_columns=None):
+    """Zero-row table with the columns and types score_block produces for source."""
+    if isinstance(source, pd.DataFrame):
+        head = source.iloc[:0]
+    elif str(source).endswith(".parquet"):
+        head = pq.read_schema(source).empty_table().to_pandas()
+    else:
+        head = pd.read_csv(source, nrows=0)
+    table = pa.Table.from_pandas(head, preserve_index=False)
+    for name, values in (extra_columns or {}).items():
+        table = table.append_column(name, pa.array(values[:0]))
+    tiers = pa.DictionaryArray.from_arrays(pa.array([], pa.int8()), pa.array(RISK_TIER_LABELS))
+    table = table.append_column("default_prob", pa.array([], pa.float32()))
+    return table.append_column("risk_tier", tiers)
+
+def score_to_parquet(model, source, out_path, chunk_rows=CHUNK_ROWS, n_jobs=None, extra_columns=None):
+    """Score every row of source into out_path; returns the number of rows written.
+
+    extra_columns maps column name -> array aligned with a DataFrame source (e.g. the target).
+    An empty source still yields a (zero-row) file with the output schema; on failure no
+    partial file is left behind.
+    """
+    n_jobs = n_jobs or os.cpu_count()
+    tmp = out_path + ".tmp"
+    writer = None
+    rows = 0
+    start = 0
+    pending = deque()
+    done = False
+
+    def drain(limit):
+        nonlocal writer, rows
+        while len(pending) > limit:
+            table = pending.popleft().result()
+            if writer is None:
+                writer = pq.ParquetWriter(tmp, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            rows += table.num_rows
+
+    try:
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            for block in iter_blocks(source, chunk_rows):
+                extra = {k: v[start:start + len(block)] for k, v in (extra_columns or {}).items()}
+                start += len(block)
+                pending.append(pool.submit(score_block, model, block, extra))
+                drain(2 * n_jobs)
+            drain(0)
+        if writer is None:
+            pq.write_table(empty_scores(source, extra_columns), tmp)
+        done = True
+    finally:
+        if writer is not None:
+            writer.close()
+        if not done and os.path.exists(tmp):
+            os.remove(tmp)
+    os.replace(tmp, out_path)
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunked batch scoring to Parquet")
+    parser.add_argument("--input", required=True, help="Parquet or CSV file with the model's feature columns")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--version", help="artifact version (default: LATEST)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--n-jobs", type=int)
+    args = parser.parse_args()
+
+    model = load_artifact(args.version)
+    t0 = time.perf_counter()
+    rows = score_to_parquet(model, args.input, args.output, args.chunk_rows, args.n_jobs)
+    elapsed = time.perf_counter() - t0
+    print(f"Scored {rows:,} rows with {model.version} in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s), "
+          f"peak RSS {peak_rss_mb():.0f} MB -> {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""
+Credit-risk model engines side by side: fit time, peak memory, ROC-AUC (common/engines.py).
+Engines train on the raw (unresampled) split; --class-weight balanced weights defaults up.
+Run from project root: python scripts/benchmark_engines.py [--engines hist_gb random_forest]
+"""
+import argparse
+
+from sklearn.model_selection import train_test_split
+
+from run_analysis import load_data, RANDOM_STATE
+from common.engines import ENGINES, benchmark, print_benchmark
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare model engines")
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument("--class-weight", choices=["balanced"])
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    args = parser.parse_args()
+
+    X, y, _ = load_data()
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, stratify=y, random_state=RANDOM_STATE)
+    print(f"Train {len(y_train):,} rows x {X.shape[1]} features, defaults {y_train.mean():.2%}")
+    print_benchmark(benchmark(X_train, y_train, X_test, y_test, args.engines, RANDOM_STATE, args.n_jobs,
+                             args.class_weight))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+On-disk Parquet cache for Home Credit aggregates and the final feature matrix.
+Entries are keyed by source file fingerprints (size, mtime, sampled content hash)
+plus a version of the code that produced them (the source of the functions and modules
+involved), so stale entries are never read.
+"""
+import os
+import glob
+import json
+import hashlib
+import inspect
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # cache is optional; without pyarrow everything is recomputed
+    pa = pq = None
+
+CACHE_FORMAT_VERSION = 1
+HASH_BLOCK = 1 << 20  # bytes hashed from the head and tail of each source file
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def default_cache_dir():
+    """Cache location: 1) HOME_CREDIT_CACHE env, 2) data/processed/home_credit_cache/."""
+    if os.environ.get("HOME_CREDIT_CACHE"):
+        return os.environ["HOME_CREDIT_CACHE"]
+    return os.path.join(BASE, "data", "processed", "home_credit_cache")
+
+def file_fingerprint(fp):
+    """Size, mtime and a hash of the first/last HASH_BLOCK bytes of a file."""
+    st = os.stat(fp)
+    h = hashlib.sha1()
+    with open(fp, "rb") as f:
+        h.update(f.read(HASH_BLOCK))
+        if st.st_size > 2 * HASH_BLOCK:
+            f.seek(-HASH_BLOCK, os.SEEK_END)
+            h.update(f.read(HASH_BLOCK))
+    return {"file": os.path.basename(fp), "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": h.hexdigest()}
+
+def code_version(*fns, extra=None):
+    """Hash of the source code of the functions (or whole modules) that build a cached frame."""
+    h = hashlib.sha1(str(extra).encode())
+    for fn in fns:
+        h.update(inspect.getsource(fn).encode())
+    return h.hexdigest()
+
+def cache_key(name, source_files, version):
+    """Stable key for a cache entry from its sources and code version."""
+    payload = {
+        "format": CACHE_FORMAT_VERSION,
+        "name": name,
+        "version": version,
+        "sources": [file_fingerprint(fp) for fp in source_files],
+    }
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+def _entry_path(name, source_files, version, cache_dir):
+    key = cache_key(name, source_files, version)
+    return os.path.join(cache_dir, f"{name}-{key[:16]}.parquet"), key
+
+def is_cached(name, source_files, version, cache_dir=None):
+    """True when cached_frame() would load this entry instead of computing it."""
+    if cache_dir is None or pq is None or not all(os.path.exists(fp) for fp in source_files):
+        return False
+    return os.path.exists(_entry_path(name, source_files, version, cache_dir)[0])
+
+def cached_frame(name, source_files, version, compute, cache_dir=None):
+    """Return compute() through the cache; recompute on any source or code change.
+
+    cache_dir=None disables caching. Missing sources bypass the cache so that
+    compute() can report them (the aggregators return None in that case).
+    """
+    if cache_dir is None or pq is None or not all(os.path.exists(fp) for fp in source_files):
+        return compute()
+    entry, key = _entry_path(name, source_files, version, cache_dir)
+    if os.path.exists(entry):
+        return pq.read_table(entry).to_pandas()
+
+    df = compute()
+    if df is None:
+        return None
+    os.makedirs(cache_dir, exist_ok=True)
+    for old in glob.glob(os.path.join(cache_dir, f"{name}-*.parquet")):
+        os.remove(old)
+    table = pa.Table.from_pandas(df)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"cache_key": key.encode()})
+    tmp = entry + ".tmp"
+    pq.write_table(table, tmp)
+    os.replace(tmp, entry)
+    return df
+
+def clear_cache(cache_dir=None):
+    """Remove all cached entries."""
+    cache_dir = cache_dir or default_cache_dir()
+    for fp in glob.glob(os.path.join(cache_dir, "*.parquet")):
+        os.remove(fp)
@@ -0,0 +1,110 @@
+"""
+Schema registry for the Home Credit CSVs.
+Declares, per table, the columns the pipeline actually consumes and compact dtypes
+for them (int32 IDs, float32 amounts, categoricals for status strings).
+Run directly for a before/after memory report: python scripts/home_credit_schema.py [nrows]
+"""
+import os
+import sys
+import time
+import json
+import hashlib
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    PARSER_ENGINE = "pyarrow"
+except ImportError:
+    PARSER_ENGINE = "c"
+
+# Columns with nulls in the raw data are float32; int dtypes only where the column is always populated
+SCHEMAS = {
+    "application_train": {
+        "SK_ID_CURR": "int32", "TARGET": "int8",
+        "DAYS_BIRTH": "int32", "DAYS_EMPLOYED": "float32",
+        "AMT_INCOME_TOTAL": "float32", "AMT_CREDIT": "float32", "AMT_ANNUITY": "float32", "AMT_GOODS_PRICE": "float32",
+        "CNT_CHILDREN": "int8", "CNT_FAM_MEMBERS": "float32",
+        "EXT_SOURCE_1": "float32", "EXT_SOURCE_2": "float32", "EXT_SOURCE_3": "float32",
+        "REGION_POPULATION_RELATIVE": "float32", "REGION_RATING_CLIENT": "int8",
+        "AMT_REQ_CREDIT_BUREAU_YEAR": "float32", "DAYS_LAST_PHONE_CHANGE": "float32",
+        "OBS_30_CNT_SOCIAL_CIRCLE": "float32", "DEF_30_CNT_SOCIAL_CIRCLE": "float32",
+        "OBS_60_CNT_SOCIAL_CIRCLE": "float32", "DEF_60_CNT_SOCIAL_CIRCLE": "float32",
+    },
+    "bureau": {
+        "SK_ID_CURR": "int32", "SK_ID_BUREAU": "int32",
+        "AMT_CREDIT_SUM": "float32", "AMT_CREDIT_SUM_DEBT": "float32", "AMT_CREDIT_SUM_OVERDUE": "float32",
+        "CNT_CREDIT_PROLONG": "int16",
+    },
+    "bureau_balance": {
+        "SK_ID_BUREAU": "int32", "STATUS": "category",
+    },
+    "previous_application": {
+        "SK_ID_PREV": "int32", "SK_ID_CURR": "int32",
+        "NAME_CONTRACT_STATUS": "category", "AMT_CREDIT": "float32",
+    },
+    "installments_payments": {
+        "SK_ID_CURR": "int32",
+        "AMT_INSTALMENT": "float32", "AMT_PAYMENT": "float32",
+        "DAYS_INSTALMENT": "float32", "DAYS_ENTRY_PAYMENT": "float32",
+    },
+    "credit_card_balance": {
+        "SK_ID_CURR": "int32", "AMT_BALANCE": "float32", "AMT_CREDIT_LIMIT_ACTUAL": "float32", "SK_DPD_DEF": "int16",
+    },
+    "POS_CASH_balance": {
+        "SK_ID_CURR": "int32", "SK_DPD": "int16", "SK_DPD_DEF": "int16",
+    },
+}
+
+# Part of the feature cache key: changing a dtype invalidates cached aggregates
+SCHEMA_VERSION = hashlib.sha1(json.dumps(SCHEMAS, sort_keys=True).encode()).hexdigest()
+
+def read_table(path, table, columns=None, chunksize=None):
+    """Read a Home Credit table with its registered columns and dtypes.
+
+    columns restricts the read to a subset of the registered columns. Chunked reads
+    use the C parser (the pyarrow engine does not stream); everything else uses pyarrow.
+    """
+    schema = SCHEMAS[table]
+    columns = list(columns or schema)
+    dtype = {c: schema[c] for c in columns}
+    fp = os.path.join(path, f"{table}.csv")
+    if chunksize:
+        return pd.read_csv(fp, usecols=columns, dtype=dtype, chunksize=chunksize)
+    return pd.read_csv(fp, usecols=columns, dtype=dtype, engine=PARSER_ENGINE)
+
+def memory_report(path, nrows=None):
+    """Bytes and load time per table: unpruned default read vs schema read."""
+    rows = []
+    for table in SCHEMAS:
+        fp = os.path.join(path, f"{table}.csv")
+        if not os.path.exists(fp):
+            continue
+        t0 = time.perf_counter()
+        before = pd.read_csv(fp, nrows=nrows)
+        t1 = time.perf_counter()
+        schema = SCHEMAS[table]
+        if nrows:
+            after = pd.read_csv(fp, nrows=nrows, usecols=list(schema), dtype=schema)
+        else:
+            after = read_table(path, table)
+        t2 = time.perf_counter()
+        rows.append({
+            "table": table,
+            "rows": len(after),
+            "bytes_before": int(before.memory_usage(deep=True).sum()),
+            "bytes_after": int(after.memory_usage(deep=True).sum()),
+            "load_s_before": round(t1 - t0, 2),
+            "load_s_after": round(t2 - t1, 2),
+        })
+        del before, after
+    report = pd.DataFrame(rows)
+    if not report.empty:
+        report["reduction"] = (report["bytes_before"] / report["bytes_after"]).round(1)
+    return report
+
+if __name__ == "__main__":
+    from load_home_credit import get_data_path
+    nrows = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    path = get_data_path()
+    print("Data path:", path, "| rows per table:", nrows or "all")
+    print(memory_report(path, nrows).to_string(index=False))
@@ -0,0 +1,139 @@
+"""
+Incremental (append-only) refresh of streamed Home Credit aggregates.
+The additive state of a StreamingAggregator (counts, sums, maxima per ID) is persisted
+together with a high-water mark: the byte offset of the last CSV row already folded in.
+A refresh reads only the bytes appended since then. If the file was rewritten (header,
+head/tail hash of the folded prefix or size no longer match) or the aggregation code changed, the state is
+rebuilt from scratch, so results always equal a full recompute.
+A final row without a trailing newline may still be being written, so it is left for the next
+refresh; if the file size is unchanged by then, the row is taken as complete and folded in. From
+that second refresh on, the state matches a full recompute (which always reads that row).
+"""
+import io
+import os
+import csv
+import json
+import hashlib
+import pandas as pd
+
+from home_credit_schema import SCHEMAS
+from streaming_agg import StreamingAggregator
+
+PREFIX_HASH_BYTES = 1 << 16  # bytes at the head of the file and before the high-water mark, hashed to detect rewrites
+
+class _RangeReader(io.RawIOBase):
+    """Read-only view of bytes [start, end) of a file."""
+
+    def __init__(self, fp, start, end):
+        self._f = open(fp, "rb")
+        self._f.seek(start)
+        self._left = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = self._f.readinto(memoryview(b)[:max(0, min(len(b), self._left))])
+        self._left -= n
+        return n
+
+    def close(self):
+        self._f.close()
+        super().close()
+
+def _header(fp):
+    with open(fp, newline="") as f:
+        line = f.readline()
+    return next(csv.reader([line])), len(line.encode())
+
+def _complete_end(fp):
+    """Offset just past the last newline: a partially written final row is left for next time."""
+    size = os.path.getsize(fp)
+    with open(fp, "rb") as f:
+        pos = size
+        while pos > 0:
+            step = min(1 << 16, pos)
+            f.seek(pos - step)
+            block = f.read(step)
+            i = block.rfind(b"\n")
+            if i >= 0:
+                return pos - step + i + 1
+            pos -= step
+    return 0
+
+def _prefix_hash(fp, offset):
+    """Hash of the first and last PREFIX_HASH_BYTES of the already-folded bytes [0, offset)."""
+    h = hashlib.sha1()
+    with open(fp, "rb") as f:
+        h.update(f.read(min(offset, PREFIX_HASH_BYTES)))
+        f.seek(max(0, offset - PREFIX_HASH_BYTES))
+        h.update(f.read(min(offset, PREFIX_HASH_BYTES)))
+    return h.hexdigest()
+
+def read_appended(path, table, start, end, chunksize):
+    """Yield chunks of schema-typed rows stored between byte offsets start and end."""
+    fp = os.path.join(path, f"{table}.csv")
+    names, _ = _header(fp)
+    schema = SCHEMAS[table]
+    with io.BufferedReader(_RangeReader(fp, start, end)) as stream:
+        yield from pd.read_csv(stream, header=None, names=names, usecols=list(schema), dtype=schema,
+                               chunksize=chunksize)
+
+def _load_state(state_dir, key, reducers, version, fp):
+    """Persisted (aggregator, high-water mark, file size at that refresh) if still valid for fp, else None."""
+    meta_fp = os.path.join(state_dir, "meta.json")
+    if not os.path.exists(meta_fp):
+        return None
+    with open(meta_fp) as f:
+        meta = json.load(f)
+    hwm = meta["offset"]
+    state_fp = os.path.join(state_dir, meta["state_file"])
+    if (meta["version"] != version or meta["header"] != _header(fp)[0] or not os.path.exists(state_fp)
+            or os.path.getsize(fp) < hwm or meta["prefix_sha1"] != _prefix_hash(fp, hwm)):
+        return None
+    return StreamingAggregator.load(state_fp, key, reducers), hwm, meta.get("size")
+
+def _save_state(state_dir, agg, version, fp, offset, size):
+    """Write state under a new name, then switch meta.json to it (a crash never mixes the two)."""
+    os.makedirs(state_dir, exist_ok=True)
+    state_file = f"state-{offset}.npz"
+    agg.save(os.path.join(state_dir, state_file))
+    meta = {
+        "version": version,
+        "header": _header(fp)[0],
+        "offset": offset,
+        "rows": agg.rows,
+        "size": size,
+        "prefix_sha1": _prefix_hash(fp, offset),
+        "state_file": state_file,
+    }
+    meta_fp = os.path.join(state_dir, "meta.json")
+    with open(meta_fp + ".tmp", "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(meta_fp + ".tmp", meta_fp)
+    for name in os.listdir(state_dir):
+        if name.startswith("state-") and name != state_file:
+            os.remove(os.path.join(state_dir, name))
+
+def refresh_aggregator(path, table, state_dir, key, reducers, fold, version, chunksize):
+    """Fold rows appended to table since the last refresh into its persisted state.
+
+    fold(aggregator, chunks) must be the same function the full recompute uses.
+    Returns the up-to-date StreamingAggregator.
+    """
+    fp = os.path.join(path, f"{table}.csv")
+    size = os.path.getsize(fp)
+    loaded = _load_state(state_dir, key, reducers, version, fp)
+    if loaded is None:
+        agg, start, last_size = StreamingAggregator(key, reducers), _header(fp)[1], None
+    else:
+        agg, start, last_size = loaded
+    end = _complete_end(fp)
+    if end < size and size == last_size:
+        end = size  # unterminated final row, unchanged since the last refresh: complete
+    if end > start:
+        fold(agg, read_appended(path, table, start, end, chunksize))
+        _save_state(state_dir, agg, version, fp, end, size)
+    elif loaded is None or size != last_size:
+        _save_state(state_dir, agg, version, fp, start, size)  # remember the size for the rule above
+    return agg
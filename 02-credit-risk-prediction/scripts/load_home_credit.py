@@ -3,8 +3,35 @@ Load and prepare Home Credit Default Risk dataset.
 Combines application_train with bureau and previous_application aggregates.
 """
 import os
+import sys
 import pandas as pd
 import numpy as np
+from feature_cache import cached_frame, code_version, default_cache_dir, is_cached
+from home_credit_schema import read_table, SCHEMAS, SCHEMA_VERSION
+from streaming_agg import StreamingAggregator, chunk_rows, stream_aggregate
+import home_credit_schema
+import incremental_agg
+import streaming_agg
+
+# Bump when aggregation semantics change in a way the source hash cannot see
+AGG_VERSION = 1
+
+# Working-memory budget per streamed chunk (bureau_balance, installments_payments)
+CHUNK_MEMORY_MB = 256
+
+# bureau_balance STATUS -> days-past-due bucket (C = closed, X = unknown)
+STATUS_DPD = {"C": -1, "X": -1, "0": 0, "1": 1, "2": 2, "3": 3, "4": 4, "5": 5}
+
+# Raw files read by each stage (drives cache invalidation)
+SOURCES = {
+    "application": ["application_train.csv"],
+    "bureau": ["bureau.csv"],
+    "previous_app": ["previous_application.csv"],
+    "bureau_balance": ["bureau_balance.csv", "bureau.csv"],
+    "installments": ["installments_payments.csv"],
+    "credit_card": ["credit_card_balance.csv"],
+    "pos_cash": ["POS_CASH_balance.csv"],
+}
 
 # Path resolution: 1) HOME_CREDIT_PATH env, 2) data/raw/home-credit/, 3) default
 def get_data_path():
@@ -21,7 +48,7 @@ def load_application(path):
     fp = os.path.join(path, "application_train.csv")
     if not os.path.exists(fp):
         return None
-    df = pd.read_csv(fp)
+    df = read_table(path, "application_train")
     # Convert DAYS_BIRTH to age (negative days from application)
     df["AGE"] = (-df["DAYS_BIRTH"] / 365.25).astype(int)
     # DAYS_EMPLOYED: 365243 is a placeholder for unemployed
@@ -34,7 +61,7 @@ def aggregate_bureau(path):
     fp = os.path.join(path, "bureau.csv")
     if not os.path.exists(fp):
         return None
-    bureau = pd.read_csv(fp)
+    bureau = read_table(path, "bureau")
     agg = bureau.groupby("SK_ID_CURR").agg(
         BUREAU_CNT_CREDITS=("SK_ID_BUREAU", "count"),
         BUREAU_AMT_CREDIT_SUM=("AMT_CREDIT_SUM", "sum"),
@@ -51,7 +78,7 @@ def aggregate_previous_app(path):
     fp = os.path.join(path, "previous_application.csv")
     if not os.path.exists(fp):
         return None
-    prev = pd.read_csv(fp)
+    prev = read_table(path, "previous_application", ["SK_ID_PREV", "SK_ID_CURR", "NAME_CONTRACT_STATUS", "AMT_CREDIT"])
     prev["APPROVED"] = (prev["NAME_CONTRACT_STATUS"] == "Approved").astype(int)
     agg = prev.groupby("SK_ID_CURR").agg(
         PREV_CNT_APPLICATIONS=("SK_ID_PREV", "count"),
@@ -61,42 +88,92 @@ def aggregate_previous_app(path):
     agg["PREV_APPROVAL_RATE"] = agg["PREV_CNT_APPROVED"] / agg["PREV_CNT_APPLICATIONS"].replace(0, np.nan)
     return agg
 
-def aggregate_bureau_balance(path):
-    """Aggregate bureau_balance (DPD status) via bureau -> SK_ID_CURR. Chunked for memory."""
+BUREAU_BALANCE_REDUCERS = {"MAX_DPD": ("STATUS_NUM", "max"), "CNT_DPD": ("DPD", "sum")}
+
+def _fold_bureau_balance(by_bureau, chunks):
+    """Fold bureau_balance chunks into per-SK_ID_BUREAU DPD state."""
+    for chunk in chunks:
+        status = chunk["STATUS"].cat
+        # Status codes -> DPD bucket through a per-chunk lookup table; code -1 (missing) hits the trailing -1
+        lut = np.array([STATUS_DPD.get(c, -1) for c in status.categories] + [-1], dtype=np.int8)
+        status_num = lut[status.codes.to_numpy()]
+        by_bureau.update({"SK_ID_BUREAU": chunk["SK_ID_BUREAU"].to_numpy(), "STATUS_NUM": status_num, "DPD": status_num > 0})
+
+def _bureau_balance_by_curr(path, bb):
+    """Roll per-bureau DPD aggregates up to SK_ID_CURR."""
+    if bb is None:
+        return None
+    bureau = read_table(path, "bureau", ["SK_ID_CURR", "SK_ID_BUREAU"]).sort_values("SK_ID_BUREAU")
+    # Map SK_ID_BUREAU -> SK_ID_CURR by position; balances with no bureau row are dropped
+    ids = bureau["SK_ID_BUREAU"].to_numpy()
+    pos = np.clip(np.searchsorted(ids, bb["SK_ID_BUREAU"].to_numpy()), 0, len(ids) - 1)
+    found = ids[pos] == bb["SK_ID_BUREAU"].to_numpy()
+    return stream_aggregate(
+        [{"SK_ID_CURR": bureau["SK_ID_CURR"].to_numpy()[pos[found]],
+          "MAX_DPD": bb["MAX_DPD"].to_numpy()[found], "CNT_DPD": bb["CNT_DPD"].to_numpy()[found]}],
+        "SK_ID_CURR", {"BUREAU_BAL_MAX_DPD": ("MAX_DPD", "max"), "BUREAU_BAL_CNT_DPD": ("CNT_DPD", "sum")},
+    )
+
+def aggregate_bureau_balance(path, state_dir=None):
+    """Aggregate bureau_balance (DPD status) via bureau -> SK_ID_CURR. Streamed in bounded chunks.
+
+    With state_dir, only rows appended since the previous call are read (see incremental_agg).
+    """
     fp_bb = os.path.join(path, "bureau_balance.csv")
     fp_b = os.path.join(path, "bureau.csv")
     if not os.path.exists(fp_bb) or not os.path.exists(fp_b):
         return None
-    bureau = pd.read_csv(fp_b, usecols=["SK_ID_CURR", "SK_ID_BUREAU"])
     # First aggregate by SK_ID_BUREAU (reduces 27M -> ~1.7M)
-    bb_agg = []
-    for chunk in pd.read_csv(fp_bb, chunksize=2_000_000, usecols=["SK_ID_BUREAU", "STATUS"]):
-        chunk["STATUS_NUM"] = chunk["STATUS"].map({"C": -1, "X": -1, "0": 0, "1": 1, "2": 2, "3": 3, "4": 4, "5": 5}).fillna(-1)
-        g = chunk.groupby("SK_ID_BUREAU").agg(MAX_DPD=("STATUS_NUM", "max"), CNT_DPD=("STATUS_NUM", lambda x: (x > 0).sum()))
-        bb_agg.append(g)
-    bb_by_bureau = pd.concat(bb_agg).groupby(level=0).agg(MAX_DPD=("MAX_DPD", "max"), CNT_DPD=("CNT_DPD", "sum")).reset_index()
-    bb_by_bureau = bb_by_bureau.merge(bureau, on="SK_ID_BUREAU", how="left")
-    agg = bb_by_bureau.groupby("SK_ID_CURR").agg(BUREAU_BAL_MAX_DPD=("MAX_DPD", "max"), BUREAU_BAL_CNT_DPD=("CNT_DPD", "sum")).reset_index()
-    return agg
+    rows = chunk_rows(SCHEMAS["bureau_balance"].values(), CHUNK_MEMORY_MB)
+    if state_dir:
+        by_bureau = incremental_agg.refresh_aggregator(path, "bureau_balance", state_dir, "SK_ID_BUREAU",
+                                                       BUREAU_BALANCE_REDUCERS, _fold_bureau_balance,
+                                                       _aggregator_version("bureau_balance"), rows)
+    else:
+        by_bureau = StreamingAggregator("SK_ID_BUREAU", BUREAU_BALANCE_REDUCERS)
+        _fold_bureau_balance(by_bureau, read_table(path, "bureau_balance", chunksize=rows))
+    return _bureau_balance_by_curr(path, by_bureau.result())
+
+# Payment amounts are summed in exact integer thousandths so that sums do not depend on
+# chunk boundaries: an incremental refresh then matches a full recompute bit for bit.
+INSTALLMENTS_REDUCERS = {
+    "INST_CNT_LATE": ("LATE", "sum"), "INST_CNT_TOTAL": ("LATE", "count"),
+    "AMT_PAY": ("AMT_PAYMENT_MILLI", "sum"), "AMT_INST": ("AMT_INSTALMENT_MILLI", "sum"),
+}
 
-def aggregate_installments(path):
-    """Aggregate installments_payments by SK_ID_CURR. Chunked for memory."""
+def _to_milli(amounts):
+    return np.rint(np.nan_to_num(amounts.to_numpy(np.float64), nan=0.0) * 1000).astype(np.int64)
+
+def _fold_installments(inst, chunks):
+    """Fold installments_payments chunks into per-SK_ID_CURR late/amount state."""
+    for chunk in chunks:
+        inst.update({
+            "SK_ID_CURR": chunk["SK_ID_CURR"].to_numpy(),
+            "LATE": (chunk["DAYS_ENTRY_PAYMENT"] > chunk["DAYS_INSTALMENT"]).to_numpy(),
+            "AMT_PAYMENT_MILLI": _to_milli(chunk["AMT_PAYMENT"]),
+            "AMT_INSTALMENT_MILLI": _to_milli(chunk["AMT_INSTALMENT"]),
+        })
+
+def aggregate_installments(path, state_dir=None):
+    """Aggregate installments_payments by SK_ID_CURR. Streamed in bounded chunks.
+
+    With state_dir, only rows appended since the previous call are read (see incremental_agg).
+    """
     fp = os.path.join(path, "installments_payments.csv")
     if not os.path.exists(fp):
         return None
-    chunks_agg = []
-    for chunk in pd.read_csv(fp, chunksize=1_000_000, usecols=["SK_ID_CURR", "AMT_INSTALMENT", "AMT_PAYMENT", "DAYS_INSTALMENT", "DAYS_ENTRY_PAYMENT"]):
-        chunk["LATE"] = (chunk["DAYS_ENTRY_PAYMENT"] > chunk["DAYS_INSTALMENT"]).astype(int)
-        g = chunk.groupby("SK_ID_CURR").agg(
-            LATE=("LATE", "sum"), CNT=("LATE", "count"),
-            AMT_PAY=("AMT_PAYMENT", "sum"), AMT_INST=("AMT_INSTALMENT", "sum")
-        )
-        chunks_agg.append(g)
-    if not chunks_agg:
+    rows = chunk_rows(SCHEMAS["installments_payments"].values(), CHUNK_MEMORY_MB)
+    if state_dir:
+        inst = incremental_agg.refresh_aggregator(path, "installments_payments", state_dir, "SK_ID_CURR",
+                                                  INSTALLMENTS_REDUCERS, _fold_installments,
+                                                  _aggregator_version("installments"), rows)
+    else:
+        inst = StreamingAggregator("SK_ID_CURR", INSTALLMENTS_REDUCERS)
+        _fold_installments(inst, read_table(path, "installments_payments", chunksize=rows))
+    agg = inst.result()
+    if agg is None:
         return None
-    combined = pd.concat(chunks_agg)
-    agg = combined.groupby(level=0).agg(LATE=("LATE", "sum"), CNT=("CNT", "sum"), AMT_PAY=("AMT_PAY", "sum"), AMT_INST=("AMT_INST", "sum")).reset_index()
-    agg.columns = ["SK_ID_CURR", "INST_CNT_LATE", "INST_CNT_TOTAL", "AMT_PAY", "AMT_INST"]
+    # Ratios are re-derived from the additive state on every call
     agg["INST_LATE_RATE"] = agg["INST_CNT_LATE"] / agg["INST_CNT_TOTAL"].replace(0, np.nan)
     agg["INST_PAYMENT_RATIO_MEAN"] = agg["AMT_PAY"] / agg["AMT_INST"].replace(0, np.nan)
     return agg[["SK_ID_CURR", "INST_CNT_LATE", "INST_CNT_TOTAL", "INST_LATE_RATE", "INST_PAYMENT_RATIO_MEAN"]]
@@ -106,7 +183,7 @@ def aggregate_credit_card(path):
     fp = os.path.join(path, "credit_card_balance.csv")
     if not os.path.exists(fp):
         return None
-    cc = pd.read_csv(fp, usecols=["SK_ID_CURR", "AMT_BALANCE", "AMT_CREDIT_LIMIT_ACTUAL", "SK_DPD_DEF"])
+    cc = read_table(path, "credit_card_balance")
     agg = cc.groupby("SK_ID_CURR").agg(
         CC_AMT_BALANCE_MEAN=("AMT_BALANCE", "mean"),
         CC_AMT_LIMIT_MEAN=("AMT_CREDIT_LIMIT_ACTUAL", "mean"),
@@ -119,90 +196,149 @@ def aggregate_pos_cash(path):
     fp = os.path.join(path, "POS_CASH_balance.csv")
     if not os.path.exists(fp):
         return None
-    pos = pd.read_csv(fp, usecols=["SK_ID_CURR", "SK_DPD", "SK_DPD_DEF"])
+    pos = read_table(path, "POS_CASH_balance")
     agg = pos.groupby("SK_ID_CURR").agg(
         POS_DPD_MEAN=("SK_DPD", "mean"),
         POS_DPD_DEF_MAX=("SK_DPD_DEF", "max"),
     ).reset_index()
     return agg
 
+# Modeling features: application columns, then aggregate columns in argument order of build_features
+APP_FEATURES = [
+    "AGE", "AMT_INCOME_TOTAL", "AMT_CREDIT", "AMT_ANNUITY", "AMT_GOODS_PRICE",
+    "CNT_CHILDREN", "CNT_FAM_MEMBERS", "YEARS_EMPLOYED",
+    "EXT_SOURCE_1", "EXT_SOURCE_2", "EXT_SOURCE_3",
+    "REGION_POPULATION_RELATIVE", "REGION_RATING_CLIENT",
+    "AMT_REQ_CREDIT_BUREAU_YEAR", "DAYS_LAST_PHONE_CHANGE",
+    "OBS_30_CNT_SOCIAL_CIRCLE", "DEF_30_CNT_SOCIAL_CIRCLE",
+    "OBS_60_CNT_SOCIAL_CIRCLE", "DEF_60_CNT_SOCIAL_CIRCLE",
+]
+AGG_FEATURES = [
+    ["BUREAU_CNT_CREDITS", "BUREAU_AMT_CREDIT_SUM", "BUREAU_AMT_CREDIT_SUM_DEBT",
+     "BUREAU_AMT_CREDIT_SUM_OVERDUE", "BUREAU_CNT_CREDIT_PROLONG"],
+    ["PREV_CNT_APPLICATIONS", "PREV_APPROVAL_RATE", "PREV_AMT_CREDIT_MEAN"],
+    ["BUREAU_BAL_MAX_DPD", "BUREAU_BAL_CNT_DPD"],
+    ["INST_CNT_LATE", "INST_LATE_RATE", "INST_PAYMENT_RATIO_MEAN"],
+    ["CC_AMT_BALANCE_MEAN", "CC_AMT_LIMIT_MEAN", "CC_MAX_DPD_DEF"],
+    ["POS_DPD_MEAN", "POS_DPD_DEF_MAX"],
+]
+
 def build_features(app, bureau_agg, prev_agg, bureau_bal_agg=None, inst_agg=None, cc_agg=None, pos_agg=None):
-    """Merge and select features."""
-    df = app.copy()
-    if bureau_agg is not None:
-        df = df.merge(bureau_agg, on="SK_ID_CURR", how="left")
-        df[bureau_agg.columns[1:]] = df[bureau_agg.columns[1:]].fillna(0)
-    if prev_agg is not None:
-        df = df.merge(prev_agg, on="SK_ID_CURR", how="left")
-        df["PREV_CNT_APPLICATIONS"] = df["PREV_CNT_APPLICATIONS"].fillna(0)
-        df["PREV_CNT_APPROVED"] = df["PREV_CNT_APPROVED"].fillna(0)
-        df["PREV_APPROVAL_RATE"] = df["PREV_APPROVAL_RATE"].fillna(0)
-        df["PREV_AMT_CREDIT_MEAN"] = df["PREV_AMT_CREDIT_MEAN"].fillna(0)
-    if bureau_bal_agg is not None:
-        df = df.merge(bureau_bal_agg, on="SK_ID_CURR", how="left")
-        df[bureau_bal_agg.columns[1:]] = df[bureau_bal_agg.columns[1:]].fillna(0)
-    if inst_agg is not None:
-        df = df.merge(inst_agg, on="SK_ID_CURR", how="left")
-        for c in ["INST_CNT_LATE", "INST_CNT_TOTAL", "INST_LATE_RATE", "INST_PAYMENT_RATIO_MEAN"]:
-            if c in df.columns:
-                df[c] = df[c].fillna(0)
-    if cc_agg is not None:
-        df = df.merge(cc_agg, on="SK_ID_CURR", how="left")
-        df[cc_agg.columns[1:]] = df[cc_agg.columns[1:]].fillna(0)
-    if pos_agg is not None:
-        df = df.merge(pos_agg, on="SK_ID_CURR", how="left")
-        df[pos_agg.columns[1:]] = df[pos_agg.columns[1:]].fillna(0)
-
-    # Select numeric/categorical features for modeling
-    feature_cols = [
-        "AGE", "AMT_INCOME_TOTAL", "AMT_CREDIT", "AMT_ANNUITY", "AMT_GOODS_PRICE",
-        "CNT_CHILDREN", "CNT_FAM_MEMBERS", "YEARS_EMPLOYED",
-        "EXT_SOURCE_1", "EXT_SOURCE_2", "EXT_SOURCE_3",
-        "REGION_POPULATION_RELATIVE", "REGION_RATING_CLIENT",
-        "AMT_REQ_CREDIT_BUREAU_YEAR", "DAYS_LAST_PHONE_CHANGE",
-        "OBS_30_CNT_SOCIAL_CIRCLE", "DEF_30_CNT_SOCIAL_CIRCLE",
-        "OBS_60_CNT_SOCIAL_CIRCLE", "DEF_60_CNT_SOCIAL_CIRCLE",
-    ]
-    if bureau_agg is not None:
-        feature_cols += ["BUREAU_CNT_CREDITS", "BUREAU_AMT_CREDIT_SUM", "BUREAU_AMT_CREDIT_SUM_DEBT",
-                        "BUREAU_AMT_CREDIT_SUM_OVERDUE", "BUREAU_CNT_CREDIT_PROLONG"]
-    if prev_agg is not None:
-        feature_cols += ["PREV_CNT_APPLICATIONS", "PREV_APPROVAL_RATE", "PREV_AMT_CREDIT_MEAN"]
-    if bureau_bal_agg is not None:
-        feature_cols += ["BUREAU_BAL_MAX_DPD", "BUREAU_BAL_CNT_DPD"]
-    if inst_agg is not None:
-        feature_cols += ["INST_CNT_LATE", "INST_LATE_RATE", "INST_PAYMENT_RATIO_MEAN"]
-    if cc_agg is not None:
-        feature_cols += ["CC_AMT_BALANCE_MEAN", "CC_AMT_LIMIT_MEAN", "CC_MAX_DPD_DEF"]
-    if pos_agg is not None:
-        feature_cols += ["POS_DPD_MEAN", "POS_DPD_DEF_MAX"]
-
-    available = [c for c in feature_cols if c in df.columns]
-    X = df[available].copy()
-    # Fill NaN with median for numeric
-    for c in X.select_dtypes(include=[np.number]).columns:
-        X[c] = X[c].fillna(X[c].median())
-    return df, X, available
-
-def load_home_credit(path=None):
-    """Full pipeline: load and prepare Home Credit data."""
+    """Assemble the float32 feature matrix X (one row per application, in app order).
+
+    SK_ID_CURR is sorted once; each aggregate is placed by position (searchsorted) straight
+    into a preallocated matrix instead of being merged into a widening frame. Gaps are filled
+    in one vectorized pass: aggregates with 0, application columns with their median.
+    Returns (app, X, feature_cols); app is returned unchanged.
+    """
+    app_cols = [c for c in APP_FEATURES if c in app.columns]
+    blocks = [(agg, [c for c in cols if c in agg.columns])
+              for agg, cols in zip([bureau_agg, prev_agg, bureau_bal_agg, inst_agg, cc_agg, pos_agg], AGG_FEATURES)
+              if agg is not None]
+    available = app_cols + [c for _, cols in blocks for c in cols]
+
+    M = np.zeros((len(app), len(available)), dtype=np.float32)
+    for j, c in enumerate(app_cols):
+        M[:, j] = app[c].to_numpy(dtype=np.float32, na_value=np.nan)
+
+    ids = app["SK_ID_CURR"].to_numpy()
+    order = np.argsort(ids, kind="stable")
+    sorted_ids = ids[order]
+    j = len(app_cols)
+    for agg, cols in blocks:
+        keys = agg["SK_ID_CURR"].to_numpy()
+        pos = np.clip(np.searchsorted(sorted_ids, keys), 0, len(sorted_ids) - 1)
+        match = sorted_ids[pos] == keys
+        M[order[pos[match]], j:j + len(cols)] = agg[cols].to_numpy(dtype=np.float32, na_value=np.nan)[match]
+        j += len(cols)
+
+    fill = np.zeros(len(available), dtype=np.float32)
+    for j in range(len(app_cols)):
+        col = M[:, j]
+        present = col[~np.isnan(col)]
+        fill[j] = np.median(present) if len(present) else np.nan
+    np.copyto(M, fill, where=np.isnan(M))
+    X = pd.DataFrame(M, columns=available, index=app.index, copy=False)
+    return app, X, available
+
+AGGREGATORS = {
+    "bureau": aggregate_bureau,
+    "previous_app": aggregate_previous_app,
+    "bureau_balance": aggregate_bureau_balance,
+    "installments": aggregate_installments,
+    "credit_card": aggregate_credit_card,
+    "pos_cash": aggregate_pos_cash,
+}
+
+# Modules every aggregate depends on, hashed as whole files: this one (aggregators, helpers and
+# tables such as STATUS_DPD, the reducers and the feature lists), readers, reducers, incremental state
+AGG_MODULES = (sys.modules[__name__], home_credit_schema, streaming_agg, incremental_agg)
+
+# Aggregators whose additive state can be refreshed from appended rows only
+INCREMENTAL = ("bureau_balance", "installments")
+
+def _aggregator_version(name):
+    return code_version(*AGG_MODULES, extra=(name, AGG_VERSION, SCHEMA_VERSION))
+
+def run_aggregator(name, path, state_dir=None):
+    """Run one aggregator; incremental ones keep their state under state_dir/<name>."""
+    if state_dir and name in INCREMENTAL:
+        return AGGREGATORS[name](path, state_dir=os.path.join(state_dir, name))
+    return AGGREGATORS[name](path)
+
+def _source_files(path, *stages):
+    files = []
+    for stage in stages:
+        files += [os.path.join(path, f) for f in SOURCES[stage] if os.path.join(path, f) not in files]
+    return files
+
+def load_home_credit(path=None, cache_dir=None, use_cache=True, n_jobs=None, worker_memory_mb=None,
+                     incremental=False):
+    """Full pipeline: load and prepare Home Credit data.
+
+    Aggregates and the final feature matrix are cached as Parquet under cache_dir
+    (default: data/processed/home_credit_cache/); pass use_cache=False to recompute.
+    With n_jobs > 1 (default: HOME_CREDIT_N_JOBS env) uncached aggregates run on a
+    process pool, each worker capped at worker_memory_mb of address space.
+    With incremental=True, bureau_balance and installments_payments keep additive state
+    under <cache_dir>/incremental/ and only fold in rows appended since the last run.
+    """
     path = path or get_data_path()
     if not os.path.exists(path):
         return None, None, None
-
-    app = load_application(path)
-    if app is None:
+    if not os.path.exists(os.path.join(path, "application_train.csv")):
         return None, None, None
+    state_dir = os.path.join(cache_dir or default_cache_dir(), "incremental") if incremental else None
+    cache_dir = (cache_dir or default_cache_dir()) if use_cache else None
+
+    if n_jobs is None:
+        from parallel_agg import default_n_jobs
+        n_jobs = default_n_jobs()
+
+    def compute_features():
+        versions = {name: _aggregator_version(name) for name in AGGREGATORS}
+        computed = {}
+        if n_jobs > 1:
+            from parallel_agg import run_aggregations
+            pending = [name for name in AGGREGATORS
+                       if not is_cached(name, _source_files(path, name), versions[name], cache_dir)]
+            computed = run_aggregations(path, pending, n_jobs, worker_memory_mb, state_dir)
+        app = load_application(path)
+        aggs = {
+            name: cached_frame(name, _source_files(path, name), versions[name],
+                               lambda name=name: computed[name] if name in computed else run_aggregator(name, path, state_dir),
+                               cache_dir)
+            for name in AGGREGATORS
+        }
+        df, X, feature_cols = build_features(app, aggs["bureau"], aggs["previous_app"], aggs["bureau_balance"],
+                                             aggs["installments"], aggs["credit_card"], aggs["pos_cash"])
+        return X.assign(TARGET=app["TARGET"].values)
 
-    bureau_agg = aggregate_bureau(path)
-    prev_agg = aggregate_previous_app(path)
-    bureau_bal_agg = aggregate_bureau_balance(path)
-    inst_agg = aggregate_installments(path)
-    cc_agg = aggregate_credit_card(path)
-    pos_agg = aggregate_pos_cash(path)
-    df, X, feature_cols = build_features(app, bureau_agg, prev_agg, bureau_bal_agg, inst_agg, cc_agg, pos_agg)
-    y = app["TARGET"]
-    return X, y, feature_cols
+    version = code_version(load_application, build_features, extra=[_aggregator_version(name) for name in AGGREGATORS])
+    sources = [fp for fp in _source_files(path, *SOURCES) if os.path.exists(fp)]
+    features = cached_frame("features", sources, version, compute_features, cache_dir)
+    y = features.pop("TARGET")
+    return features, y, list(features.columns)
 
 if __name__ == "__main__":
     path = get_data_path()
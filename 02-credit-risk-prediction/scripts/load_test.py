@@ -0,0 +1,127 @@
+"""
+Load test for the credit-risk scoring server: latency percentiles and throughput.
+Starts scripts/scoring_server.py on a free port unless --port points at a running one.
+
+    python scripts/load_test.py [--concurrency 64] [--requests 5000] [--rows 1]
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import subprocess
+
+import numpy as np
+
+from risk_scoring import load_artifact
+
+# Service targets for single-row requests on a laptop-class machine
+P50_TARGET_MS = 20.0
+P99_TARGET_MS = 100.0
+THROUGHPUT_TARGET_RPS = 500.0
+
+async def _request(reader, writer, method, target, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b''
+    writer.write(f'{method} {target} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n'
+                 f'Content-Length: {len(body)}\r\n\r\n'.encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        if line.lower().startswith(b'content-length:'):
+            length = int(line.split(b':')[1])
+    return status, json.loads(await reader.readexactly(length))
+
+async def _client(host, port, payloads, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for payload in payloads:
+            t0 = time.perf_counter()
+            status, _ = await _request(reader, writer, 'POST', '/score', payload)
+            latencies.append(time.perf_counter() - t0)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+async def run_load(host, port, payloads, concurrency):
+    """Replay payloads over `concurrency` keep-alive connections; returns (latencies_s, errors, wall_s)."""
+    latencies, errors = [], []
+    per_client = [payloads[i::concurrency] for i in range(concurrency)]
+    t0 = time.perf_counter()
+    await asyncio.gather(*[_client(host, port, p, latencies, errors) for p in per_client if p])
+    return np.array(latencies), errors, time.perf_counter() - t0
+
+async def _wait_healthy(host, port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            status, health = await _request(reader, writer, 'GET', '/health')
+            writer.close()
+            if status == 200:
+                return health
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise TimeoutError(f'scoring server on {host}:{port} did not become healthy')
+
+def make_payloads(model, n_requests, rows_per_request, seed=42):
+    """Synthetic applicants: training medians with multiplicative noise."""
+    rng = np.random.default_rng(seed)
+    base = model.fill_values
+    payloads = []
+    for _ in range(n_requests):
+        X = base * rng.lognormal(0, 0.3, size=(rows_per_request, len(base)))
+        payloads.append({'rows': [dict(zip(model.feature_cols, row.tolist())) for row in X]})
+    return payloads
+
+def main():
+    parser = argparse.ArgumentParser(description='Scoring server load test')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help='existing server (default: start one)')
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--rows', type=int, default=1, help='rows per request')
+    args = parser.parse_args()
+
+    model = load_artifact()
+    payloads = make_payloads(model, args.requests, args.rows)
+    server = None
+    port = args.port
+    if port is None:
+        with socket.socket() as s:
+            s.bind((args.host, 0))
+            port = s.getsockname()[1]
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scoring_server.py')
+        server = subprocess.Popen([sys.executable, script, '--host', args.host, '--port', str(port)])
+    try:
+        health = asyncio.run(_wait_healthy(args.host, port))
+        print(f"Server model {health['version']} | {args.requests} requests x {args.rows} rows, "
+              f"concurrency {args.concurrency}")
+        asyncio.run(run_load(args.host, port, payloads[:args.concurrency], args.concurrency))  # warm-up
+        lat, errors, wall = asyncio.run(run_load(args.host, port, payloads, args.concurrency))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    p50, p99 = np.percentile(lat * 1000, [50, 99])
+    rps = len(lat) / wall
+    results = [
+        ('p50 latency (ms)', p50, P50_TARGET_MS, p50 <= P50_TARGET_MS),
+        ('p99 latency (ms)', p99, P99_TARGET_MS, p99 <= P99_TARGET_MS),
+        ('throughput (req/s)', rps, THROUGHPUT_TARGET_RPS, rps >= THROUGHPUT_TARGET_RPS),
+    ]
+    print(f"{'metric':<20}{'value':>10}{'target':>10}  result")
+    for name, value, target, ok in results:
+        print(f"{name:<20}{value:>10.1f}{target:>10.1f}  {'PASS' if ok else 'FAIL'}")
+    print(f"rows/s: {rps * args.rows:.0f} | errors: {len(errors)}")
+    sys.exit(0 if all(ok for *_, ok in results) and not errors else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Process-pool execution of the independent Home Credit aggregations.
+Each worker runs one aggregate_* function and hands its result back as an Arrow
+IPC stream in shared memory, so frames are never pickled between processes.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import pyarrow as pa
+
+try:
+    import resource
+except ImportError:  # Windows: no per-process address-space limits
+    resource = None
+
+def default_n_jobs():
+    """Worker count: 1) HOME_CREDIT_N_JOBS env, 2) serial."""
+    return int(os.environ.get("HOME_CREDIT_N_JOBS", "1"))
+
+def _limit_memory(worker_memory_mb):
+    """Pool initializer: cap the worker's address space at worker_memory_mb."""
+    if worker_memory_mb and resource is not None:
+        limit = int(worker_memory_mb) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def _write_ipc(table, sink):
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+def _aggregate_to_shm(name, path, state_dir=None):
+    """Worker: run one aggregator, publish its result in shared memory."""
+    from load_home_credit import run_aggregator
+    try:
+        df = run_aggregator(name, path, state_dir)
+    except MemoryError as e:
+        raise MemoryError(f"{name}: worker memory budget exceeded") from e
+    if df is None:
+        return None
+    table = pa.Table.from_pandas(df)
+    mock = pa.MockOutputStream()
+    _write_ipc(table, mock)
+    size = mock.size()
+    shm = SharedMemory(create=True, size=max(size, 1))
+    dst = pa.py_buffer(shm.buf)
+    _write_ipc(table, pa.FixedSizeBufferWriter(dst))
+    del dst
+    shm.close()
+    # Ownership passes to the parent, which unlinks the segment after reading it
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm.name, size
+
+def _read_shm(handle):
+    """Parent: materialize a worker result and release its shared memory."""
+    if handle is None:
+        return None
+    shm_name, size = handle
+    shm = SharedMemory(name=shm_name)
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(shm.buf[:size])).read_all()
+        df = table.to_pandas()
+        del table
+        try:
+            shm.close()
+        except BufferError:  # to_pandas kept zero-copy views into the segment
+            df = df.copy(deep=True)
+            shm.close()
+    finally:
+        shm.unlink()
+    return df
+
+def run_aggregations(path, names, n_jobs, worker_memory_mb=None, state_dir=None):
+    """Run the named aggregators on a process pool; returns {name: DataFrame or None}."""
+    if not names:
+        return {}
+    n_workers = max(1, min(n_jobs, len(names), os.cpu_count() or 1))
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_limit_memory,
+                             initargs=(worker_memory_mb,)) as pool:
+        futures = {name: pool.submit(_aggregate_to_shm, name, path, state_dir) for name in names}
+        results, error = {}, None
+        for name, fut in futures.items():
+            try:
+                results[name] = _read_shm(fut.result())
+            except Exception as e:  # keep draining so no segment is leaked
+                error = error or e
+    if error is not None:
+        raise error
+    return results
@@ -0,0 +1,144 @@
+"""
+Class-imbalance strategies for the credit-risk models.
+    smote              imblearn SMOTE (float64 copy of the whole training set)
+    batched_smote      same interpolation, neighbor table built once in parallel on the minority
+                       class only, synthetic rows written in batches into one float32 matrix
+    class_weight       no resampling; errors on defaults weighted by inverse class frequency
+    balanced_bootstrap no resampling; every tree draws a class-balanced bootstrap sample
+
+    python scripts/resampling.py [--strategies smote class_weight ...] [--n-jobs -1]
+prints fit time, peak RSS and ROC-AUC per strategy, each run in a fresh process.
+"""
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.neighbors import NearestNeighbors
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.engines import make_model, peak_rss_mb
+
+STRATEGIES = ("smote", "batched_smote", "class_weight", "balanced_bootstrap")
+SYNTHETIC_STRATEGIES = ("smote", "batched_smote")  # add rows in standardized feature space
+DEFAULT_STRATEGY = os.environ.get("CREDIT_RESAMPLING", "batched_smote")
+SYNTH_BATCH_ROWS = 65_536  # synthetic rows generated per batch (bounds float temporaries)
+
+def synthesize_minority(X, y, k_neighbors=5, n_jobs=None, random_state=42, batch_rows=SYNTH_BATCH_ROWS):
+    """SMOTE oversampling to a 1:1 class ratio without float64 temporaries.
+
+    Returns (X_res float32, y_res): the original rows followed by the synthetic minority rows.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y)
+    labels, counts = np.unique(y, return_counts=True)
+    minority_label = labels[np.argmin(counts)]
+    minority = X[y == minority_label]
+    n_new = int(counts.max() - counts.min())
+    k = min(k_neighbors, len(minority) - 1)
+    if n_new == 0 or k < 1:
+        return X, y
+
+    # Neighbor table over minority rows only: (n_minority, k) indices, computed once
+    nn = NearestNeighbors(n_neighbors=k + 1, n_jobs=n_jobs).fit(minority)
+    neighbors = nn.kneighbors(minority, return_distance=False)[:, 1:]
+
+    X_res = np.empty((len(X) + n_new, X.shape[1]), dtype=np.float32)
+    X_res[:len(X)] = X
+    y_res = np.empty(len(y) + n_new, dtype=y.dtype)
+    y_res[:len(y)] = y
+    y_res[len(y):] = minority_label
+    rng = np.random.default_rng(random_state)
+    for start in range(0, n_new, batch_rows):
+        m = min(batch_rows, n_new - start)
+        base = rng.integers(0, len(minority), m)
+        pick = neighbors[base, rng.integers(0, k, m)]
+        gap = rng.random((m, 1), dtype=np.float32)
+        out = X_res[len(X) + start:len(X) + start + m]
+        np.subtract(minority[pick], minority[base], out=out)
+        out *= gap
+        out += minority[base]
+    return X_res, y_res
+
+def resample(strategy, X, y, n_jobs=None, random_state=42):
+    """Training set for a strategy -> (X, y, class_weight for the estimators)."""
+    if strategy == "smote":
+        from imblearn.over_sampling import SMOTE
+        X_res, y_res = SMOTE(random_state=random_state, k_neighbors=5).fit_resample(X, y)
+        return X_res, y_res, None
+    if strategy == "batched_smote":
+        X_res, y_res = synthesize_minority(X, y, n_jobs=n_jobs, random_state=random_state)
+        return X_res, y_res, None
+    if strategy in ("class_weight", "balanced_bootstrap"):
+        return np.asarray(X, dtype=np.float32), np.asarray(y), "balanced"
+    raise ValueError(f"Unknown resampling strategy: {strategy} (choose from {', '.join(STRATEGIES)})")
+
+def make_forest(strategy, n_estimators=100, n_jobs=-1, random_state=42, **params):
+    """Random forest for a strategy; balanced_bootstrap balances each tree's sample instead of the data."""
+    if strategy == "balanced_bootstrap":
+        from imblearn.ensemble import BalancedRandomForestClassifier
+        return BalancedRandomForestClassifier(n_estimators=n_estimators, sampling_strategy="all", replacement=True,
+                                              bootstrap=False, n_jobs=n_jobs, random_state=random_state, **params)
+    class_weight = "balanced" if strategy == "class_weight" else None
+    return make_model("random_forest", random_state, n_jobs, class_weight, n_estimators=n_estimators, **params)
+
+def _run_strategy(strategy, X_train, y_train, X_test, y_test, n_jobs, random_state):
+    """Resample + fit one forest in this (fresh) process; returns one benchmark row."""
+    from sklearn.metrics import roc_auc_score
+    baseline = peak_rss_mb()
+    t0 = time.perf_counter()
+    X_res, y_res, _ = resample(strategy, X_train, y_train, n_jobs=n_jobs, random_state=random_state)
+    t1 = time.perf_counter()
+    forest = make_forest(strategy, n_jobs=n_jobs, random_state=random_state).fit(X_res, y_res)
+    t2 = time.perf_counter()
+    auc = roc_auc_score(y_test, forest.predict_proba(X_test)[:, 1])
+    return {
+        "strategy": strategy,
+        "train_rows": len(y_res),
+        "resample_s": t1 - t0,
+        "fit_s": t2 - t1,
+        "peak_rss_mb": peak_rss_mb(),
+        "added_rss_mb": peak_rss_mb() - baseline,
+        "roc_auc": auc,
+    }
+
+def benchmark(X_train, y_train, X_test, y_test, strategies=STRATEGIES, n_jobs=-1, random_state=42):
+    """Run each strategy in its own spawned process so peak RSS is not shared between them."""
+    rows = []
+    ctx = multiprocessing.get_context("spawn")
+    for strategy in strategies:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            rows.append(pool.submit(_run_strategy, strategy, X_train, y_train, X_test, y_test,
+                                    n_jobs, random_state).result())
+    return rows
+
+def print_benchmark(rows):
+    print(f"{'strategy':<20}{'train rows':>12}{'resample s':>12}{'fit s':>10}{'peak RSS MB':>13}"
+          f"{'added MB':>10}{'ROC-AUC':>9}")
+    for r in rows:
+        print(f"{r['strategy']:<20}{r['train_rows']:>12,}{r['resample_s']:>12.2f}{r['fit_s']:>10.2f}"
+              f"{r['peak_rss_mb']:>13.0f}{r['added_rss_mb']:>10.0f}{r['roc_auc']:>9.4f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare class-imbalance strategies")
+    parser.add_argument("--strategies", nargs="+", default=list(STRATEGIES), choices=STRATEGIES)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    args = parser.parse_args()
+
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+    from run_analysis import load_data, RANDOM_STATE
+    X, y, _ = load_data()
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, stratify=y, random_state=RANDOM_STATE)
+    scaler = StandardScaler().fit(X_train)
+    X_train_sc = scaler.transform(X_train)
+    X_test_sc = scaler.transform(X_test)
+    print(f"Train {len(y_train):,} rows x {X.shape[1]} features, defaults {np.mean(y_train):.2%}, n_jobs={args.n_jobs}")
+    print_benchmark(benchmark(X_train_sc, np.asarray(y_train), X_test_sc, np.asarray(y_test),
+                              args.strategies, args.n_jobs, RANDOM_STATE))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Versioned credit-risk model artifacts and scoring helpers.
+An artifact bundles the fitted StandardScaler, the classifier, the tuned decision
+threshold and the per-feature fill values, so new applicants can be scored without
+retraining. Artifacts live in models/credit_risk/<version>/; LATEST names the newest.
+"""
+import os
+import json
+import hashlib
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import joblib
+import sklearn
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODELS = os.path.join(BASE, 'models', 'credit_risk')
+
+# Risk tiers by default probability: Low (0-20%), Medium (20-50%), High (50-80%), Critical (80%+)
+RISK_TIER_BINS = [0, 0.2, 0.5, 0.8, 1]
+RISK_TIER_LABELS = ['Low', 'Medium', 'High', 'Critical']
+
+def risk_tier(default_prob):
+    """Map default probabilities to risk tier labels."""
+    return pd.cut(default_prob, bins=RISK_TIER_BINS, labels=RISK_TIER_LABELS, include_lowest=True)
+
+def risk_tier_codes(default_prob):
+    """Index into RISK_TIER_LABELS per probability (same bins as risk_tier())."""
+    return np.searchsorted(RISK_TIER_BINS[1:-1], default_prob, side='left').astype(np.int8)
+
+def risk_tier_labels(default_prob):
+    """risk_tier() as a plain array of labels, without the pandas overhead (per-request path)."""
+    return np.asarray(RISK_TIER_LABELS)[risk_tier_codes(default_prob)]
+
+class RiskModel:
+    """Fitted scaler (None for models trained on raw features) + classifier + threshold."""
+
+    def __init__(self, scaler, model, threshold, feature_cols, fill_values, metadata=None):
+        self.scaler = scaler
+        self.model = model
+        self.threshold = float(threshold)
+        self.feature_cols = list(feature_cols)
+        self.fill_values = np.asarray(fill_values, dtype=np.float64)
+        self.metadata = metadata or {}
+        # Scale in the dtype the model was trained with, so scores match training-time scores exactly
+        self.dtype = np.dtype(self.metadata.get('feature_dtype', 'float64'))
+
+    @property
+    def version(self):
+        return self.metadata.get('version')
+
+    def matrix(self, rows):
+        """Feature matrix from a DataFrame or list of {feature: value} dicts; gaps get fill values."""
+        if isinstance(rows, pd.DataFrame):
+            X = rows.reindex(columns=self.feature_cols).to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            X = np.array([[row.get(c) for c in self.feature_cols] for row in rows], dtype=np.float64)
+            X = X.reshape(len(rows), len(self.feature_cols))
+        return np.where(np.isnan(X), self.fill_values, X)
+
+    def predict_proba(self, X):
+        """Default probability for a prepared feature matrix."""
+        X = np.asarray(X, dtype=self.dtype)
+        if self.scaler is None:
+            return self.model.predict_proba(X)[:, 1]
+        # The scaler was fitted on a DataFrame; keep the column names to match
+        X = pd.DataFrame(X, columns=self.feature_cols, copy=False)
+        return self.model.predict_proba(self.scaler.transform(X))[:, 1]
+
+    def score(self, rows):
+        """default_prob, risk_tier and predicted_default for raw rows."""
+        prob = self.predict_proba(self.matrix(rows))
+        return {
+            'default_prob': prob,
+            'risk_tier': risk_tier_labels(prob),
+            'predicted_default': (prob >= self.threshold).astype(int),
+        }
+
+def save_artifact(scaler, model, threshold, X_train, metrics=None, models_dir=MODELS):
+    """Persist a new artifact version and point LATEST at it; returns the version."""
+    feature_cols = list(X_train.columns)
+    fill_values = X_train.median().to_numpy(dtype=np.float64)
+    created = datetime.now(timezone.utc)
+    digest = hashlib.sha1(json.dumps([feature_cols, float(threshold)]).encode()).hexdigest()[:8]
+    version = f"{created:%Y%m%d-%H%M%S}-{digest}"
+    out = os.path.join(models_dir, version)
+    os.makedirs(out, exist_ok=True)
+    joblib.dump({'scaler': scaler, 'model': model}, os.path.join(out, 'model.joblib'))
+    metadata = {
+        'version': version,
+        'created_at': created.isoformat(),
+        'model_class': type(model).__name__,
+        'sklearn_version': sklearn.__version__,
+        'threshold': float(threshold),
+        'feature_cols': feature_cols,
+        'fill_values': fill_values.tolist(),
+        'train_rows': int(len(X_train)),
+        'feature_dtype': 'float32' if (X_train.dtypes == np.float32).all() else 'float64',
+        'metrics': metrics or {},
+    }
+    with open(os.path.join(out, 'metadata.json'), 'w') as f:
+        json.dump(metadata, f, indent=2)
+    with open(os.path.join(models_dir, 'LATEST'), 'w') as f:
+        f.write(version)
+    return version
+
+def load_artifact(version=None, models_dir=MODELS):
+    """Load an artifact version (default: LATEST)."""
+    if version is None:
+        latest = os.path.join(models_dir, 'LATEST')
+        if not os.path.exists(latest):
+            raise FileNotFoundError(f"No credit risk model in {models_dir}; run scripts/run_analysis.py first")
+        with open(latest) as f:
+            version = f.read().strip()
+    src = os.path.join(models_dir, version)
+    with open(os.path.join(src, 'metadata.json')) as f:
+        metadata = json.load(f)
+    if metadata['sklearn_version'] != sklearn.__version__:
+        print(f"Warning: model {version} was trained with scikit-learn {metadata['sklearn_version']}, "
+              f"running {sklearn.__version__}")
+    bundle = joblib.load(os.path.join(src, 'model.joblib'))
+    if hasattr(bundle['model'], 'n_jobs'):
+        bundle['model'].n_jobs = 1  # scoring batches are small; thread fan-out costs more than it saves
+    return RiskModel(bundle['scaler'], bundle['model'], metadata['threshold'],
+                     metadata['feature_cols'], metadata['fill_values'], metadata)
@@ -4,26 +4,41 @@ Uses Home Credit Default Risk data when available, else synthetic sample.
 Run from project root: python scripts/run_analysis.py
 """
 import os
+import sys
 import pandas as pd
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import seaborn as sns
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import confusion_matrix, classification_report, roc_auc_score, f1_score
-from imblearn.over_sampling import SMOTE
+from sklearn.metrics import confusion_matrix
+from resampling import DEFAULT_STRATEGY, SYNTHETIC_STRATEGIES, resample, make_forest
+from risk_scoring import load_artifact, save_artifact
+from batch_scoring import score_to_parquet
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.evaluation import Evaluator
+from common.engines import ENGINE_LABELS, feature_importance, make_model, n_iterations
+from common.search import search
+from common.render import Chart, plot_confusion_matrix, plot_feature_importance, render
 
 RANDOM_STATE = 42
 np.random.seed(RANDOM_STATE)
 
+# Decision threshold search range and business cost of errors (a missed default costs
+# far more than declining a good applicant)
+THRESHOLD_RANGE = (0.2, 0.6)
+COST_FALSE_NEGATIVE = 5.0
+COST_FALSE_POSITIVE = 1.0
+
+# Scoring model engine (common/engines.py): random_forest or hist_gb
+ENGINE = os.environ.get('CREDIT_ENGINE', 'random_forest')
+# Hyperparameter search before the final fit: unset, 'halving' or 'hyperband' (common/search.py)
+TUNE = os.environ.get('CREDIT_TUNE')
+
 BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 RAW = os.path.join(BASE, 'data', 'raw', 'credit_risk.csv')
-PROCESSED = os.path.join(BASE, 'data', 'processed', 'credit_risk_processed.csv')
+PROCESSED = os.path.join(BASE, 'data', 'processed', 'credit_risk_processed.parquet')
 VIZ = os.path.join(BASE, 'visualizations')
+SEARCH_DIR = os.path.join(BASE, 'data', 'processed', 'search')
 os.makedirs(VIZ, exist_ok=True)
 os.makedirs(os.path.join(BASE, 'data', 'processed'), exist_ok=True)
 
@@ -57,68 +72,75 @@ def main():
     X_train_sc = scaler.fit_transform(X_train)
     X_test_sc = scaler.transform(X_test)
 
-    # SMOTE to balance training set (only on train to avoid leakage)
-    try:
-        smote = SMOTE(random_state=RANDOM_STATE, k_neighbors=5)
-        X_train_sm, y_train_sm = smote.fit_resample(X_train_sc, y_train)
-        print(f"After SMOTE: train {len(y_train_sm)} (defaults: {y_train_sm.sum()})")
-    except Exception:
-        X_train_sm, y_train_sm = X_train_sc, y_train
-        print("SMOTE skipped (fallback to original)")
-
-    # Logistic Regression (trained on SMOTE-balanced data)
-    lr = LogisticRegression(max_iter=1000, random_state=RANDOM_STATE)
+    # Class imbalance (train only, to avoid leakage): CREDIT_RESAMPLING selects the strategy
+    X_train_sm, y_train_sm, class_weight = resample(DEFAULT_STRATEGY, X_train_sc, y_train, n_jobs=-1,
+                                                    random_state=RANDOM_STATE)
+    print(f"Resampling: {DEFAULT_STRATEGY} | train {len(y_train_sm)} (defaults: {int(y_train_sm.sum())})")
+
+    evaluator = Evaluator(X_test_sc, y_test, cost_fp=COST_FALSE_POSITIVE, cost_fn=COST_FALSE_NEGATIVE)
+
+    # Logistic Regression
+    lr = make_model('logistic', RANDOM_STATE, class_weight=class_weight)
     lr.fit(X_train_sm, y_train_sm)
-    y_pred_lr = lr.predict(X_test_sc)
+    ev_lr = evaluator.evaluate('lr', lr)
     print("\n--- Logistic Regression ---")
-    print(classification_report(y_test, y_pred_lr))
-    print("ROC-AUC:", round(roc_auc_score(y_test, lr.predict_proba(X_test_sc)[:, 1]), 4))
-
-    # Random Forest (trained on SMOTE-balanced data)
-    rf = RandomForestClassifier(n_estimators=100, random_state=RANDOM_STATE)
-    rf.fit(X_train_sm, y_train_sm)
-    y_pred_rf = rf.predict(X_test_sc)
-    print("\n--- Random Forest ---")
-    print(classification_report(y_test, y_pred_rf))
-    print("ROC-AUC:", round(roc_auc_score(y_test, rf.predict_proba(X_test_sc)[:, 1]), 4))
-
-    # Threshold tuning: find best F1 for default class
-    proba = rf.predict_proba(X_test_sc)[:, 1]
-    best_thresh, best_f1 = 0.5, 0
-    for thresh in np.arange(0.2, 0.6, 0.02):
-        pred = (proba >= thresh).astype(int)
-        f1 = f1_score(y_test, pred, pos_label=1, zero_division=0)
-        if f1 > best_f1:
-            best_f1, best_thresh = f1, thresh
-    y_pred_opt = (proba >= best_thresh).astype(int)
+    print(ev_lr.report())
+    print("ROC-AUC:", round(ev_lr.auc, 4))
+
+    # Tree engine (all cores). Trees ignore feature scale, so they train on raw features
+    # unless SMOTE synthesized rows in standardized space.
+    tree_scaled = DEFAULT_STRATEGY in SYNTHETIC_STRATEGIES
+    if tree_scaled:
+        X_tree, y_tree, X_tree_test = X_train_sm, y_train_sm, X_test_sc
+    else:
+        X_tree, y_tree, X_tree_test = X_train.to_numpy(np.float32), y_train, X_test.to_numpy(np.float32)
+    params = {}
+    if TUNE:
+        # Tune on real rows only (no synthetic rows in validation); class weights stand in for resampling
+        print(f"\n--- Tuning {ENGINE} ({TUNE}) ---")
+        params, _ = search(ENGINE, X_train_sc if tree_scaled else X_tree, y_train, os.path.join(SEARCH_DIR, ENGINE),
+                           fixed={'class_weight': 'balanced'}, method=TUNE, random_state=RANDOM_STATE)
+        print("Best params:", params)
+    if ENGINE == 'random_forest':
+        model = make_forest(DEFAULT_STRATEGY, n_estimators=100, n_jobs=-1, random_state=RANDOM_STATE, **params)
+    else:
+        model = make_model(ENGINE, RANDOM_STATE, n_jobs=-1, class_weight=class_weight, **params)
+    model.fit(X_tree, y_tree)
+    ev_model = evaluator.evaluate(ENGINE, model, X_tree_test)
+    label = ENGINE_LABELS[ENGINE]
+    print(f"\n--- {label} ({n_iterations(model)} iterations) ---")
+    print(ev_model.report())
+    print("ROC-AUC:", round(ev_model.auc, 4))
+
+    # Threshold tuning: best F1 for default class over every distinct score in range
+    best_thresh, best_f1 = ev_model.best_threshold('f1', THRESHOLD_RANGE)
+    y_pred_opt = ev_model.predict(best_thresh)
     print(f"\n--- Optimized threshold {best_thresh:.2f} (F1 default={best_f1:.3f}) ---")
-    print(classification_report(y_test, y_pred_opt))
-
-    # Feature importance
-    imp = pd.Series(rf.feature_importances_, index=X.columns).sort_values(ascending=False)
-    fig, ax = plt.subplots(figsize=(8, 5))
-    imp.plot(kind='barh', ax=ax)
-    ax.set_title('Credit Risk: Feature Importance (Random Forest)')
-    plt.tight_layout()
-    plt.savefig(os.path.join(VIZ, 'feature_importance.png'), dpi=100)
-    plt.close()
-
-    # Confusion matrix (use optimized threshold)
+    print(ev_model.report(best_thresh))
+    cost_thresh, min_cost = ev_model.best_threshold('cost', THRESHOLD_RANGE)
+    print(f"Cost-optimal threshold {cost_thresh:.2f} (FN cost {COST_FALSE_NEGATIVE:g}, "
+          f"FP cost {COST_FALSE_POSITIVE:g}): total cost {min_cost:.0f}")
+
+    # Persist scaler (if the model uses it) + model + threshold for scripts/scoring_server.py
+    version = save_artifact(scaler if tree_scaled else None, model, best_thresh, X_train, metrics={
+        'roc_auc': ev_model.auc, 'f1_default': best_f1, 'cost_threshold': cost_thresh,
+    })
+    print("Saved model artifact:", version)
+
+    # Feature importance and confusion matrix (optimized threshold), rendered unless unchanged
+    imp = feature_importance(model, X.columns, X_tree_test, y_test, RANDOM_STATE)
     cm = confusion_matrix(y_test, y_pred_opt)
-    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues')
-    plt.xlabel('Predicted'); plt.ylabel('Actual'); plt.title(f'Confusion Matrix (RF, thresh={best_thresh:.2f})')
-    plt.tight_layout()
-    plt.savefig(os.path.join(VIZ, 'confusion_matrix.png'), dpi=100)
-    plt.close()
-
-    # Save processed with risk scores
-    default_prob = rf.predict_proba(scaler.transform(X))[:, 1]
-    risk_tier = pd.cut(default_prob, bins=[0, 0.2, 0.5, 0.8, 1], labels=['Low', 'Medium', 'High', 'Critical'])
-    df_out = X.copy()
-    df_out['default_prob'] = default_prob
-    df_out['risk_tier'] = risk_tier
-    df_out['target'] = y.values
-    df_out.to_csv(PROCESSED, index=False)
+    short = ''.join(w[0] for w in label.split()).upper()
+    render([
+        Chart(os.path.join(VIZ, 'feature_importance.png'), plot_feature_importance,
+              {'imp': imp, 'title': f'Credit Risk: Feature Importance ({label})'}),
+        Chart(os.path.join(VIZ, 'confusion_matrix.png'), plot_confusion_matrix,
+              {'cm': cm, 'title': f'Confusion Matrix ({short}, thresh={best_thresh:.2f})'}),
+    ])
+
+    # Score the full population chunk by chunk into Parquet with the saved artifact
+    rows = score_to_parquet(load_artifact(version), X, PROCESSED, extra_columns={'target': y.to_numpy()})
+    print(f"Scored {rows} rows -> {os.path.basename(PROCESSED)}")
     print("\nDone. Outputs:", PROCESSED, VIZ)
 
 if __name__ == '__main__':
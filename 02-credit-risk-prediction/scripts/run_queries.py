@@ -0,0 +1,68 @@
+"""
+Run the credit-risk queries in sql/queries.sql against an embedded SQLite database.
+application_train and bureau are loaded from the Home Credit CSVs (see load_home_credit.get_data_path),
+credit_risk from data/raw/credit_risk.csv; only the columns declared in sql/database_schema.sql
+are loaded, each table only when its CSV changes. Queries on a table whose CSV is not available
+are skipped; query results are cached until their tables are reloaded.
+
+Run from project root:
+    python scripts/run_queries.py                  # all queries
+    python scripts/run_queries.py bureau           # queries whose name contains a word
+    python scripts/run_queries.py --home-credit /path/to/home-credit-default-risk
+"""
+import os
+import re
+import sys
+import time
+import argparse
+
+from load_home_credit import get_data_path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.sql_runner import QueryRunner
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW_SAMPLE = os.path.join(BASE, 'data', 'raw', 'credit_risk.csv')
+DB = os.path.join(BASE, 'data', 'processed', 'credit_risk.sqlite')
+SQL = os.path.join(BASE, 'sql')
+
+def source_tables(home_credit, sample):
+    """{table: csv path} of every table the queries read."""
+    return {
+        'application_train': os.path.join(home_credit, 'application_train.csv'),
+        'bureau': os.path.join(home_credit, 'bureau.csv'),
+        'credit_risk': sample,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Credit-risk queries (SQLite)')
+    parser.add_argument('names', nargs='*', help='run only queries whose name contains one of these')
+    parser.add_argument('--home-credit', default=get_data_path(), help='folder with the Home Credit CSVs')
+    parser.add_argument('--csv', default=RAW_SAMPLE, help='credit_risk source CSV')
+    parser.add_argument('--db', default=DB)
+    parser.add_argument('--reload', action='store_true', help='reload tables even if their CSV is unchanged')
+    parser.add_argument('--list', action='store_true', help='list query names and exit')
+    args = parser.parse_args()
+
+    sources = source_tables(args.home_credit, args.csv)
+    available = {t: fp for t, fp in sources.items() if os.path.exists(fp)}
+    missing = [t for t in sources if t not in available]
+    runner = QueryRunner(args.db, available, os.path.join(SQL, 'queries.sql'),
+                         os.path.join(SQL, 'database_schema.sql'))
+    if args.list:
+        print('\n'.join(runner.queries))
+        return
+    for table in missing:
+        print(f"{table}: {sources[table]} not found; its queries are skipped")
+    t0 = time.perf_counter()
+    loaded = runner.load(force=args.reload)
+    for table, rows in loaded.items():
+        print(f"Loaded {table}: {rows:,} rows in {(time.perf_counter() - t0) * 1000:.0f} ms")
+    names = [n for n in runner.queries
+             if (not args.names or any(w.lower() in n.lower() for w in args.names))
+             and not any(re.search(rf'\b{t}\b', runner.queries[n]) for t in missing)]
+    runner.run_all(names)
+    runner.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""
+Local credit-risk scoring server (asyncio, HTTP/1.1 keep-alive, JSON).
+Concurrent requests are micro-batched: rows arriving within MAX_WAIT_MS (up to
+MAX_BATCH_ROWS) are scored with a single predict_proba call.
+
+    python scripts/scoring_server.py [--port 8765] [--version <artifact version>]
+
+POST /score  {"rows": [{"AGE": 35, "AMT_CREDIT": 450000, ...}, ...]}
+          -> {"version": ..., "default_prob": [...], "risk_tier": [...], "predicted_default": [...]}
+GET  /health -> {"status": "ok", "version": ...}
+"""
+import json
+import time
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from risk_scoring import load_artifact, risk_tier_labels
+
+MAX_BATCH_ROWS = 512
+MAX_WAIT_MS = 2.0
+
+class MicroBatcher:
+    """Collects concurrent scoring requests into one model call."""
+
+    def __init__(self, model, max_batch_rows=MAX_BATCH_ROWS, max_wait_ms=MAX_WAIT_MS):
+        self.model = model
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        # One model thread: predict_proba runs off the event loop, batches never overlap
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.batches = 0
+        self.rows = 0
+
+    async def score(self, X):
+        fut = asyncio.get_running_loop().create_future()
+        await self.queue.put((X, fut))
+        return await fut
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self.queue.get()]
+            n_rows = len(pending[0][0])
+            deadline = loop.time() + self.max_wait
+            while n_rows < self.max_batch_rows:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                n_rows += len(item[0])
+            # A client that disconnected or timed out leaves a cancelled future: skip it, and
+            # never set a result on one - InvalidStateError would end this loop for good
+            pending = [(x, fut) for x, fut in pending if not fut.done()]
+            if not pending:
+                continue
+            X = np.vstack([x for x, _ in pending])
+            try:
+                prob = await loop.run_in_executor(self.executor, self.model.predict_proba, X)
+            except Exception as e:
+                for _, fut in pending:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            self.batches += 1
+            self.rows += len(X)
+            start = 0
+            for x, fut in pending:
+                if not fut.done():
+                    fut.set_result(prob[start:start + len(x)])
+                start += len(x)
+
+class ScoringServer:
+    """Minimal HTTP front end for a MicroBatcher."""
+
+    def __init__(self, model, **batch_kwargs):
+        self.model = model
+        self.batcher = MicroBatcher(model, **batch_kwargs)
+
+    async def handle_score(self, body):
+        rows = json.loads(body or b'{}').get('rows')
+        if not rows:
+            return 400, {'error': 'body must be {"rows": [{feature: value, ...}, ...]}'}
+        prob = await self.batcher.score(self.model.matrix(rows))
+        return 200, {
+            'version': self.model.version,
+            'default_prob': prob.round(6).tolist(),
+            'risk_tier': risk_tier_labels(prob).tolist(),
+            'predicted_default': (prob >= self.model.threshold).astype(int).tolist(),
+        }
+
+    async def route(self, method, target, body):
+        """(status, payload); anything but a malformed request body is a 500, never a dropped connection."""
+        try:
+            return await self._route(method, target, body)
+        except Exception as e:
+            print(f"500 on {method} {target}: {e!r}", flush=True)
+            return 500, {'error': f'{type(e).__name__}: {e}'}
+
+    async def _route(self, method, target, body):
+        if method == 'POST' and target == '/score':
+            try:
+                return await self.handle_score(body)
+            except (ValueError, TypeError, AttributeError) as e:
+                return 400, {'error': str(e)}
+        if method == 'GET' and target == '/health':
+            return 200, {'status': 'ok', 'version': self.model.version,
+                         'batches': self.batcher.batches, 'rows': self.batcher.rows}
+        return 404, {'error': f'no route {method} {target}'}
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                status, payload = await self.route(method, target, body)
+                data = json.dumps(payload).encode()
+                reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}[status]
+                writer.write(f'HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n'
+                             f'Content-Length: {len(data)}\r\n\r\n'.encode() + data)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765):
+        batch_task = asyncio.create_task(self.batcher.run())
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog=1024)
+        print(f"Scoring model {self.model.version} on http://{host}:{port}", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batch_task.cancel()
+
+def main():
+    parser = argparse.ArgumentParser(description='Credit-risk scoring server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--version', help='artifact version (default: LATEST)')
+    parser.add_argument('--max-batch-rows', type=int, default=MAX_BATCH_ROWS)
+    parser.add_argument('--max-wait-ms', type=float, default=MAX_WAIT_MS)
+    args = parser.parse_args()
+    t0 = time.perf_counter()
+    model = load_artifact(args.version)
+    model.predict_proba(model.matrix([{}]))  # warm up before accepting traffic
+    print(f"Loaded {model.version} ({model.metadata.get('model_class')}) in {time.perf_counter() - t0:.2f}s")
+    server = ScoringServer(model, max_batch_rows=args.max_batch_rows, max_wait_ms=args.max_wait_ms)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
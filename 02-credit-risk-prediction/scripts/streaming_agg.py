@@ -0,0 +1,160 @@
+"""
+Streaming single-pass group-by aggregation.
+Running state lives in NumPy arrays aligned with a sorted array of group keys;
+each chunk is reduced with vectorized sort + reduceat and folded into that state,
+so memory is bounded by chunk size plus one slot per distinct key.
+"""
+import numpy as np
+import pandas as pd
+
+# State each reducer needs; "mean" is derived from sum and count in result()
+STATS = {
+    "count": ("count",),
+    "sum": ("sum",),
+    "max": ("max",),
+    "min": ("min",),
+    "mean": ("sum", "count"),
+}
+
+def _acc_dtype(values):
+    """Accumulate integers/bools exactly in int64, everything else in float64."""
+    return np.int64 if values.dtype.kind in "biu" else np.float64
+
+def _reduce(stat, values, starts, sizes):
+    """Per-group reduction of values already sorted by key; starts/sizes delimit groups."""
+    floating = values.dtype.kind == "f"
+    if stat == "count":
+        return np.add.reduceat((~np.isnan(values)).astype(np.int64), starts) if floating else sizes.astype(np.int64)
+    values = values.astype(_acc_dtype(values), copy=False)
+    if stat == "sum":
+        return np.add.reduceat(np.nan_to_num(values, nan=0.0) if floating else values, starts)
+    if stat == "max":
+        return (np.fmax if floating else np.maximum).reduceat(values, starts)
+    if stat == "min":
+        return (np.fmin if floating else np.minimum).reduceat(values, starts)
+    raise ValueError(f"Unknown reducer: {stat}")
+
+def _combine(stat, a, b):
+    if stat in ("count", "sum"):
+        return a + b
+    if stat == "max":
+        return np.fmax(a, b)
+    return np.fmin(a, b)
+
+def chunk_rows(dtypes, memory_mb, overhead=4):
+    """Rows per chunk that keep a chunk and its sort buffers within memory_mb."""
+    row_bytes = sum(1 if str(dt) == "category" else np.dtype(dt).itemsize for dt in dtypes)
+    # argsort indices + gathered copies of every column (in their accumulator dtype)
+    per_row = row_bytes + 8 + overhead * 8 * len(dtypes)
+    return max(10_000, int(memory_mb * 1024 * 1024 // per_row))
+
+class StreamingAggregator:
+    """Group-by aggregate over a stream of chunks with count/sum/max/min/mean reducers.
+
+    reducers maps output column -> (input column, reducer), like pandas named aggregation.
+    Results match a single groupby over the concatenated chunks (NaN keys are dropped,
+    NaN values are skipped).
+    """
+
+    def __init__(self, key, reducers):
+        self.key = key
+        self.reducers = reducers
+        self.keys = None
+        self.state = {}
+        self.rows = 0
+
+    def _needed(self):
+        needed = []
+        for col, op in self.reducers.values():
+            if op not in STATS:
+                raise ValueError(f"Unknown reducer: {op}")
+            needed += [(col, stat) for stat in STATS[op] if (col, stat) not in needed]
+        return needed
+
+    def update(self, chunk):
+        """Fold a DataFrame (or dict of arrays) into the running state."""
+        keys = np.asarray(chunk[self.key])
+        columns = {col: np.asarray(chunk[col]) for col, _ in self.reducers.values()}
+        if keys.dtype.kind == "f":
+            valid = ~np.isnan(keys)
+            if not valid.all():
+                keys = keys[valid]
+                columns = {col: v[valid] for col, v in columns.items()}
+        self.rows += len(keys)
+        if len(keys) == 0:
+            return self
+
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        sizes = np.diff(np.r_[starts, len(sorted_keys)])
+        uniq = sorted_keys[starts]
+        gathered = {col: v[order] for col, v in columns.items()}
+        partial = {(col, stat): _reduce(stat, gathered[col], starts, sizes) for col, stat in self._needed()}
+        self._merge(uniq, partial)
+        return self
+
+    def _merge(self, uniq, partial):
+        if self.keys is None:
+            self.keys, self.state = uniq, partial
+            return
+        pos = np.searchsorted(self.keys, uniq)
+        hit = pos < len(self.keys)
+        hit[hit] = self.keys[pos[hit]] == uniq[hit]
+        for (col, stat), arr in partial.items():
+            cur = self.state[(col, stat)]
+            if cur.dtype != arr.dtype:  # e.g. int chunk after float chunk
+                cur = self.state[(col, stat)] = cur.astype(np.result_type(cur, arr))
+            cur[pos[hit]] = _combine(stat, cur[pos[hit]], arr[hit])
+        if not hit.all():
+            miss = ~hit
+            self.keys = np.insert(self.keys, pos[miss], uniq[miss])
+            for s, arr in partial.items():
+                self.state[s] = np.insert(self.state[s], pos[miss], arr[miss])
+
+    def save(self, fp):
+        """Persist keys and running state to an .npz file."""
+        arrays = {} if self.keys is None else {"keys": self.keys}
+        arrays.update({f"{col}:{stat}": arr for (col, stat), arr in self.state.items()})
+        np.savez(fp, rows=np.int64(self.rows), **arrays)
+
+    @classmethod
+    def load(cls, fp, key, reducers):
+        """Restore an aggregator saved with save(); reducers must match."""
+        agg = cls(key, reducers)
+        with np.load(fp) as data:
+            agg.rows = int(data["rows"])
+            if "keys" in data:
+                agg.keys = data["keys"]
+                agg.state = {tuple(name.rsplit(":", 1)): data[name] for name in data.files if ":" in name}
+        if agg.keys is not None and set(agg.state) != set(agg._needed()):
+            raise ValueError(f"{fp}: saved state does not match reducers")
+        return agg
+
+    @property
+    def nbytes(self):
+        """Memory held by the running state."""
+        if self.keys is None:
+            return 0
+        return self.keys.nbytes + sum(a.nbytes for a in self.state.values())
+
+    def result(self):
+        """Aggregates as a DataFrame with one row per key, sorted by key."""
+        if self.keys is None:
+            return None
+        out = {self.key: self.keys}
+        for name, (col, op) in self.reducers.items():
+            if op == "mean":
+                count = self.state[(col, "count")]
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    out[name] = np.where(count > 0, self.state[(col, "sum")] / np.maximum(count, 1), np.nan)
+            else:
+                out[name] = self.state[(col, STATS[op][0])]
+        return pd.DataFrame(out)
+
+def stream_aggregate(chunks, key, reducers):
+    """Run a StreamingAggregator over an iterable of chunks; returns the result frame."""
+    agg = StreamingAggregator(key, reducers)
+    for chunk in chunks:
+        agg.update(chunk)
+    return agg.result()
@@ -0,0 +1,39 @@
+-- Table definitions for the Credit Risk SQL analysis
+-- Used by scripts/run_queries.py (SQLite); portable to PostgreSQL.
+-- Home Credit tables declare only the columns the queries use; the rest of each CSV is not loaded.
+
+-- A. Home Credit Default Risk (application_train.csv, bureau.csv)
+CREATE TABLE application_train (
+    SK_ID_CURR        INT,
+    TARGET            INT,
+    NAME_CONTRACT_TYPE VARCHAR(50),
+    AMT_INCOME_TOTAL  FLOAT,
+    AMT_CREDIT        FLOAT,
+    AMT_ANNUITY       FLOAT,
+    EXT_SOURCE_2      FLOAT
+);
+
+CREATE TABLE bureau (
+    SK_ID_CURR     INT,
+    SK_ID_BUREAU   INT,
+    CREDIT_ACTIVE  VARCHAR(20),
+    AMT_CREDIT_SUM FLOAT
+);
+
+-- B. Sample credit_risk table (scripts/generate_sample_data.py)
+CREATE TABLE credit_risk (
+    credit_score      INT,
+    annual_income     INT,
+    loan_amount       INT,
+    employment_years  INT,
+    debt_to_income    FLOAT,
+    num_open_accounts INT,
+    delinquencies_2y  INT,
+    has_mortgage      INT,
+    "default"         INT
+);
+
+-- Indexes for joins and common filters
+CREATE INDEX idx_app_id ON application_train(SK_ID_CURR);
+CREATE INDEX idx_bureau_id ON bureau(SK_ID_CURR);
+CREATE INDEX idx_credit_default ON credit_risk("default");
@@ -1,11 +1,11 @@
 -- Credit Risk & Loan Default - SQL Analysis
 -- Supports both: (A) Home Credit schema, (B) Simple credit_risk table
+-- Run with scripts/run_queries.py; queries on tables whose CSV is not available are skipped
 
 -- =============================================================================
 -- A. Home Credit Default Risk - application_train
 -- =============================================================================
--- Default rate by external score band (EXT_SOURCE_2)
-/*
+-- 1. Default rate by external score band (EXT_SOURCE_2)
 SELECT
     CASE
         WHEN EXT_SOURCE_2 < 0.3 THEN 'Low (<0.3)'
@@ -19,10 +19,8 @@ FROM application_train
 WHERE EXT_SOURCE_2 IS NOT NULL
 GROUP BY score_band
 ORDER BY MIN(EXT_SOURCE_2);
-*/
 
--- Default rate by income band
-/*
+-- 2. Default rate by income band
 SELECT
     CASE
         WHEN AMT_INCOME_TOTAL < 100000 THEN 'Low (<100k)'
@@ -35,13 +33,11 @@ SELECT
 FROM application_train
 GROUP BY income_band
 ORDER BY MIN(AMT_INCOME_TOTAL);
-*/
 
--- Bureau: default rate by number of prior credits
-/*
+-- 3. Bureau: default rate by number of prior credits
 SELECT
     CASE
-        WHEN b.cnt_credits = 0 THEN '0'
+        WHEN COALESCE(b.cnt_credits, 0) = 0 THEN '0'
         WHEN b.cnt_credits <= 5 THEN '1-5'
         WHEN b.cnt_credits <= 10 THEN '6-10'
         ELSE '11+'
@@ -56,14 +52,12 @@ LEFT JOIN (
     GROUP BY SK_ID_CURR
 ) b ON a.SK_ID_CURR = b.SK_ID_CURR
 GROUP BY bureau_credits_band
-ORDER BY bureau_credits_band;
-*/
+ORDER BY MIN(COALESCE(b.cnt_credits, 0));
 
 -- =============================================================================
 -- B. Simple credit_risk table (synthetic/sample schema)
 -- =============================================================================
--- Default rate by credit score band
-/*
+-- 4. Default rate by credit score band
 SELECT
     CASE
         WHEN credit_score < 580 THEN 'Poor (<580)'
@@ -72,9 +66,8 @@ SELECT
         ELSE 'Excellent (740+)'
     END AS credit_band,
     COUNT(*) AS total,
-    SUM(default) AS defaults,
-    ROUND(100.0 * SUM(default) / COUNT(*), 2) AS default_rate_pct
+    SUM("default") AS defaults,
+    ROUND(100.0 * SUM("default") / COUNT(*), 2) AS default_rate_pct
 FROM credit_risk
 GROUP BY credit_band
 ORDER BY MIN(credit_score);
-*/
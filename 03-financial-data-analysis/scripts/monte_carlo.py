@@ -0,0 +1,185 @@
+"""
+Monte Carlo return scenarios from the historical return series.
+    bootstrap   circular block bootstrap of historical returns (keeps short-range dependence)
+    garch       GARCH(1,1) fitted by Gaussian quasi-maximum likelihood; innovations are
+                resampled standardized residuals (filtered historical simulation)
+Paths are simulated in batches of BATCH_PATHS, so memory does not grow with the path count.
+A batch is reduced to histograms - log wealth per step and maximum drawdown per path - that
+add across batches; percentile bands are read from the merged histograms. Batches run on a
+process pool, and batch i always draws from SeedSequence(seed).spawn(n_batches)[i], so the
+result is identical for any number of workers.
+
+Run from project root:
+    python scripts/monte_carlo.py [--paths 1000000 --horizon 120 --model garch]
+    python scripts/monte_carlo.py benchmark --paths 1000000 --jobs 1 2 4
+"""
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+
+BATCH_PATHS = 50_000
+BLOCK_MONTHS = 12
+LOG_WEALTH_RANGE = (-6.0, 6.0)  # wealth from 0.25% to 400x of the start; beyond is clipped
+LOG_WEALTH_BINS = 4_000
+DRAWDOWN_BINS = 1_000
+PERCENTILES = (5, 25, 50, 75, 95)
+
+def fit_garch(returns):
+    """{'mu', 'omega', 'alpha', 'beta', 'sigma2_last', 'residuals'} for a GARCH(1,1) on returns."""
+    r = np.asarray(returns, dtype=np.float64)
+    mu = r.mean()
+    e = r - mu
+    var = e.var()
+
+    def variances(params):
+        omega, alpha, beta = params
+        s2 = np.empty(len(e) + 1)
+        s2[0] = var
+        for t in range(len(e)):
+            s2[t + 1] = omega + alpha * e[t] ** 2 + beta * s2[t]
+        return s2
+
+    def neg_loglik(params):
+        if params[1] + params[2] >= 0.999:
+            return 1e10
+        s2 = variances(params)[:-1]
+        return 0.5 * np.sum(np.log(s2) + e ** 2 / s2)
+
+    fit = minimize(neg_loglik, [var * 0.1, 0.1, 0.8], method='L-BFGS-B',
+                   bounds=[(1e-12, var), (0.0, 0.5), (0.0, 0.999)])
+    s2 = variances(fit.x)
+    omega, alpha, beta = fit.x
+    return {'mu': mu, 'omega': omega, 'alpha': alpha, 'beta': beta, 'sigma2_last': s2[-1],
+            'residuals': e / np.sqrt(s2[:-1])}
+
+def bootstrap_batch(returns, n_paths, horizon, rng, block=BLOCK_MONTHS):
+    """(n_paths, horizon) returns made of random circular blocks of the history."""
+    n = len(returns)
+    n_blocks = -(-horizon // block)
+    starts = rng.integers(0, n, (n_paths, n_blocks, 1))
+    idx = (starts + np.arange(block)) % n
+    return returns[idx.reshape(n_paths, -1)[:, :horizon]]
+
+def garch_batch(params, n_paths, horizon, rng):
+    """(n_paths, horizon) returns from the fitted GARCH(1,1), starting at the last fitted variance."""
+    z = params['residuals'][rng.integers(0, len(params['residuals']), (horizon, n_paths))]
+    s2 = np.full(n_paths, params['sigma2_last'])
+    out = np.empty((horizon, n_paths))
+    for t in range(horizon):
+        e = np.sqrt(s2) * z[t]
+        out[t] = params['mu'] + e
+        s2 = params['omega'] + params['alpha'] * e * e + params['beta'] * s2
+    return out.T
+
+def _summarize(returns, bins=LOG_WEALTH_BINS):
+    """Mergeable summary of a batch: log-wealth counts per step and max-drawdown counts."""
+    n_paths, horizon = returns.shape
+    log_wealth = np.cumsum(np.log1p(np.maximum(returns, -0.999)), axis=1)
+    lo, hi = LOG_WEALTH_RANGE
+    b = np.clip(((log_wealth - lo) / (hi - lo) * bins).astype(np.int64), 0, bins - 1)
+    wealth_counts = np.bincount((b + np.arange(horizon) * bins).ravel(), minlength=horizon * bins)
+    peak = np.maximum(np.maximum.accumulate(log_wealth, axis=1), 0.0)  # start wealth 1 is a peak
+    max_dd = np.expm1((log_wealth - peak).min(axis=1))
+    dd_counts = np.bincount(np.clip(((max_dd + 1) * DRAWDOWN_BINS).astype(np.int64), 0, DRAWDOWN_BINS - 1),
+                            minlength=DRAWDOWN_BINS)
+    return wealth_counts.reshape(horizon, bins), dd_counts
+
+_MODEL = {}
+
+def _init_worker(model, source):
+    _MODEL['model'] = model
+    _MODEL['source'] = source
+
+def _run_batch(seed_seq, n_paths, horizon):
+    rng = np.random.default_rng(seed_seq)
+    if _MODEL['model'] == 'garch':
+        returns = garch_batch(_MODEL['source'], n_paths, horizon, rng)
+    else:
+        returns = bootstrap_batch(_MODEL['source'], n_paths, horizon, rng)
+    return _summarize(returns)
+
+def _quantiles(counts, edges, qs):
+    """Quantiles (0-100) from histogram counts, interpolated linearly inside the bin."""
+    cdf = np.cumsum(counts) / counts.sum()
+    return np.interp(np.asarray(qs) / 100, cdf, edges[1:])
+
+def simulate(returns, n_paths=1_000_000, horizon=120, model='bootstrap', n_jobs=None, seed=42,
+             batch_paths=BATCH_PATHS):
+    """Simulate n_paths wealth paths of `horizon` steps; returns (bands, drawdowns, stats).
+
+    bands: DataFrame of wealth percentiles per step (1.0 = start). drawdowns: percentiles of
+    the per-path maximum drawdown. stats: paths, seconds, paths_per_s and p_loss (share of
+    paths ending below the start).
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    if model == 'garch':
+        source = fit_garch(returns)
+    elif model == 'bootstrap':
+        source = returns
+    else:
+        raise ValueError(f"Unknown model: {model} (choose bootstrap or garch)")
+    sizes = [min(batch_paths, n_paths - start) for start in range(0, n_paths, batch_paths)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    wealth_counts, dd_counts = 0, 0
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=n_jobs or os.cpu_count(), initializer=_init_worker,
+                             initargs=(model, source)) as pool:
+        for wc, dc in pool.map(_run_batch, seeds, sizes, [horizon] * len(sizes)):
+            wealth_counts = wealth_counts + wc
+            dd_counts = dd_counts + dc
+    seconds = time.perf_counter() - t0
+
+    lo, hi = LOG_WEALTH_RANGE
+    edges = np.linspace(lo, hi, LOG_WEALTH_BINS + 1)
+    bands = pd.DataFrame([np.exp(_quantiles(row, edges, PERCENTILES)) for row in wealth_counts],
+                         index=pd.RangeIndex(1, horizon + 1, name='step'), columns=[f'p{q}' for q in PERCENTILES])
+    dd_edges = np.linspace(-1, 0, DRAWDOWN_BINS + 1)
+    drawdowns = pd.Series(_quantiles(dd_counts, dd_edges, PERCENTILES), index=[f'p{q}' for q in PERCENTILES],
+                          name='max_drawdown')
+    stats = {'paths': n_paths, 'seconds': seconds, 'paths_per_s': n_paths / seconds,
+             'p_loss': wealth_counts[-1][:np.searchsorted(edges, 0.0)].sum() / n_paths}
+    return bands, drawdowns, stats
+
+def load_returns():
+    """Monthly returns of the analysis price column, read through run_analysis."""
+    from run_analysis import load_filtered_data
+    df = load_filtered_data()
+    price_col = "Real Price" if "Real Price" in df.columns else "SP500"
+    return df[price_col].dropna().pct_change().dropna().to_numpy()
+
+def benchmark(returns, n_paths, horizon, jobs, model):
+    print(f"{n_paths:,} paths x {horizon} steps, model {model}, batches of {BATCH_PATHS:,}")
+    print(f"{'workers':>8}{'seconds':>10}{'paths/s':>14}{'speedup':>9}{'median':>9}")
+    base = None
+    for n_jobs in jobs:
+        bands, _, stats = simulate(returns, n_paths, horizon, model, n_jobs)
+        base = base or stats['seconds']
+        print(f"{n_jobs:>8}{stats['seconds']:>10.1f}{stats['paths_per_s']:>14,.0f}{base / stats['seconds']:>9.2f}"
+              f"{bands['p50'].iloc[-1]:>9.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Monte Carlo return scenarios')
+    parser.add_argument('command', nargs='?', default='run', choices=['run', 'benchmark'])
+    parser.add_argument('--paths', type=int, default=1_000_000)
+    parser.add_argument('--horizon', type=int, default=120, help='steps (months for filtered_data.csv)')
+    parser.add_argument('--model', default='bootstrap', choices=['bootstrap', 'garch'])
+    parser.add_argument('--jobs', type=int, nargs='+', default=[os.cpu_count()])
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    returns = load_returns()
+    if args.command == 'benchmark':
+        benchmark(returns, args.paths, args.horizon, args.jobs, args.model)
+        return
+    bands, drawdowns, stats = simulate(returns, args.paths, args.horizon, args.model, args.jobs[0], args.seed)
+    print(f"{stats['paths']:,} paths in {stats['seconds']:.1f}s ({stats['paths_per_s']:,.0f} paths/s)")
+    print(f"Wealth after {args.horizon} steps:\n{bands.iloc[-1].round(3).to_string()}")
+    print(f"P(loss) {stats['p_loss']:.1%}\nMaximum drawdown:\n{drawdowns.round(3).to_string()}")
+
+if __name__ == '__main__':
+    main()
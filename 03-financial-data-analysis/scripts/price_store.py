@@ -0,0 +1,317 @@
+"""
+Local date-partitioned price store.
+One partition per symbol-year: <root>/<symbol>/<year>/ holds date.npy (datetime64[D]) and
+values.npy (rows x columns, Fortran order, so each column is contiguous on disk), opened with
+mmap_mode="r" - a range read touches only the years it spans and copies only the rows and
+columns it asks for. Appends rewrite just the partitions they touch. Sparse series (monthly
+and slower) use one partition per decade so files do not shrink to a dozen rows.
+meta.json per symbol records columns, dtype, the allowed gap between observations and the
+date range already fetched, so sync() asks a fetcher only for what is missing.
+
+Fetchers implement fetch(symbols, start, end) -> {symbol: DataFrame indexed by date}:
+    YFinanceFetcher   Yahoo Finance daily closes (network)
+    CsvFetcher        <directory>/<symbol>.csv - local stand-in, no network
+A symbol left out of the result failed to download; an empty frame means the source has no rows.
+
+Run from project root:
+    python scripts/price_store.py sync AAPL MSFT --start 2022-01-01 --end 2024-12-31 [--source-dir dir]
+    python scripts/price_store.py info
+"""
+import os
+import json
+import shutil
+import argparse
+
+import numpy as np
+import pandas as pd
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STORE_ROOT = os.path.join(BASE, 'data', 'processed', 'price_store')
+
+class GapError(ValueError):
+    """Consecutive appended observations are further apart than the symbol allows."""
+
+def _day(value):
+    return np.datetime64(pd.Timestamp(value).date(), 'D')
+
+def file_version(fp):
+    """Changes whenever the file is replaced or modified."""
+    st = os.stat(fp)
+    return f"{os.path.abspath(fp)}:{st.st_size}:{st.st_mtime_ns}"
+
+def _default_max_gap(dates):
+    """Largest normal spacing in days: weekend + holiday for daily data, 1.5x the median otherwise."""
+    if len(dates) < 2:
+        return 4
+    median = float(np.median(np.diff(dates).astype(np.int64)))
+    return 4 if median <= 3 else int(np.ceil(median * 1.5))
+
+class PriceStore:
+    def __init__(self, root=STORE_ROOT):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def symbols(self):
+        return sorted(s for s in os.listdir(self.root) if os.path.exists(self._meta_path(s)))
+
+    def _meta_path(self, symbol):
+        return os.path.join(self.root, symbol, 'meta.json')
+
+    def meta(self, symbol):
+        fp = self._meta_path(symbol)
+        if not os.path.exists(fp):
+            return None
+        with open(fp) as f:
+            return json.load(f)
+
+    def _write_meta(self, symbol, meta):
+        fp = self._meta_path(symbol)
+        with open(fp + '.tmp', 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(fp + '.tmp', fp)
+
+    def _years(self, symbol):
+        d = os.path.join(self.root, symbol)
+        return sorted(int(y) for y in os.listdir(d) if y.isdigit())
+
+    def _read_partition(self, symbol, year):
+        """(dates, values) memmaps of one partition."""
+        d = os.path.join(self.root, symbol, str(year))
+        return np.load(os.path.join(d, 'date.npy'), mmap_mode='r'), np.load(os.path.join(d, 'values.npy'), mmap_mode='r')
+
+    def _write_partition(self, symbol, year, dates, values):
+        d = os.path.join(self.root, symbol, str(year))
+        tmp = d + '.tmp'
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        np.save(os.path.join(tmp, 'date.npy'), dates)
+        np.save(os.path.join(tmp, 'values.npy'), np.asfortranarray(values))
+        shutil.rmtree(d, ignore_errors=True)
+        os.replace(tmp, d)
+
+    def append(self, symbol, frame, max_gap_days=None, allow_gaps=False, source=None):
+        """Add rows newer than the stored data; returns the number of rows added.
+
+        frame is indexed by date with one column per field. Rows on or before the last stored
+        date are ignored (the store is append-only); of duplicate dates the last row wins. A jump
+        between consecutive dates larger than the symbol's max_gap_days raises GapError unless
+        allow_gaps.
+        """
+        frame = frame.copy()
+        frame.index = pd.DatetimeIndex(frame.index).normalize()
+        frame = frame[~frame.index.isna()].sort_index(kind='stable')
+        frame = frame[~frame.index.duplicated(keep='last')]
+        dates = frame.index.values.astype('datetime64[D]')
+        meta = self.meta(symbol)
+        if meta is None:
+            os.makedirs(os.path.join(self.root, symbol), exist_ok=True)
+            max_gap_days = max_gap_days or _default_max_gap(dates)
+            meta = {'columns': list(frame.columns), 'dtype': 'float64', 'first': None, 'last': None,
+                    'max_gap_days': max_gap_days, 'partition_years': 1 if max_gap_days <= 7 else 10,
+                    'rows': 0, 'fetched': None, 'source': None}
+        new = dates > np.datetime64(meta['last']) if meta['last'] else np.ones(len(dates), dtype=bool)
+        dates = dates[new]
+        if len(dates) and not allow_gaps:
+            chain = np.concatenate([[np.datetime64(meta['last'])], dates]) if meta['last'] else dates
+            gaps = np.diff(chain).astype(np.int64)
+            if len(gaps) and gaps.max() > meta['max_gap_days']:
+                i = int(gaps.argmax())
+                raise GapError(f"{symbol}: {gaps[i]} days between {chain[i]} and {chain[i + 1]} "
+                               f"(max {meta['max_gap_days']})")
+        values = frame[meta['columns']].to_numpy(dtype=meta['dtype'])[new]
+        span = meta['partition_years']
+        years = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+        years -= years % span
+        for year in np.unique(years):
+            rows = years == year
+            part_dates, part_values = dates[rows], values[rows]
+            if year in self._years(symbol):  # extend the partial last partition
+                old_dates, old_values = self._read_partition(symbol, year)
+                part_dates = np.concatenate([old_dates, part_dates])
+                part_values = np.concatenate([old_values, part_values])
+            self._write_partition(symbol, year, part_dates, part_values)
+        if len(dates):
+            meta['first'] = meta['first'] or str(dates[0])
+            meta['last'] = str(dates[-1])
+            meta['rows'] += len(dates)
+        if source is not None:
+            meta['source'] = source
+        self._write_meta(symbol, meta)
+        return len(dates)
+
+    def replace(self, symbol, frame, allow_gaps=False, source=None):
+        """Rewrite symbol with frame, keeping its gap limit and fetched range; returns rows written."""
+        old = self.meta(symbol) or {}
+        shutil.rmtree(os.path.join(self.root, symbol), ignore_errors=True)
+        rows = self.append(symbol, frame, old.get('max_gap_days'), allow_gaps, source or old.get('source'))
+        if old.get('fetched'):
+            self.mark_fetched(symbol, *old['fetched'])
+        return rows
+
+    def read(self, symbol, start=None, end=None, columns=None):
+        """Rows with start <= date <= end (inclusive, None = open) as a DataFrame indexed by Date."""
+        meta = self.meta(symbol)
+        if meta is None:
+            raise KeyError(f"{symbol} is not in the price store")
+        columns = columns or meta['columns']
+        idx = [meta['columns'].index(c) for c in columns]
+        span = meta['partition_years']
+        lo = _day(start) if start is not None else None
+        hi = _day(end) if end is not None else None
+        first = lo.astype('datetime64[Y]').astype(int) + 1970 if lo is not None else None
+        last = hi.astype('datetime64[Y]').astype(int) + 1970 if hi is not None else None
+        dates, values = [], []
+        for year in self._years(symbol):
+            if (first is not None and year + span <= first) or (last is not None and year > last):
+                continue
+            part_dates, part_values = self._read_partition(symbol, year)
+            i = np.searchsorted(part_dates, lo) if lo is not None else 0
+            j = np.searchsorted(part_dates, hi, side='right') if hi is not None else len(part_dates)
+            dates.append(part_dates[i:j])
+            values.append(part_values[i:j, idx])
+        if not dates:
+            return pd.DataFrame(columns=columns, index=pd.DatetimeIndex([], name='Date'), dtype=meta['dtype'])
+        return pd.DataFrame(np.concatenate(values), index=pd.DatetimeIndex(np.concatenate(dates), name='Date'),
+                            columns=columns)
+
+    def read_many(self, symbols, column, start=None, end=None):
+        """One column of several symbols side by side (outer join on date)."""
+        if not symbols:
+            return pd.DataFrame()
+        return pd.concat({s: self.read(s, start, end, [column])[column] for s in symbols}, axis=1)
+
+    def mark_fetched(self, symbol, start, end):
+        """Record that [start, end] was requested from the source, even if it held no rows."""
+        meta = self.meta(symbol)
+        lo, hi = str(_day(start)), str(_day(end))
+        if meta['fetched']:
+            lo, hi = min(lo, meta['fetched'][0]), max(hi, meta['fetched'][1])
+        meta['fetched'] = [lo, hi]
+        self._write_meta(symbol, meta)
+
+    def missing_ranges(self, symbol, start, end):
+        """[(start, end)] ranges to fetch so the fetched range covers the request (before and/or after).
+
+        The fetched range is one interval, so it is only ever extended from its edges: a request
+        that does not touch it also fetches the days in between instead of leaving a hole.
+        """
+        start, end = _day(start), _day(end)
+        meta = self.meta(symbol)
+        if meta is None or not meta['fetched']:
+            return [(start, end)]
+        lo, hi = np.datetime64(meta['fetched'][0]), np.datetime64(meta['fetched'][1])
+        out = []
+        if start < lo:
+            out.append((start, lo - 1))
+        if end > hi:
+            out.append((hi + 1, end))
+        return out
+
+def sync(store, fetcher, symbols, start, end, verbose=True):
+    """Fetch and append only the date ranges the store does not cover; returns {symbol: rows added}.
+
+    A range counts as fetched up to the last date the source returned, or up to yesterday when
+    that is later (empty days before then are weekends and holidays): a bar for today that is not
+    published yet is asked for again by the next sync instead of going missing. A symbol the
+    fetcher did not return at all (failed download) is not marked, so the next sync retries it.
+    """
+    settled = np.datetime64('today', 'D') - 1
+    requests = {}
+    for symbol in symbols:
+        for rng in store.missing_ranges(symbol, start, end):
+            requests.setdefault(rng, []).append(symbol)
+    added = {s: 0 for s in symbols}
+    for (lo, hi), batch in requests.items():  # one fetcher call per distinct missing range
+        frames = fetcher.fetch(batch, str(lo), str(hi))
+        for symbol in batch:
+            frame = frames.get(symbol)
+            meta = store.meta(symbol)
+            if frame is not None and len(frame):
+                if meta and hi < np.datetime64(meta['first']):
+                    # Backfill before the first stored date: the store is append-only, so rewrite it
+                    before = meta['rows']
+                    frame = pd.concat([frame, store.read(symbol)])
+                    added[symbol] += store.replace(symbol, frame, allow_gaps=True) - before
+                else:
+                    added[symbol] += store.append(symbol, frame, source=type(fetcher).__name__)
+            if frame is None:
+                continue
+            returned = _day(frame.index.max()) if len(frame) else None
+            upto = min(hi, settled if returned is None else max(returned, settled))
+            if store.meta(symbol) is not None and upto >= lo:
+                store.mark_fetched(symbol, lo, upto)
+        if verbose:
+            print(f"  fetched {lo}..{hi} for {len(batch)} symbol(s)")
+    return added
+
+class CsvFetcher:
+    """Reads <directory>/<symbol>.csv (Date column + fields); stands in for a market-data API."""
+
+    def __init__(self, directory, date_column='Date'):
+        self.directory = directory
+        self.date_column = date_column
+
+    def fetch(self, symbols, start, end):
+        out = {}
+        for symbol in symbols:
+            fp = os.path.join(self.directory, f'{symbol}.csv')
+            if not os.path.exists(fp):
+                continue
+            df = pd.read_csv(fp, parse_dates=[self.date_column]).set_index(self.date_column)
+            out[symbol] = df.loc[(df.index >= start) & (df.index <= end)]
+        return out
+
+class YFinanceFetcher:
+    """Daily auto-adjusted closes from Yahoo Finance, all symbols in one threaded download."""
+
+    def fetch(self, symbols, start, end):
+        try:
+            import yfinance as yf
+        except ImportError:
+            import subprocess
+            subprocess.check_call(['pip', 'install', 'yfinance'])
+            import yfinance as yf
+        end_exclusive = str(_day(end) + 1)  # yfinance treats end as exclusive
+        df = yf.download(list(symbols), start=start, end=end_exclusive, progress=False, auto_adjust=True,
+                         threads=True, group_by='ticker')
+        failed = getattr(getattr(yf, 'shared', None), '_ERRORS', {})  # tickers whose download failed
+        out = {}
+        if df is None or df.empty:
+            return out  # offline or throttled: nothing was downloaded
+        for symbol in symbols:
+            if symbol in failed or (isinstance(df.columns, pd.MultiIndex) and symbol not in df.columns.get_level_values(0)):
+                continue
+            cols = df[symbol] if isinstance(df.columns, pd.MultiIndex) else df
+            out[symbol] = cols[['Close']].dropna()
+        return out
+
+def default_fetcher():
+    """CsvFetcher over PRICE_SOURCE_DIR when set, else Yahoo Finance."""
+    source = os.environ.get('PRICE_SOURCE_DIR')
+    return CsvFetcher(source) if source else YFinanceFetcher()
+
+def main():
+    parser = argparse.ArgumentParser(description='Local price store')
+    parser.add_argument('--root', default=STORE_ROOT)
+    sub = parser.add_subparsers(dest='command', required=True)
+    s = sub.add_parser('sync', help='fetch missing ranges for symbols')
+    s.add_argument('symbols', nargs='+')
+    s.add_argument('--start', required=True)
+    s.add_argument('--end', required=True)
+    s.add_argument('--source-dir', help='read <symbol>.csv files from here instead of Yahoo Finance')
+    sub.add_parser('info', help='stored symbols and their ranges')
+    args = parser.parse_args()
+
+    store = PriceStore(args.root)
+    if args.command == 'sync':
+        fetcher = CsvFetcher(args.source_dir) if args.source_dir else default_fetcher()
+        for symbol, rows in sync(store, fetcher, args.symbols, args.start, args.end).items():
+            print(f"{symbol:<12}{rows:>8,} rows added")
+        return
+    for symbol in store.symbols():
+        meta = store.meta(symbol)
+        print(f"{symbol:<20}{meta['first']} .. {meta['last']}  fetched {meta['fetched']}  "
+              f"columns {len(meta['columns'])}  partitions {len(store._years(symbol))}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Rolling-window statistics as O(n) vectorized kernels (time on axis 0, any number of series).
+Window sums come from one cumulative sum: sum(x[i-w+1..i]) = C[i] - C[i-w].
+    compounded return   exp(window sum of log1p(r)) - 1 (no per-window product)
+    variance            shifted sums: data centred on the series mean before the
+                        cumulative sums, so S2 - S1^2/w does not cancel catastrophically
+    beta                rolling covariance / rolling market variance, same shifted sums
+A window holding a NaN gives NaN, and the first window - 1 rows are NaN, as with
+pandas .rolling(window). Drawdown is a running-peak pass (np.maximum.accumulate).
+
+Run from project root: python scripts/rolling_stats.py [--points 10000000]   # accuracy + speed benchmark
+"""
+import os
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+MONTHS_PER_YEAR = 12
+
+def _window_sums(x, window):
+    """Sums over trailing windows of `window` rows; NaN for incomplete or NaN-containing windows."""
+    x = np.asarray(x, dtype=np.float64)
+    out = np.full(x.shape, np.nan)
+    if len(x) < window:
+        return out
+    bad = np.isnan(x)
+    has_nan = bad.any()
+    c = np.cumsum(np.where(bad, 0.0, x) if has_nan else x, axis=0)
+    out[window - 1] = c[window - 1]
+    np.subtract(c[window:], c[:-window], out=out[window:])
+    if has_nan:
+        n_bad = np.cumsum(bad, axis=0)
+        in_window = n_bad[window - 1:].copy()
+        in_window[1:] -= n_bad[:-window]
+        out[window - 1:][in_window > 0] = np.nan
+    return out
+
+def _centred(x):
+    x = np.asarray(x, dtype=np.float64)
+    return x - np.nanmean(x, axis=0)
+
+def rolling_mean(x, window):
+    return _window_sums(x, window) / window
+
+def rolling_compound_return(returns, window):
+    """(1 + r).prod() - 1 over each window, via log-return window sums."""
+    return np.expm1(_window_sums(np.log1p(np.asarray(returns, dtype=np.float64)), window))
+
+def rolling_cov(x, y, window, ddof=1):
+    """Sample covariance over each window (x and y aligned, same shape)."""
+    xc, yc = _centred(x), _centred(y)
+    sx, sy, sxy = _window_sums(xc, window), _window_sums(yc, window), _window_sums(xc * yc, window)
+    return (sxy - sx * sy / window) / (window - ddof)
+
+def rolling_var(x, window, ddof=1):
+    xc = _centred(x)
+    s1, s2 = _window_sums(xc, window), _window_sums(xc * xc, window)
+    return np.maximum((s2 - s1 * s1 / window) / (window - ddof), 0.0)  # rounding can dip below 0
+
+def rolling_std(x, window, ddof=1):
+    return np.sqrt(rolling_var(x, window, ddof))
+
+def rolling_volatility(returns, window, periods_per_year=MONTHS_PER_YEAR):
+    """Annualized rolling volatility in % (std * sqrt(periods per year) * 100)."""
+    return rolling_std(returns, window) * np.sqrt(periods_per_year) * 100
+
+def rolling_sharpe(returns, window, risk_free=0.0, periods_per_year=MONTHS_PER_YEAR):
+    """Annualized Sharpe ratio of per-period returns over each window (risk_free per period)."""
+    excess = np.asarray(returns, dtype=np.float64) - risk_free
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return rolling_mean(excess, window) / rolling_std(excess, window) * np.sqrt(periods_per_year)
+
+def rolling_beta(returns, market, window):
+    """Beta of returns (1-D or one column per series) on the market returns over each window."""
+    returns = np.asarray(returns, dtype=np.float64)
+    market = np.asarray(market, dtype=np.float64)
+    if returns.ndim == 2 and market.ndim == 1:
+        market = np.broadcast_to(market[:, None], returns.shape)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return rolling_cov(returns, market, window) / rolling_var(market, window)
+
+def drawdown(returns):
+    """Fall of cumulative wealth from its running peak (0 at a new high, -0.3 = 30% below)."""
+    log_wealth = np.cumsum(np.log1p(np.nan_to_num(np.asarray(returns, dtype=np.float64))), axis=0)
+    return np.expm1(log_wealth - np.maximum.accumulate(log_wealth, axis=0))  # log scale: no overflow
+
+def max_drawdown(returns):
+    return drawdown(returns).min(axis=0)
+
+def as_pandas(values, like):
+    """Wrap a kernel result in the index (and columns) of the Series/DataFrame it came from."""
+    if isinstance(like, pd.DataFrame):
+        return pd.DataFrame(values, index=like.index, columns=like.columns)
+    return pd.Series(values, index=like.index, name=getattr(like, 'name', None))
+
+def _timed(fn, repeat=3):
+    best = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return out, best
+
+def _compare(label, returns, window, apply_rows):
+    """Kernel vs pandas timings and max abs difference for one return series."""
+    s = pd.Series(returns)
+    sample = s.iloc[:apply_rows]
+    ref_ret, t_apply = _timed(lambda: sample.rolling(window).apply(lambda x: (1 + x).prod() - 1, raw=True), 1)
+    new_ret, t_ret = _timed(lambda: rolling_compound_return(returns, window))
+    ref_vol, t_pd_vol = _timed(lambda: s.rolling(window).std().to_numpy() * np.sqrt(12) * 100)
+    new_vol, t_vol = _timed(lambda: rolling_volatility(returns, window))
+    n = len(returns)
+    apply_rate = len(sample) / t_apply
+    print(f"\n{label}: {n:,} points, window {window}")
+    print(f"  compounded return  pandas apply {apply_rate:>14,.0f} pts/s"
+          f"{' (first %s pts)' % f'{len(sample):,}' if len(sample) < n else '':<22}"
+          f"kernel {n / t_ret:>14,.0f} pts/s   max |diff| {np.nanmax(np.abs(new_ret[:len(sample)] - ref_ret)):.2e}")
+    print(f"  volatility         pandas std   {n / t_pd_vol:>14,.0f} pts/s{'':<22}"
+          f"kernel {n / t_vol:>14,.0f} pts/s   max |diff| {np.nanmax(np.abs(new_vol - ref_vol)):.2e}")
+    for name, fn in (('sharpe', lambda: rolling_sharpe(returns, window)),
+                     ('drawdown', lambda: drawdown(returns))):
+        _, t = _timed(fn)
+        print(f"  {name:<18} kernel {n / t:>14,.0f} pts/s")
+
+def main():
+    parser = argparse.ArgumentParser(description='Rolling kernels vs pandas')
+    parser.add_argument('--data', default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                                       'data', 'raw', 'filtered_data.csv'))
+    parser.add_argument('--points', type=int, default=10_000_000, help='synthetic series length')
+    parser.add_argument('--window', type=int, default=60)
+    parser.add_argument('--apply-rows', type=int, default=200_000,
+                        help='pandas rolling().apply is timed on at most this many points')
+    args = parser.parse_args()
+
+    if os.path.exists(args.data):
+        prices = pd.read_csv(args.data, usecols=['Real Price'])['Real Price'].dropna()
+        _compare('filtered_data.csv', prices.pct_change().dropna().to_numpy(), args.window, args.apply_rows)
+    rng = np.random.default_rng(42)
+    _compare('synthetic', rng.normal(0.006, 0.04, args.points), args.window, args.apply_rows)
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,7 @@ Financial Data Analysis – S&P 500 Volatility & Macro Correlation.
 Uses filtered_data.csv (S&P 500 + macro indicators) when available, else yfinance fallback.
 """
 import os
+import sys
 import pandas as pd
 import numpy as np
 import matplotlib
@@ -10,6 +11,14 @@ matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from rolling_stats import as_pandas, rolling_compound_return, rolling_volatility
+from price_store import PriceStore, default_fetcher, file_version, sync
+from monte_carlo import simulate
+from risk_engine import correlation, covariance, historical_var, portfolio_var
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.render import Chart, render, scatter
+
 BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 VIZ = os.path.join(BASE, 'visualizations')
 DATA = os.path.join(BASE, 'data')
@@ -19,6 +28,14 @@ os.makedirs(VIZ, exist_ok=True)
 os.makedirs(PROCESSED, exist_ok=True)
 os.makedirs(RAW, exist_ok=True)
 
+# Price store symbol holding filtered_data.csv (all columns)
+FILTERED_SYMBOL = 'filtered_data'
+# Monte Carlo scenarios after the historical analysis (scripts/monte_carlo.py); 0 = skip
+MC_PATHS = int(os.environ.get('MC_PATHS', 200_000))
+MC_HORIZON_MONTHS = 120
+# Tickers are labelled on the multi-stock charts up to this many; beyond it, plain point clouds
+MAX_LABELLED = 20
+
 # Path resolution: 1) FINANCIAL_DATA_PATH env, 2) data/raw/, 3) Downloads
 def get_data_path():
     if os.environ.get("FINANCIAL_DATA_PATH"):
@@ -28,32 +45,108 @@ def get_data_path():
         return local
     return "/Users/pavansatvik/Downloads/filtered_data.csv"
 
-def load_filtered_data():
-    """Load S&P 500 + macro data from filtered_data.csv."""
+def load_filtered_data(start=None, end=None):
+    """Load S&P 500 + macro data (start..end, default all) via the local price store.
+
+    The CSV is parsed, sorted and de-duplicated into the store once, and again only when the
+    file changes; later runs read the memory-mapped partitions for the requested years.
+    """
     path = get_data_path()
     if not os.path.exists(path):
         return None
-    df = pd.read_csv(path)
-    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-    df = df.dropna(subset=["Date"]).sort_values("Date").drop_duplicates(subset=["Date"], keep="last").set_index("Date")
-    return df
-
-def fetch_yfinance_fallback():
-    """Fallback: fetch S&P 500 stocks via yfinance."""
-    try:
-        import yfinance as yf
-    except ImportError:
-        import subprocess
-        subprocess.check_call(['pip', 'install', 'yfinance'])
-        import yfinance as yf
+    store = PriceStore()
+    meta = store.meta(FILTERED_SYMBOL)
+    if meta is None or meta['source'] != file_version(path):
+        df = pd.read_csv(path)
+        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+        df = df.dropna(subset=["Date"]).sort_values("Date").drop_duplicates(subset=["Date"], keep="last").set_index("Date")
+        store.replace(FILTERED_SYMBOL, df, allow_gaps=True, source=file_version(path))
+    return store.read(FILTERED_SYMBOL, start, end)
+
+def fetch_yfinance_fallback(start='2022-01-01', end='2024-12-30'):
+    """Fallback: S&P 500 stocks from the local price store, fetching only dates it lacks.
+
+    The fetcher is Yahoo Finance, or <symbol>.csv files in PRICE_SOURCE_DIR when that is set.
+    """
     TICKERS = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'JPM', 'V', 'JNJ', 'WMT', 'PG']
-    print("Fetching stock data (yfinance fallback)...")
-    df = yf.download(TICKERS, start='2022-01-01', end='2024-12-31', progress=False, auto_adjust=True, threads=False, group_by='ticker')
-    if isinstance(df.columns, pd.MultiIndex):
-        df = df.xs('Close', axis=1, level=1)
+    store = PriceStore()
+    print("Syncing stock data into the local price store...")
+    sync(store, default_fetcher(), TICKERS, start, end)
+    df = store.read_many([t for t in TICKERS if store.meta(t)], 'Close', start, end)
     df = df.dropna(how='all', axis=1).dropna(how='all')
     return df
 
+def plot_risk_return_windows(rr):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    scatter(ax, rr["Volatility_5Y"], rr["Return_5Y"] * 100, alpha=0.6, s=20, c=rr.index.astype(np.int64), cmap='viridis')
+    ax.set_xlabel('5-Year Rolling Volatility (Annualized %)')
+    ax.set_ylabel('5-Year Rolling Return (%)')
+    ax.set_title('S&P 500: Risk-Return by Rolling 5-Year Window')
+    ax.axhline(0, color='gray', linestyle='--', alpha=0.5)
+    fig.tight_layout()
+    return fig
+
+def plot_macro_correlation(corr):
+    fig = plt.figure(figsize=(8, 6))
+    sns.heatmap(corr, annot=True, fmt='.2f', cmap='coolwarm', center=0, vmin=-0.5, vmax=0.5)
+    plt.title('S&P 500 Returns vs Macro Indicators (30Y)')
+    fig.tight_layout()
+    return fig
+
+def plot_volatility_trend(vol):
+    fig, ax = plt.subplots(figsize=(10, 4))
+    vol.plot(ax=ax)
+    ax.set_title('S&P 500: Rolling 12-Month Annualized Volatility (%)')
+    ax.set_ylabel('Volatility %')
+    ax.axhline(vol.median(), color='red', linestyle='--', alpha=0.7, label=f'Median: {vol.median():.1f}%')
+    ax.legend()
+    fig.tight_layout()
+    return fig
+
+def plot_monte_carlo_fan(bands, paths):
+    years = bands.index / 12
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.fill_between(years, bands['p5'], bands['p95'], alpha=0.2, color='tab:blue', label='5-95th percentile')
+    ax.fill_between(years, bands['p25'], bands['p75'], alpha=0.4, color='tab:blue', label='25-75th percentile')
+    ax.plot(years, bands['p50'], color='tab:blue', label='Median')
+    ax.axhline(1, color='gray', linestyle='--', alpha=0.5)
+    ax.set_xlabel('Years ahead')
+    ax.set_ylabel('Real wealth (start = 1)')
+    ax.set_title(f'S&P 500: Simulated 10-Year Real Wealth ({paths:,} block-bootstrap paths)')
+    ax.legend(loc='upper left')
+    fig.tight_layout()
+    return fig
+
+def plot_stock_risk_return(risk_return, labelled):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    scatter(ax, risk_return['Volatility (%)'], risk_return['Return (%)'], s=100 if labelled else 10,
+            c=np.arange(len(risk_return)), cmap='tab10' if labelled else 'viridis')
+    if labelled:
+        for ticker, (ret, vol) in risk_return[['Return (%)', 'Volatility (%)']].iterrows():
+            ax.annotate(ticker, (vol, ret), xytext=(5, 5), textcoords='offset points')
+    ax.set_xlabel('Volatility (Annualized %)')
+    ax.set_ylabel('Return (Annualized %)')
+    ax.set_title('Risk-Return Profile by Stock')
+    fig.tight_layout()
+    return fig
+
+def plot_stock_correlation(corr, labelled):
+    fig = plt.figure(figsize=(10, 8))
+    sns.heatmap(corr, annot=labelled, fmt='.2f', cmap='coolwarm', center=0)
+    plt.title('Stock Return Correlation Matrix')
+    fig.tight_layout()
+    return fig
+
+def plot_stock_volatility(vol, labelled):
+    fig, ax = plt.subplots(figsize=(10, 4))
+    vol.plot(ax=ax, legend=labelled)
+    ax.set_title('Rolling 20-Day Annualized Volatility (%)')
+    ax.set_ylabel('Volatility %')
+    if labelled:
+        ax.legend(bbox_to_anchor=(1.02, 1))
+    fig.tight_layout()
+    return fig
+
 def run_filtered_analysis(df):
     """Analysis using S&P 500 + macro data."""
     # Use Real Price (inflation-adjusted) or SP500 for returns
@@ -62,7 +155,7 @@ def run_filtered_analysis(df):
 
     returns = prices.pct_change().dropna()
     # Rolling 12-month volatility (annualized: monthly_std * sqrt(12))
-    vol_12m = returns.rolling(12).std() * np.sqrt(12) * 100
+    vol_12m = as_pandas(rolling_volatility(returns, 12), returns)
     vol_12m = vol_12m.dropna()
 
     # Correlation with macro indicators (use recent 30 years for readability)
@@ -83,41 +176,30 @@ def run_filtered_analysis(df):
     corr = corr_data.corr()
 
     # Risk-return: rolling 5-year windows
-    roll_ret = returns.rolling(60).apply(lambda x: (1 + x).prod() - 1 if len(x) == 60 else np.nan)
-    roll_vol = returns.rolling(60).std() * np.sqrt(12) * 100
+    roll_ret = as_pandas(rolling_compound_return(returns, 60), returns)
+    roll_vol = as_pandas(rolling_volatility(returns, 60), returns)
     rr = pd.DataFrame({"Return_5Y": roll_ret, "Volatility_5Y": roll_vol}).dropna()
     rr = rr.loc[rr.index >= (rr.index.max() - pd.DateOffset(years=50))] if len(rr) > 600 else rr
 
-    # 1. Risk-return scatter (rolling 5Y windows)
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.scatter(rr["Volatility_5Y"], rr["Return_5Y"] * 100, alpha=0.6, s=20, c=rr.index.astype(np.int64), cmap='viridis')
-    ax.set_xlabel('5-Year Rolling Volatility (Annualized %)')
-    ax.set_ylabel('5-Year Rolling Return (%)')
-    ax.set_title('S&P 500: Risk-Return by Rolling 5-Year Window')
-    ax.axhline(0, color='gray', linestyle='--', alpha=0.5)
-    plt.tight_layout()
-    plt.savefig(os.path.join(VIZ, 'risk_return_scatter.png'), dpi=100)
-    plt.close()
-
-    # 2. Correlation heatmap (SP500 returns vs macro)
-    plt.figure(figsize=(8, 6))
-    sns.heatmap(corr, annot=True, fmt='.2f', cmap='coolwarm', center=0, vmin=-0.5, vmax=0.5)
-    plt.title('S&P 500 Returns vs Macro Indicators (30Y)')
-    plt.tight_layout()
-    plt.savefig(os.path.join(VIZ, 'correlation_heatmap.png'), dpi=100)
-    plt.close()
-
-    # 3. Volatility trend over time
+    # Charts: risk-return by rolling 5Y window, macro correlation heatmap, volatility trend
     vol_plot = vol_12m.loc[vol_12m.index >= (vol_12m.index.max() - pd.DateOffset(years=50))] if len(vol_12m) > 600 else vol_12m
-    fig, ax = plt.subplots(figsize=(10, 4))
-    vol_plot.plot(ax=ax)
-    ax.set_title('S&P 500: Rolling 12-Month Annualized Volatility (%)')
-    ax.set_ylabel('Volatility %')
-    ax.axhline(vol_plot.median(), color='red', linestyle='--', alpha=0.7, label=f'Median: {vol_plot.median():.1f}%')
-    ax.legend()
-    plt.tight_layout()
-    plt.savefig(os.path.join(VIZ, 'volatility_trend.png'), dpi=100)
-    plt.close()
+    charts = [
+        Chart(os.path.join(VIZ, 'risk_return_scatter.png'), plot_risk_return_windows, {'rr': rr}),
+        Chart(os.path.join(VIZ, 'correlation_heatmap.png'), plot_macro_correlation, {'corr': corr}),
+        Chart(os.path.join(VIZ, 'volatility_trend.png'), plot_volatility_trend, {'vol': vol_plot}),
+    ]
+
+    # Monte Carlo fan chart: block-bootstrapped 10-year wealth paths
+    if MC_PATHS:
+        bands, drawdowns, stats = simulate(returns.to_numpy(), MC_PATHS, MC_HORIZON_MONTHS)
+        print(f"Monte Carlo: {stats['paths']:,} paths in {stats['seconds']:.1f}s, "
+              f"median 10Y wealth {bands['p50'].iloc[-1]:.2f}x, P(loss) {stats['p_loss']:.1%}, "
+              f"median max drawdown {drawdowns['p50']:.1%}")
+        charts.append(Chart(os.path.join(VIZ, 'monte_carlo_fan.png'), plot_monte_carlo_fan,
+                            {'bands': bands, 'paths': stats['paths']}))
+        bands.to_csv(os.path.join(PROCESSED, 'mc_wealth_bands.csv'))
+        drawdowns.to_csv(os.path.join(PROCESSED, 'mc_max_drawdown.csv'))
+    render(charts)
 
     # Save processed
     rr.to_csv(os.path.join(PROCESSED, 'risk_return.csv'))
@@ -127,37 +209,25 @@ def run_filtered_analysis(df):
 def run_yfinance_analysis(df):
     """Analysis using yfinance multi-stock data."""
     returns = df.pct_change().dropna()
-    vol_20d = returns.rolling(20).std() * np.sqrt(252) * 100
+    vol_20d = as_pandas(rolling_volatility(returns, 20, periods_per_year=252), returns)
     mean_ret = returns.mean() * 252 * 100
     mean_vol = vol_20d.mean()
     risk_return = pd.DataFrame({'Return (%)': mean_ret, 'Volatility (%)': mean_vol})
-    corr = returns.corr()
-
-    fig, ax = plt.subplots(figsize=(10, 6))
-    for ticker in risk_return.index:
-        ax.scatter(risk_return.loc[ticker, 'Volatility (%)'], risk_return.loc[ticker, 'Return (%)'], s=100, label=ticker)
-    ax.set_xlabel('Volatility (Annualized %)')
-    ax.set_ylabel('Return (Annualized %)')
-    ax.set_title('Risk-Return Profile by Stock')
-    ax.legend(bbox_to_anchor=(1.02, 1))
-    plt.tight_layout()
-    plt.savefig(os.path.join(VIZ, 'risk_return_scatter.png'), dpi=100)
-    plt.close()
-
-    plt.figure(figsize=(10, 8))
-    sns.heatmap(corr, annot=True, fmt='.2f', cmap='coolwarm', center=0)
-    plt.title('Stock Return Correlation Matrix')
-    plt.tight_layout()
-    plt.savefig(os.path.join(VIZ, 'correlation_heatmap.png'), dpi=100)
-    plt.close()
-
-    vol_20d.iloc[-252:].plot(figsize=(10, 4))
-    plt.title('Rolling 20-Day Annualized Volatility (%)')
-    plt.ylabel('Volatility %')
-    plt.legend(bbox_to_anchor=(1.02, 1))
-    plt.tight_layout()
-    plt.savefig(os.path.join(VIZ, 'volatility_trend.png'), dpi=100)
-    plt.close()
+    r = np.ascontiguousarray(returns.to_numpy(np.float32))
+    cov = covariance(r)
+    corr = pd.DataFrame(correlation(cov), index=returns.columns, columns=returns.columns)
+    equal_weight = np.full(len(returns.columns), 1 / len(returns.columns))
+    print(f"Equal-weight portfolio 1-day VaR 99%: {portfolio_var(equal_weight, cov)[0]:.2%} (parametric), "
+          f"{historical_var(equal_weight, r)[0]:.2%} (historical)")
+    labelled = len(risk_return) <= MAX_LABELLED
+
+    render([
+        Chart(os.path.join(VIZ, 'risk_return_scatter.png'), plot_stock_risk_return,
+              {'risk_return': risk_return, 'labelled': labelled}),
+        Chart(os.path.join(VIZ, 'correlation_heatmap.png'), plot_stock_correlation, {'corr': corr, 'labelled': labelled}),
+        Chart(os.path.join(VIZ, 'volatility_trend.png'), plot_stock_volatility,
+              {'vol': vol_20d.iloc[-252:], 'labelled': labelled}),
+    ])
 
     risk_return.to_csv(os.path.join(PROCESSED, 'risk_return.csv'))
     returns.to_csv(os.path.join(PROCESSED, 'returns.csv'))
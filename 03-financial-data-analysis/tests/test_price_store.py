@@ -0,0 +1,48 @@
+"""sync() against a CsvFetcher: requests that do not touch the fetched range, failed downloads."""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+from price_store import CsvFetcher, PriceStore, sync
+
+DAYS = pd.bdate_range('2022-01-03', '2023-12-29')
+
+@pytest.fixture
+def store_and_fetcher(tmp_path):
+    source = tmp_path / 'source'
+    source.mkdir()
+    prices = pd.DataFrame({'Date': DAYS, 'Close': np.arange(len(DAYS), dtype=float)})
+    prices.to_csv(source / 'AAA.csv', index=False)
+    return PriceStore(str(tmp_path / 'store')), CsvFetcher(str(source))
+
+def _assert_complete(store):
+    stored = store.read('AAA')
+    assert stored.index.equals(pd.DatetimeIndex(DAYS, name='Date'))
+    assert len(store.read('AAA', '2022-07-01', '2022-12-31')) == len(pd.bdate_range('2022-07-01', '2022-12-31'))
+
+def test_later_request_fills_the_gap(store_and_fetcher):
+    store, fetcher = store_and_fetcher
+    sync(store, fetcher, ['AAA'], '2022-01-01', '2022-06-30', verbose=False)
+    sync(store, fetcher, ['AAA'], '2023-01-01', '2023-12-31', verbose=False)
+    _assert_complete(store)
+
+def test_earlier_request_fills_the_gap(store_and_fetcher):
+    store, fetcher = store_and_fetcher
+    sync(store, fetcher, ['AAA'], '2023-01-01', '2023-12-31', verbose=False)
+    sync(store, fetcher, ['AAA'], '2022-01-01', '2022-06-30', verbose=False)
+    _assert_complete(store)
+
+class _Offline:
+    def fetch(self, symbols, start, end):
+        return {}
+
+def test_failed_download_is_retried(store_and_fetcher):
+    store, fetcher = store_and_fetcher
+    sync(store, fetcher, ['AAA'], '2022-01-01', '2022-06-30', verbose=False)
+    sync(store, _Offline(), ['AAA'], '2022-01-01', '2022-12-31', verbose=False)
+    assert store.meta('AAA')['fetched'] == ['2022-01-01', '2022-06-30']
+    assert store.missing_ranges('AAA', '2022-01-01', '2022-12-31') == [(np.datetime64('2022-07-01'), np.datetime64('2022-12-31'))]
@@ -0,0 +1,176 @@
+"""
+Rolling-origin backtesting of the forecast engine's models.
+Each origin o trains on months [0, o) and scores the next `horizon` months. Overlapping
+training windows share their work instead of refitting from scratch at every origin:
+    seasonal_naive   slices of the history; error scale from prefix sums
+    linear_fourier   X'X and X'Y accumulated origin to origin; one small solve per origin
+    holt_winters     a single pass over the history, state read off at every origin
+                     (hw_states), identical to refitting on each window
+MASE is scaled by the in-sample seasonal-naive MAE of each training window (prefix sums too).
+Coverage is the share of actuals inside point +/- INTERVAL_Z * sigma * sqrt(step), sigma the
+model's in-sample one-step RMSE. Series chunks x models run on a process pool.
+
+Run from project root:
+    python scripts/backtest.py                               # data/raw/sales_monthly.csv
+    python scripts/backtest.py --synthetic 20000 --compare   # throughput vs refitting every origin
+"""
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from forecast_engine import (CHUNK_SERIES, FOURIER_TERMS, HORIZON, HW_GRID, MODELS, SEASON, _fourier_design,
+                             _init_worker, hw_forecast, hw_states, synthetic_series)
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW = os.path.join(BASE, 'data', 'raw', 'sales_monthly.csv')
+LEADERBOARD = os.path.join(BASE, 'data', 'processed', 'backtest_leaderboard.csv')
+N_ORIGINS = 6
+INTERVAL_Z = 1.2816  # two-sided 80% normal interval
+METRICS = ('mape', 'smape', 'mase', 'coverage')
+
+def load_series(path=RAW):
+    """(series x months) matrix from the sales_monthly.csv layout (date, sales, region)."""
+    df = pd.read_csv(path, parse_dates=['date'])
+    return df.pivot_table(index='region', columns='date', values='sales', aggfunc='sum').fillna(0)
+
+def rolling_origins(months, horizon=HORIZON, n_origins=N_ORIGINS, step=1, season=SEASON):
+    """Training cut-offs, latest last; every one leaves `horizon` test months and >= 2 seasons of training."""
+    last = months - horizon
+    origins = [o for o in range(last - (n_origins - 1) * step, last + 1, step) if o >= 2 * season]
+    if not origins:
+        raise ValueError(f"{months} months cannot hold {2 * season} training + {horizon} test months")
+    return origins
+
+def _seasonal_naive_folds(Y, origins, horizon, season):
+    diff = np.zeros_like(Y)
+    diff[:, season:] = Y[:, season:] - Y[:, :-season]
+    csum2 = np.concatenate([np.zeros((len(Y), 1)), np.cumsum(diff ** 2, axis=1)], axis=1)
+    for o in origins:
+        forecast = Y[:, o - season + np.arange(horizon) % season]
+        yield forecast, np.sqrt(csum2[:, o] / (o - season))
+
+def _linear_fourier_folds(Y, origins, horizon, season, terms=FOURIER_TERMS):
+    X = _fourier_design(np.arange(Y.shape[1] + horizon), season, terms)
+    p = X.shape[1]
+    xtx, xty, yty = np.zeros((p, p)), np.zeros((p, len(Y))), np.zeros(len(Y))
+    done = 0
+    for o in origins:  # extend the normal equations by the months since the previous origin
+        Xa, Ya = X[done:o], Y[:, done:o]
+        xtx += Xa.T @ Xa
+        xty += Xa.T @ Ya.T
+        yty += np.einsum('nt,nt->n', Ya, Ya)
+        done = o
+        coef = np.linalg.solve(xtx, xty)
+        rss = np.maximum(yty - np.einsum('pn,pn->n', coef, xty), 0.0)  # y'y - b'X'y at the optimum
+        yield (X[o:o + horizon] @ coef).T, np.sqrt(rss / (o - p))
+
+def _holt_winters_folds(Y, origins, horizon, season, grid=HW_GRID):
+    for state in hw_states(Y, season, grid, origins):
+        o, sse = state[0], state[4]
+        forecast, best = hw_forecast(*state, horizon, season, grid)
+        yield forecast, np.sqrt(sse[best, np.arange(len(Y))] / (o - season))
+
+FOLDS = {
+    'seasonal_naive': _seasonal_naive_folds,
+    'linear_fourier': _linear_fourier_folds,
+    'holt_winters': _holt_winters_folds,
+}
+
+def _fold_metrics(Y, o, forecast, sigma, horizon, scale):
+    """Per-series (mape, smape, mase, coverage) for the origin o; zero actuals are left out of MAPE/sMAPE."""
+    actual = Y[:, o:o + horizon]
+    err = np.abs(actual - forecast)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        nonzero = actual != 0
+        mape = np.where(nonzero, err / np.abs(actual), 0).sum(axis=1) / nonzero.sum(axis=1) * 100
+        denom = np.abs(actual) + np.abs(forecast)
+        smape = np.where(denom > 0, 2 * err / denom, 0).sum(axis=1) / (denom > 0).sum(axis=1) * 100
+        mase = err.mean(axis=1) / scale
+    half_width = INTERVAL_Z * sigma[:, None] * np.sqrt(np.arange(1, horizon + 1))
+    coverage = (err <= half_width).mean(axis=1) * 100
+    return np.column_stack([mape, smape, mase, coverage])
+
+def evaluate_chunk(Y, model, origins, horizon=HORIZON, season=SEASON):
+    """(series, origins, metrics) array for one model on a block of series."""
+    Y = np.asarray(Y, dtype=np.float64)
+    abs_diff = np.zeros_like(Y)
+    abs_diff[:, season:] = np.abs(Y[:, season:] - Y[:, :-season])
+    csum = np.concatenate([np.zeros((len(Y), 1)), np.cumsum(abs_diff, axis=1)], axis=1)
+    out = np.empty((len(Y), len(origins), len(METRICS)))
+    for i, (o, (forecast, sigma)) in enumerate(zip(origins, FOLDS[model](Y, origins, horizon, season))):
+        scale = csum[:, o] / (o - season)  # seasonal-naive in-sample MAE of this window
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[:, i] = _fold_metrics(Y, o, forecast, sigma, horizon, np.where(scale > 0, scale, np.nan))
+    return out
+
+def refit_forecasts(Y, model, origins, horizon=HORIZON, season=SEASON):
+    """Reference: refit the engine model on every training window (what the cached folds avoid)."""
+    return [MODELS[model](Y[:, :o], horizon, season) for o in origins]
+
+def backtest(Y, origins, horizon=HORIZON, season=SEASON, models=tuple(MODELS), n_jobs=None,
+             chunk_series=CHUNK_SERIES):
+    """{model: (series, origins, metrics) array}; every (series chunk, model) pair is one task."""
+    Y = np.asarray(Y, dtype=np.float64)
+    chunks = [Y[i:i + chunk_series] for i in range(0, len(Y), chunk_series)]
+    tasks = [(c, m) for m in models for c in chunks]
+    n_jobs = min(n_jobs or os.cpu_count(), len(tasks))
+    args = ([c for c, _ in tasks], [m for _, m in tasks], [origins] * len(tasks), [horizon] * len(tasks),
+            [season] * len(tasks))
+    if n_jobs == 1:
+        parts = list(map(evaluate_chunk, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker) as pool:
+            parts = list(pool.map(evaluate_chunk, *args))
+    return {m: np.concatenate(parts[i * len(chunks):(i + 1) * len(chunks)]) for i, m in enumerate(models)}
+
+def leaderboard(results):
+    """One row per model: mean metrics over series and origins, and the share of series it wins on MASE."""
+    models = list(results)
+    per_series_mase = np.column_stack([np.nanmean(results[m][:, :, 2], axis=1) for m in models])
+    valid = ~np.isnan(per_series_mase).all(axis=1)
+    wins = np.bincount(np.nanargmin(per_series_mase[valid], axis=1), minlength=len(models)) / max(valid.sum(), 1)
+    rows = [dict(model=m, **{k: np.nanmean(results[m][:, :, j]) for j, k in enumerate(METRICS)},
+                 best_share=wins[i] * 100) for i, m in enumerate(models)]
+    return pd.DataFrame(rows).sort_values('mase').reset_index(drop=True).round(2)
+
+def main():
+    parser = argparse.ArgumentParser(description='Rolling-origin backtest of the forecast models')
+    parser.add_argument('--input', default=RAW, help='sales_monthly.csv layout (date, sales, region)')
+    parser.add_argument('--synthetic', type=int, help='use this many synthetic series instead of --input')
+    parser.add_argument('--months', type=int, default=48, help='synthetic series length')
+    parser.add_argument('--origins', type=int, default=N_ORIGINS)
+    parser.add_argument('--jobs', type=int, default=None)
+    parser.add_argument('--compare', action='store_true', help='also time refitting every origin')
+    parser.add_argument('--out', default=LEADERBOARD)
+    args = parser.parse_args()
+
+    Y = synthetic_series(args.synthetic, args.months) if args.synthetic else load_series(args.input).to_numpy(float)
+    origins = rolling_origins(Y.shape[1], n_origins=args.origins)
+    t0 = time.perf_counter()
+    results = backtest(Y, origins, n_jobs=args.jobs)
+    seconds = time.perf_counter() - t0
+    board = leaderboard(results)
+    print(f"{len(Y):,} series, origins {origins[0]}..{origins[-1]} ({len(origins)} folds x {HORIZON} months) "
+          f"in {seconds:.2f}s ({len(Y) * len(origins) / seconds:,.0f} series-folds/s)")
+    print(board.to_string(index=False))
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    board.to_csv(args.out, index=False)
+
+    if args.compare:
+        for model in MODELS:
+            t0 = time.perf_counter()
+            cached = [f for f, _ in FOLDS[model](Y, origins, HORIZON, SEASON)]
+            t_cached = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            refit = refit_forecasts(Y, model, origins)
+            t_refit = time.perf_counter() - t0
+            diff = max(np.abs(a - b).max() for a, b in zip(cached, refit))
+            print(f"  {model:<16} shared state {t_cached:6.2f}s  refit per origin {t_refit:6.2f}s  "
+                  f"({t_refit / t_cached:4.1f}x)  max |diff| {diff:.1e}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""
+Batched forecasting engine: many monthly series at once as one (series x months) matrix.
+Every model is vectorized over the rows - one loop over time steps at most, never over series.
+    seasonal_naive   repeat the last observed season
+    linear_fourier   intercept + trend + Fourier terms; one shared design matrix, so all
+                     series are fitted by a single least-squares solve
+    holt_winters     additive Holt-Winters / ETS(A,Ad,A); smoothing parameters chosen per
+                     series from HW_GRID by in-sample one-step SSE (all grid points at once)
+forecast_many() backtests every model on the last `horizon` months, keeps the model with the
+lowest MAE per series and refits it on the full history. Row chunks run on a process pool.
+seasonal_naive and holt_winters need a full season of training months, linear_fourier one month
+per coefficient; models the history is too short for are left out of the selection.
+
+Run from project root: python scripts/forecast_engine.py [--series 50000 --months 48 --jobs 1 2]
+"""
+import os
+import time
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+SEASON = 12
+HORIZON = 12
+CHUNK_SERIES = 5_000
+FOURIER_TERMS = 2
+# (alpha, beta, gamma, phi): level, trend, season smoothing and trend damping
+HW_GRID = [(a, b, g, phi) for a, b, g, phi in itertools.product((0.1, 0.3, 0.6), (0.01, 0.1), (0.05, 0.3), (0.9, 1.0))]
+
+def min_train_months(model, season=SEASON, terms=FOURIER_TERMS):
+    """Months of history a model needs: one per linear_fourier coefficient, else a full season."""
+    return 2 + 2 * terms if model == 'linear_fourier' else season
+
+def _check_length(Y, model, season):
+    if Y.shape[1] < min_train_months(model, season):
+        raise ValueError(f"{model} needs at least {min_train_months(model, season)} months, got {Y.shape[1]}")
+
+def seasonal_naive(Y, horizon=HORIZON, season=SEASON):
+    _check_length(Y, 'seasonal_naive', season)
+    T = Y.shape[1]
+    return Y[:, T - season + np.arange(horizon) % season]
+
+def _fourier_design(t, season, terms):
+    cols = [np.ones_like(t, dtype=np.float64), t.astype(np.float64)]
+    for k in range(1, terms + 1):
+        cols += [np.sin(2 * np.pi * k * t / season), np.cos(2 * np.pi * k * t / season)]
+    return np.column_stack(cols)
+
+def linear_fourier(Y, horizon=HORIZON, season=SEASON, terms=FOURIER_TERMS):
+    _check_length(Y, 'linear_fourier', season)
+    T = Y.shape[1]
+    X = _fourier_design(np.arange(T), season, terms)
+    coef, *_ = np.linalg.lstsq(X, Y.T, rcond=None)  # (features, series): every series in one solve
+    return (_fourier_design(np.arange(T, T + horizon), season, terms) @ coef).T
+
+def hw_states(Y, season=SEASON, grid=HW_GRID, at=None):
+    """Yield (t, level, trend, seas, sse) for every grid point after the first t months, t in `at`.
+
+    One pass over the history serves any number of training cut-offs: the state after t months
+    is exactly what a fit on Y[:, :t] ends with (for t >= 2 * season, which the trend
+    initialization uses). Arrays are (G, n) and (G, n, season); sse counts errors after the
+    first season. seas and sse are updated in place - use a state before advancing.
+    """
+    _check_length(Y, 'holt_winters', season)
+    n, T = Y.shape
+    at = sorted(at or [T])
+    alpha, beta, gamma, phi = (p[:, None] for p in np.asarray(grid, dtype=np.float64).T)  # (G, 1)
+    first = Y[:, :season].mean(axis=1)
+    trend0 = (Y[:, season:2 * season].mean(axis=1) - first) / season if T >= 2 * season else np.zeros(n)
+    level = np.broadcast_to(first, (len(grid), n)).copy()
+    trend = np.broadcast_to(trend0, (len(grid), n)).copy()
+    seas = np.broadcast_to(Y[:, :season] - first[:, None], (len(grid), n, season)).copy()
+    sse = np.zeros((len(grid), n))
+    for t in range(at[-1]):
+        y = Y[:, t]
+        s = seas[:, :, t % season]
+        damped = phi * trend
+        if t >= season:  # the first season only initializes the states
+            sse += (y - (level + damped + s)) ** 2
+        new_level = alpha * (y - s) + (1 - alpha) * (level + damped)
+        trend = beta * (new_level - level) + (1 - beta) * damped
+        seas[:, :, t % season] = gamma * (y - new_level) + (1 - gamma) * s
+        level = new_level
+        if t + 1 in at:
+            yield t + 1, level, trend, seas, sse
+
+def hw_forecast(t, level, trend, seas, sse, horizon=HORIZON, season=SEASON, grid=HW_GRID):
+    """(forecast, best grid index) from a hw_states() state; each series uses its lowest-SSE grid point."""
+    n = level.shape[1]
+    best = sse.argmin(axis=0)
+    rows = np.arange(n)
+    steps = np.arange(1, horizon + 1)
+    phi_best = np.asarray(grid)[best, 3][:, None]
+    damp = np.cumsum(phi_best ** steps, axis=1)  # phi + phi^2 + ... + phi^h
+    forecast = level[best, rows][:, None] + damp * trend[best, rows][:, None] + \
+        seas[best, rows][:, (t + steps - 1) % season]
+    return forecast, best
+
+def holt_winters(Y, horizon=HORIZON, season=SEASON, grid=HW_GRID):
+    """Additive damped Holt-Winters forecasts; each series uses its best grid point."""
+    state = next(hw_states(Y, season, grid))
+    return hw_forecast(*state, horizon, season, grid)[0]
+
+MODELS = {
+    'seasonal_naive': seasonal_naive,
+    'linear_fourier': linear_fourier,
+    'holt_winters': holt_winters,
+}
+
+def forecast_chunk(Y, horizon=HORIZON, season=SEASON, models=tuple(MODELS)):
+    """(forecast, best model index, backtest MAE per model) for a block of series.
+
+    The backtest fits each model on all but the last `horizon` months and scores it on them.
+    A model those months are too few for gets a NaN error and is never chosen.
+    """
+    Y = np.asarray(Y, dtype=np.float64)
+    train, test = Y[:, :-horizon], Y[:, -horizon:]
+    usable = [m for m in models if train.shape[1] >= min_train_months(m, season)]
+    if not usable:
+        need = horizon + min(min_train_months(m, season) for m in models)
+        raise ValueError(f"{Y.shape[1]} months are too few to backtest {', '.join(models)} over {horizon} "
+                         f"months: need at least {need}")
+    errors = np.full((len(Y), len(models)), np.nan)
+    for i, m in enumerate(models):
+        if m in usable:
+            errors[:, i] = np.abs(MODELS[m](train, horizon, season) - test).mean(axis=1)
+    best = np.where(np.isnan(errors), np.inf, errors).argmin(axis=1)
+    forecast = np.empty((len(Y), horizon))
+    for i, m in enumerate(models):
+        rows = best == i
+        if rows.any():
+            forecast[rows] = MODELS[m](Y[rows], horizon, season)
+    return forecast, best, errors
+
+def _init_worker():
+    from threadpoolctl import threadpool_limits
+    threadpool_limits(1)  # parallelism comes from the pool
+
+def forecast_many(Y, horizon=HORIZON, season=SEASON, models=tuple(MODELS), n_jobs=None, chunk_series=CHUNK_SERIES):
+    """forecast_chunk over row chunks of Y in parallel; same outputs as one big call."""
+    chunks = [Y[i:i + chunk_series] for i in range(0, len(Y), chunk_series)]
+    n_jobs = min(n_jobs or os.cpu_count(), len(chunks))
+    if n_jobs == 1:
+        parts = [forecast_chunk(c, horizon, season, models) for c in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker) as pool:
+            parts = list(pool.map(forecast_chunk, chunks, *zip(*[(horizon, season, models)] * len(chunks))))
+    return tuple(np.concatenate(p) for p in zip(*parts))
+
+def synthetic_series(n_series, months=48, season=SEASON, seed=42):
+    """Store x SKU style monthly sales: level, trend, seasonality, noise (float64, >= 0)."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(months)
+    level = rng.lognormal(4, 1, (n_series, 1))
+    trend = rng.normal(0.005, 0.01, (n_series, 1)) * level
+    amplitude = rng.uniform(0, 0.4, (n_series, 1)) * level
+    phase = rng.uniform(0, 2 * np.pi, (n_series, 1))
+    noise = rng.normal(0, 0.1, (n_series, months)) * level
+    return np.maximum(level + trend * t + amplitude * np.sin(2 * np.pi * t / season + phase) + noise, 0)
+
+def benchmark(n_series, months, jobs):
+    Y = synthetic_series(n_series, months)
+    print(f"{n_series:,} series x {months} months, horizon {HORIZON}")
+    for name, fn in MODELS.items():
+        t0 = time.perf_counter()
+        fn(Y, HORIZON, SEASON)
+        print(f"  {name:<16}{n_series / (time.perf_counter() - t0):>14,.0f} series/s (single fit)")
+    for n_jobs in jobs:
+        t0 = time.perf_counter()
+        _, best, errors = forecast_many(Y, n_jobs=n_jobs)
+        seconds = time.perf_counter() - t0
+        share = ', '.join(f"{m} {np.mean(best == i):.0%}" for i, m in enumerate(MODELS))
+        print(f"  backtest + select, {n_jobs} worker(s): {n_series / seconds:>12,.0f} series/s ({share})")
+
+def main():
+    parser = argparse.ArgumentParser(description='Batched forecasting throughput')
+    parser.add_argument('--series', type=int, default=50_000)
+    parser.add_argument('--months', type=int, default=48)
+    parser.add_argument('--jobs', type=int, nargs='+', default=[os.cpu_count()])
+    args = parser.parse_args()
+    benchmark(args.series, args.months, args.jobs)
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,17 @@
 """
 Generate sample sales time-series data for portfolio demo.
 Replace with Superstore or real data: https://www.kaggle.com/datasets/vivek468/superstore-dataset-final
+Writes data/raw/sales_monthly.csv and its region -> store -> SKU breakdown sales_hierarchy.csv;
+name one of them to write only that file: python generate_sample_data.py [monthly] [hierarchy]
 """
+import argparse
 import pandas as pd
 import numpy as np
 
+parser = argparse.ArgumentParser(description='Sample monthly sales and hierarchy')
+parser.add_argument('files', nargs='*', choices=['monthly', 'hierarchy'], default=['monthly', 'hierarchy'])
+files = parser.parse_args().files
+
 np.random.seed(42)
 dates = pd.date_range('2020-01-01', periods=48, freq='MS')  # 4 years monthly
 
@@ -15,5 +22,22 @@ noise = np.random.normal(0, 5, 48)
 sales = np.clip(trend + seasonality + noise, 50, 250)
 
 df = pd.DataFrame({'date': dates, 'sales': sales.astype(int), 'region': 'National'})
-df.to_csv('../data/raw/sales_monthly.csv', index=False)
-print(f"Generated {len(df)} months. Mean sales: {df['sales'].mean():.0f}")
+if 'monthly' in files:
+    df.to_csv('../data/raw/sales_monthly.csv', index=False)
+    print(f"Generated {len(df)} months. Mean sales: {df['sales'].mean():.0f}")
+
+# Region -> store -> SKU breakdown of the national series (hierarchical forecasting)
+rng = np.random.default_rng(7)
+regions = ['North', 'South', 'East', 'West']
+keys = pd.DataFrame([(r, f'{r[0]}{s}', f'SKU{k:02d}') for r in regions for s in range(1, 4) for k in range(1, 11)],
+                    columns=['region', 'store', 'sku'])
+shares = rng.dirichlet(np.full(len(keys), 2.0))
+phase = rng.uniform(-0.5, 0.5, (len(keys), 1))  # SKUs peak in slightly different months
+seasonal_mix = 1 + 0.1 * np.sin(2 * np.pi * np.arange(48) / 12 + phase)
+bottom = shares[:, None] * sales * seasonal_mix * rng.lognormal(0, 0.08, (len(keys), 48))
+hier = keys.loc[keys.index.repeat(48)].reset_index(drop=True)
+hier.insert(0, 'date', np.tile(dates, len(keys)))
+hier['sales'] = bottom.ravel().round(2)
+if 'hierarchy' in files:
+    hier.to_csv('../data/raw/sales_hierarchy.csv', index=False)
+    print(f"Generated {len(keys)} SKU x store series ({len(hier)} rows)")
@@ -0,0 +1,235 @@
+"""
+Streaming ingestion of order-line sales (Superstore layout) into a monthly sales cube.
+Transaction files are streamed with pyarrow's CSV reader one BLOCK_BYTES block at a time. Only
+the date, key and value columns are converted, and text columns arrive dictionary-encoded
+(codes + distinct values). Raw lines are never held beyond one block:
+    dates    each distinct date string is parsed once (a cache shared across blocks) and
+             mapped to a month ordinal; lines with a blank or unparseable date are counted
+             and dropped
+    keys     region / category / product labels get global integer codes; a block maps only
+             its distinct combinations to series ids
+    values   summed per (series, month) with one bincount per block into a growing
+             (series x months) array; the bincount is dense only while (series seen x
+             months in the block) is no larger than the block, else it runs over the pairs
+             the block contains, so per-block memory follows the block, not the catalogue
+The cube is a directory - values.npy (series x months, float64, memory-mappable), months.npy
+(datetime64[M]), keys.csv (one row per series) and meta.json (levels and source file versions,
+so unchanged sources are not re-ingested). run_analysis.py forecasts it when it exists.
+
+Run from project root:
+    python scripts/ingest.py orders_2023.csv orders_2024.csv [--cube data/processed/sales_cube]
+    python scripts/ingest.py --synthetic 5000000    # throughput on generated order lines
+"""
+import os
+import json
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pcsv
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CUBE = os.path.join(BASE, 'data', 'processed', 'sales_cube')
+BLOCK_BYTES = 16 << 20
+DATE_COL = 'Order Date'
+VALUE_COL = 'Sales'
+KEY_COLS = {'Region': 'region', 'Category': 'category', 'Product ID': 'product'}  # source column -> level
+
+def file_version(fp):
+    st = os.stat(fp)
+    return f"{os.path.abspath(fp)}:{st.st_size}:{st.st_mtime_ns}"
+
+class MonthlyAccumulator:
+    """(series x months) sums built block by block; series and months are added as they appear.
+
+    Text columns are passed as (codes, distinct values) pairs, as dictionary encoding gives them.
+    """
+
+    def __init__(self, n_levels, date_format=None):
+        self.date_format = date_format
+        self._months = {}  # date string -> month ordinal (year * 12 + month - 1)
+        self._labels = [{} for _ in range(n_levels)]  # per level: label -> code
+        self._series = {}  # packed level codes -> series id
+        self._bits = 63 // n_levels
+        self.values = np.zeros((1024, 0))
+        self.first_month = None
+        self.rows = 0
+        self.skipped = 0  # lines without a usable date
+
+    def _month_ordinals(self, codes, uniques):
+        """Month ordinal per line; -1 where the date is blank or cannot be parsed."""
+        new = [u for u in uniques if u not in self._months]
+        if new:
+            parsed = pd.to_datetime(pd.Series(new, dtype=object), format=self.date_format, errors='coerce')
+            ordinals = (parsed.dt.year * 12 + parsed.dt.month - 1).fillna(-1).astype(np.int64)
+            self._months.update(zip(new, ordinals.tolist()))
+        return np.array([self._months[u] for u in uniques], dtype=np.int64)[codes]
+
+    def _series_ids(self, key_columns):
+        packed = np.zeros(len(key_columns[0][0]), dtype=np.int64)
+        for labels, (codes, uniques) in zip(self._labels, key_columns):
+            lookup = np.array([labels.setdefault(u, len(labels)) for u in uniques], dtype=np.int64)
+            if len(labels) >= 1 << self._bits:
+                raise ValueError(f"More than {(1 << self._bits) - 1:,} labels in one level")
+            packed = (packed << self._bits) | lookup[codes]
+        codes, uniques = pd.factorize(packed)
+        return np.array([self._series.setdefault(u, len(self._series)) for u in uniques], dtype=np.int64)[codes]
+
+    def _fit(self, n_series, lo, hi):
+        """Grow self.values to hold n_series rows and month ordinals lo..hi."""
+        if self.first_month is None:
+            self.first_month = lo
+        rows, cols = self.values.shape
+        left = max(self.first_month - lo, 0)
+        right = max(hi - (self.first_month + cols - 1), 0)
+        if n_series > rows or left or right:
+            grown = np.zeros((max(rows, 2 * n_series), cols + left + right))
+            grown[:rows, left:left + cols] = self.values
+            self.values = grown
+            self.first_month -= left
+
+    def add(self, dates, key_columns, values):
+        month = self._month_ordinals(*dates)
+        self.rows += len(month)
+        valid = month >= 0
+        if not valid.all():
+            self.skipped += int((~valid).sum())
+            month, values = month[valid], values[valid]
+            key_columns = [(codes[valid], uniques) for codes, uniques in key_columns]
+            if not len(month):
+                return
+        sid = self._series_ids(key_columns)
+        lo, hi = month.min(), month.max()
+        self._fit(len(self._series), lo, hi)
+        span = hi - lo + 1
+        n = sid.max() + 1
+        cell = sid * span + (month - lo)
+        start = lo - self.first_month
+        if n * span <= len(cell):  # a dense (series seen so far x span) block is no bigger than the lines
+            sums = np.bincount(cell, weights=values, minlength=n * span)
+            self.values[:n, start:start + span] += sums.reshape(n, span)
+        else:  # large catalogue: sum only the (series, month) pairs that occur in this block
+            codes, cell_ids = pd.factorize(cell)
+            sums = np.bincount(codes, weights=values, minlength=len(cell_ids))
+            self.values[cell_ids // span, cell_ids % span + start] += sums  # pairs are unique
+
+    def result(self, levels):
+        """(keys, months, values) with series sorted by their labels."""
+        if self.first_month is None:
+            raise ValueError(f"No order lines with a usable date ({self.skipped:,} skipped)")
+        names = [np.empty(len(labels), dtype=object) for labels in self._labels]
+        for out, labels in zip(names, self._labels):
+            out[list(labels.values())] = list(labels.keys())
+        packed = np.fromiter(self._series.keys(), dtype=np.int64, count=len(self._series))
+        mask = (1 << self._bits) - 1
+        keys = pd.DataFrame({level: names[i][(packed >> (self._bits * (len(levels) - 1 - i))) & mask]
+                             for i, level in enumerate(levels)})
+        order = keys.sort_values(levels).index.to_numpy()
+        months = np.arange(self.first_month, self.first_month + self.values.shape[1])
+        months = (months - 1970 * 12).astype('datetime64[M]')
+        return keys.loc[order].reset_index(drop=True), months, self.values[:len(keys)][order]
+
+def _encoded(column):
+    """(codes, distinct values) of a dictionary-encoded Arrow column; nulls get the value None."""
+    column = column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+    uniques = column.dictionary.to_pylist()
+    codes = pc.fill_null(column.indices, len(uniques)) if column.null_count else column.indices
+    return codes.to_numpy(zero_copy_only=False), uniques + [None] * bool(column.null_count)
+
+def ingest(paths, key_cols=KEY_COLS, date_col=DATE_COL, value_col=VALUE_COL, block_bytes=BLOCK_BYTES,
+           date_format=None, encoding='utf-8'):
+    """Stream transaction CSVs into (keys, months, values, rows read)."""
+    acc = MonthlyAccumulator(len(key_cols), date_format)
+    text = pa.dictionary(pa.int32(), pa.string())
+    convert = pcsv.ConvertOptions(include_columns=[date_col, value_col, *key_cols],
+                                  column_types={date_col: text, value_col: pa.float64()} | {c: text for c in key_cols})
+    for path in paths:
+        reader = pcsv.open_csv(path, read_options=pcsv.ReadOptions(block_size=block_bytes, encoding=encoding),
+                               convert_options=convert)
+        for batch in reader:
+            if batch.num_rows:
+                acc.add(_encoded(batch.column(date_col)), [_encoded(batch.column(c)) for c in key_cols],
+                        pc.fill_null(batch.column(value_col), 0.0).to_numpy())
+    if acc.skipped:
+        print(f"Skipped {acc.skipped:,} of {acc.rows:,} order lines with a blank or unparseable {date_col!r}")
+    return (*acc.result(list(key_cols.values())), acc.rows)
+
+def write_cube(keys, months, values, root=CUBE, sources=()):
+    os.makedirs(root, exist_ok=True)
+    np.save(os.path.join(root, 'values.npy'), np.ascontiguousarray(values))
+    np.save(os.path.join(root, 'months.npy'), months.astype('datetime64[M]'))
+    keys.to_csv(os.path.join(root, 'keys.csv'), index=False)
+    with open(os.path.join(root, 'meta.json'), 'w') as f:
+        json.dump({'levels': list(keys.columns), 'sources': [file_version(p) for p in sources]}, f, indent=2)
+
+def read_cube(root=CUBE, mmap=True):
+    """(keys, month start dates, values) of a cube; values is memory-mapped unless mmap=False."""
+    with open(os.path.join(root, 'meta.json')) as f:
+        levels = json.load(f)['levels']
+    keys = pd.read_csv(os.path.join(root, 'keys.csv'), dtype={level: str for level in levels}, keep_default_na=False)
+    months = pd.DatetimeIndex(np.load(os.path.join(root, 'months.npy')).astype('datetime64[ns]'))
+    return keys, months, np.load(os.path.join(root, 'values.npy'), mmap_mode='r' if mmap else None)
+
+def cube_is_current(paths, root=CUBE):
+    fp = os.path.join(root, 'meta.json')
+    if not os.path.exists(fp):
+        return False
+    with open(fp) as f:
+        return json.load(f)['sources'] == [file_version(p) for p in paths]
+
+def build_cube(paths, root=CUBE, force=False, **kwargs):
+    """Ingest `paths` into the cube at `root` unless it already holds these file versions; lines read (0 if skipped)."""
+    if not force and cube_is_current(paths, root):
+        return 0
+    keys, months, values, rows = ingest(paths, **kwargs)
+    write_cube(keys, months, values, root, paths)
+    print(f"Ingested {rows:,} order lines -> {len(keys):,} series x {len(months)} months ({root})")
+    return rows
+
+def synthetic_transactions(path, n_rows, n_products=2_000, start='2020-01-01', days=1_461, seed=42,
+                           chunk_rows=1_000_000):
+    """Write Superstore-style order lines (m/d/Y dates) to path, chunk by chunk."""
+    rng = np.random.default_rng(seed)
+    regions = np.array(['Central', 'East', 'South', 'West'])
+    categories = np.array(['Furniture', 'Office Supplies', 'Technology'])
+    product_ids = np.array([f'{categories[i % 3][:3].upper()}-{i:08d}' for i in range(n_products)])
+    day_labels = pd.date_range(start, periods=days).strftime('%-m/%-d/%Y').to_numpy()
+    for i, first in enumerate(range(0, n_rows, chunk_rows)):
+        n = min(chunk_rows, n_rows - first)
+        product = rng.integers(0, n_products, n)
+        pd.DataFrame({'Order Date': day_labels[rng.integers(0, days, n)], 'Region': regions[rng.integers(0, 4, n)],
+                      'Category': categories[product % 3], 'Product ID': product_ids[product],
+                      'Sales': rng.lognormal(4, 1, n).round(2)}).to_csv(path, mode='w' if i == 0 else 'a',
+                                                                       header=i == 0, index=False)
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream order lines into the monthly sales cube')
+    parser.add_argument('paths', nargs='*', help='transaction CSVs (Superstore columns)')
+    parser.add_argument('--cube', default=CUBE)
+    parser.add_argument('--date-format', default=None, help="e.g. '%%m/%%d/%%Y'; inferred when omitted")
+    parser.add_argument('--encoding', default='utf-8')
+    parser.add_argument('--force', action='store_true', help='re-ingest even if the sources are unchanged')
+    parser.add_argument('--synthetic', type=int, help='generate this many order lines first')
+    args = parser.parse_args()
+
+    paths = args.paths
+    if args.synthetic:
+        import tempfile
+        paths = [os.path.join(tempfile.mkdtemp(), 'orders.csv')]
+        synthetic_transactions(paths[0], args.synthetic)
+        print(f"{args.synthetic:,} order lines, {os.path.getsize(paths[0]) / 1e6:,.0f} MB -> {paths[0]}")
+    if not paths:
+        parser.error('give transaction CSVs or --synthetic N')
+    t0 = time.perf_counter()
+    rows = build_cube(paths, args.cube, args.force, date_format=args.date_format, encoding=args.encoding)
+    if rows:
+        seconds = time.perf_counter() - t0
+        print(f"  {seconds:.1f}s ({rows / seconds:,.0f} lines/s)")
+    else:
+        print(f"Cube is current: {args.cube}")
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,27 @@
 """
 Sales Performance & Time-Series Forecasting.
-Uses sample data or load Superstore CSV for production.
+Uses sample data or load Superstore CSV for production: set SALES_TRANSACTIONS to order-line
+CSVs (os.pathsep-separated) and they are streamed into data/processed/sales_cube and forecast.
 """
 import os
+import sys
 import pandas as pd
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 
+from forecast_engine import MODELS, forecast_many
+from backtest import backtest, leaderboard, rolling_origins
+from hierarchy import Hierarchy, bottom_matrix, historical_shares
+from ingest import CUBE, build_cube, read_cube
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.render import Chart, render
+
 BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 RAW = os.path.join(BASE, 'data', 'raw', 'sales_monthly.csv')
+RAW_HIERARCHY = os.path.join(BASE, 'data', 'raw', 'sales_hierarchy.csv')
 VIZ = os.path.join(BASE, 'visualizations')
 DATA = os.path.join(BASE, 'data', 'processed')
 os.makedirs(VIZ, exist_ok=True)
@@ -18,10 +29,50 @@ os.makedirs(DATA, exist_ok=True)
 os.makedirs(os.path.dirname(RAW), exist_ok=True)
 
 def ensure_data():
-    if not os.path.exists(RAW):
-        import subprocess
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        subprocess.run(['python', os.path.join(script_dir, 'generate_sample_data.py')], cwd=script_dir, check=True)
+    """Generate sample data only when sales_monthly.csv is missing; existing files are never overwritten.
+
+    The sample hierarchy breaks down the sample monthly series, so it is generated only along with it.
+    """
+    if os.path.exists(RAW):
+        return
+    files = ['monthly'] + ([] if os.path.exists(RAW_HIERARCHY) else ['hierarchy'])
+    import subprocess
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    subprocess.run(['python', os.path.join(script_dir, 'generate_sample_data.py')] + files, cwd=script_dir,
+                   check=True)
+
+def forecast_hierarchy(keys, dates, Y, filename, horizon=12):
+    """Base forecasts for every node of the hierarchy in keys' columns, reconciled three ways."""
+    h = Hierarchy(keys, levels=list(keys.columns))
+    base, best, errors = forecast_many(h.aggregate(Y), horizon=horizon)
+    variances = np.maximum(errors[np.arange(len(best)), best], 1e-6) ** 2  # backtest MAE^2 of the chosen model
+    reconciled = {
+        'bottom_up': h.reconcile(base, 'bottom_up'),
+        'top_down': h.reconcile(base, 'top_down', shares=historical_shares(Y)),
+        'mint': h.reconcile(base, 'mint', weights=variances),
+    }
+    gap = np.abs(h.bottom_up(base) - base)[0].max()
+    print(f"Hierarchy {' -> '.join(h.levels)}: {h.n_bottom} series, {h.n_agg} aggregate nodes | base forecasts off by up to "
+          f"{gap:.1f} at the total; MinT total next month {reconciled['mint'][0, 0]:.1f}")
+    future_dates = pd.date_range(dates[-1] + pd.offsets.MonthBegin(1), periods=horizon, freq='MS')
+    out = h.nodes.loc[h.nodes.index.repeat(horizon)].reset_index(drop=True)
+    out.insert(1, 'date', np.tile(future_dates, len(h.nodes)))
+    out['base'] = base.ravel()
+    for method, values in reconciled.items():
+        out[method] = values.ravel()
+    out.to_csv(os.path.join(DATA, filename), index=False)
+
+def plot_sales_forecast(history, future_dates, forecast, model_name):
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.plot(history.index, history['sales'], label='Actual', marker='o', markersize=3)
+    ax.plot(history.index, history['ma_6'], label='6-month MA', linestyle='--')
+    ax.plot(future_dates, forecast, label=f'12-month forecast ({model_name})', linestyle=':', color='green')
+    ax.set_title('Sales Performance & 12-Month Forecast')
+    ax.set_ylabel('Sales')
+    ax.legend()
+    plt.xticks(rotation=45)
+    fig.tight_layout()
+    return fig
 
 def main():
     ensure_data()
@@ -29,38 +80,61 @@ def main():
     df['date'] = pd.to_datetime(df['date'])
     df = df.set_index('date').sort_index()
 
+    # 12-month forecast per region: best of seasonal naive / linear+Fourier / Holt-Winters by backtest
+    series = df.pivot_table(index='region', columns=df.index, values='sales', aggfunc='sum').fillna(0)
+    forecasts, best, errors = forecast_many(series.to_numpy(dtype=float), horizon=12)
+    national = series.index.get_loc('National') if 'National' in series.index else 0
+    forecast = forecasts[national]
+    model_name = list(MODELS)[best[national]]
+    print(f"Forecast model ({series.index[national]}): {model_name} | backtest MAE: "
+          + ", ".join(f"{m} {e:.1f}" for m, e in zip(MODELS, errors[national])))
+    df = df[df['region'] == series.index[national]].copy()
+
+    # Rolling-origin backtest: the last 6 origins, 12 months ahead each (needs >= 36 months)
+    try:
+        origins = rolling_origins(series.shape[1])
+    except ValueError as e:
+        print(f"Backtest leaderboard skipped: {e}")
+    else:
+        board = leaderboard(backtest(series.to_numpy(dtype=float), origins))
+        print(f"Backtest leaderboard ({len(origins)} origins x 12 months, all regions):")
+        print(board.to_string(index=False))
+        board.to_csv(os.path.join(DATA, 'backtest_leaderboard.csv'), index=False)
+
     # Simple moving average forecast (no Prophet/ARIMA for lighter deps)
     df['ma_3'] = df['sales'].rolling(3).mean()
     df['ma_6'] = df['sales'].rolling(6).mean()
 
-    # Naive trend extrapolation for 12-month forecast
-    from sklearn.linear_model import LinearRegression
-    X = np.arange(len(df)).reshape(-1, 1)
-    y = df['sales'].values
-    model = LinearRegression().fit(X, y)
-    future_idx = np.arange(len(df), len(df) + 12).reshape(-1, 1)
-    forecast = model.predict(future_idx)
-
     # Plot
-    fig, ax = plt.subplots(figsize=(10, 5))
-    ax.plot(df.index, df['sales'], label='Actual', marker='o', markersize=3)
-    ax.plot(df.index, df['ma_6'], label='6-month MA', linestyle='--')
     future_dates = pd.date_range(df.index[-1] + pd.offsets.MonthBegin(1), periods=12, freq='MS')
-    ax.plot(future_dates, forecast, label='12-month forecast', linestyle=':', color='green')
-    ax.set_title('Sales Performance & 12-Month Forecast')
-    ax.set_ylabel('Sales')
-    ax.legend()
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig(os.path.join(VIZ, 'sales_forecast.png'), dpi=100)
-    plt.close()
+    render([Chart(os.path.join(VIZ, 'sales_forecast.png'), plot_sales_forecast,
+                  {'history': df[['sales', 'ma_6']], 'future_dates': future_dates, 'forecast': forecast,
+                   'model_name': model_name})])
+
+    if os.path.exists(RAW_HIERARCHY):
+        keys, dates, Y = bottom_matrix(pd.read_csv(RAW_HIERARCHY, parse_dates=['date']))
+        forecast_hierarchy(keys, dates, Y, 'hierarchy_forecast_12m.csv')
+    else:
+        print(f"Hierarchy forecast skipped: no {os.path.relpath(RAW_HIERARCHY, BASE)}")
+
+    # Order lines (Superstore layout): stream into the monthly cube, forecast region -> category -> product
+    transactions = [p for p in os.environ.get('SALES_TRANSACTIONS', '').split(os.pathsep) if p]
+    if transactions:
+        build_cube(transactions)
+    if os.path.exists(os.path.join(CUBE, 'meta.json')):
+        forecast_hierarchy(*read_cube(CUBE), 'cube_forecast_12m.csv')
 
     # YoY growth
     df['yoy'] = df['sales'].pct_change(12) * 100
     print("YoY growth (last):", f"{df['yoy'].dropna().iloc[-1]:.1f}%")
 
     # Save forecast
-    pd.DataFrame({'date': future_dates, 'forecast': forecast}).to_csv(os.path.join(DATA, 'forecast_12m.csv'), index=False)
+    pd.DataFrame({
+        'date': np.tile(future_dates, len(series)),
+        'region': np.repeat(series.index, 12),
+        'forecast': forecasts.ravel(),
+        'model': np.repeat(np.array(list(MODELS))[best], 12),
+    }).to_csv(os.path.join(DATA, 'forecast_12m.csv'), index=False)
     print("Done. Outputs:", VIZ, DATA)
 
 if __name__ == '__main__':
@@ -0,0 +1,232 @@
+"""
+Panel engine for World Bank style data: a dense (country x indicator x year) float32 cube.
+Labels live in index maps (country -> row, indicator -> slice, year -> column offset), so a
+lookup is a dict access, and every statistic is a vectorized operation along the year axis
+(last axis) of any slice of the cube:
+    yoy_growth    % change on the previous year
+    cagr          compound annual growth between the first and last non-null years
+    latest        last non-null value and its position
+    rank          cross-country rank (1 = highest), NaN-aware
+    correlation   pairwise-complete Pearson correlation between indicators over country-years
+On disk (Panel.save) every indicator is its own (country x year) .npy next to index.json, and
+Panel.open() reads only the index: an indicator is loaded the first time it is asked for.
+
+Run from project root: python scripts/panel.py [--countries 217 --indicators 1400 --years 60]
+"""
+import os
+import json
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PANEL_ROOT = os.path.join(BASE, "data", "processed", "wb_panel")
+
+
+def _positions(x):
+    """(first, last) non-null positions along the last axis and whether there is any."""
+    valid = ~np.isnan(x)
+    first = np.argmax(valid, axis=-1)
+    last = x.shape[-1] - 1 - np.argmax(valid[..., ::-1], axis=-1)
+    return first, last, valid.any(axis=-1)
+
+
+def _take(x, pos):
+    return np.take_along_axis(x, pos[..., None], axis=-1)[..., 0]
+
+
+def yoy_growth(x):
+    """% change on the previous year; the first year is NaN."""
+    out = np.full(x.shape, np.nan, dtype=np.float32)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[..., 1:] = (x[..., 1:] / x[..., :-1] - 1) * 100
+    return out
+
+
+def latest(x):
+    """(value, position) of the last non-null year; position is -1 where there is no data."""
+    _, last, has = _positions(x)
+    return np.where(has, _take(x, last), np.nan), np.where(has, last, -1)
+
+
+def cagr(x):
+    """Compound annual growth (%) from the first to the last non-null year (NaN unless both > 0)."""
+    first, last, has = _positions(x)
+    v0, v1, span = _take(x, first), _take(x, last), last - first
+    ok = has & (span > 0) & (v0 > 0) & (v1 > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(ok, ((v1 / v0) ** (1 / np.maximum(span, 1)) - 1) * 100, np.nan)
+
+
+def rank(x, axis=0, ascending=False):
+    """Rank along `axis` (countries by default), 1 = highest; ties by position, NaN stays NaN."""
+    missing = np.isnan(x)
+    order = np.argsort(np.where(missing, np.inf, x if ascending else -x), axis=axis, kind="stable")
+    shape = [1] * x.ndim
+    shape[axis] = -1
+    ranks = np.empty(x.shape, dtype=np.float32)
+    np.put_along_axis(ranks, order, np.broadcast_to(np.arange(1, x.shape[axis] + 1).reshape(shape), x.shape),
+                      axis=axis)
+    ranks[missing] = np.nan
+    return ranks
+
+
+def correlation(x, min_obs=3):
+    """(indicator x indicator) Pearson correlation over the (country, year) cells both have."""
+    X = np.moveaxis(x, 1, -1).reshape(-1, x.shape[1]).astype(np.float64)  # (country-years, indicators)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        X = (X - np.nanmean(X, axis=0)) / np.nanstd(X, axis=0)  # scale only: avoids cancellation
+    present = ~np.isnan(X)
+    X0, M = np.where(present, X, 0.0), present.astype(np.float64)
+    n = M.T @ M  # pairwise counts
+    sx = X0.T @ M  # sx[i, j]: sum of indicator i where j is present too
+    sxx = (X0 * X0).T @ M
+    cov = n * (X0.T @ X0) - sx * sx.T
+    var = n * sxx - sx * sx
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = cov / np.sqrt(var * var.T)
+    corr[n < min_obs] = np.nan
+    return np.clip(corr, -1, 1)
+
+
+class Panel:
+    """Dense (country x indicator x year) cube with label -> position maps."""
+
+    def __init__(self, countries, indicators, years, values=None, root=None):
+        self.countries = list(countries)
+        self.indicators = list(indicators)
+        self.years = np.arange(int(years[0]), int(years[-1]) + 1)
+        self.country_index = {c: i for i, c in enumerate(self.countries)}
+        self.indicator_index = {k: i for i, k in enumerate(self.indicators)}
+        shape = (len(self.countries), len(self.indicators), len(self.years))
+        self._root = root
+        if values is not None:
+            self.values = np.asarray(values, dtype=np.float32)
+        elif root is not None:
+            self.values = np.empty(shape, dtype=np.float32)  # filled per indicator on first access
+        else:
+            self.values = np.full(shape, np.nan, dtype=np.float32)
+        self._loaded = np.full(len(self.indicators), root is None or values is not None)
+
+    @classmethod
+    def from_frame(cls, df, country="country", date="date", columns=None):
+        """From rows of (country, date, one column per indicator); a repeated country-year keeps the last."""
+        columns = list(columns or df.columns.drop([country, date]))
+        year = pd.to_datetime(df[date]).dt.year.to_numpy()
+        c, countries = pd.factorize(df[country], sort=True)
+        panel = cls(countries, columns, [year.min(), year.max()])
+        panel.values[c, :, year - panel.years[0]] = df[columns].to_numpy(dtype=np.float32)
+        return panel
+
+    @classmethod
+    def from_records(cls, country, indicator, year, value, countries=None, indicators=None):
+        """From parallel arrays of (country, indicator, year, value) - the World Bank API layout."""
+        year = np.asarray(year, dtype=np.int64)
+        c, country_labels = pd.factorize(np.asarray(country), sort=True)
+        k, indicator_labels = pd.factorize(np.asarray(indicator), sort=True)
+        panel = cls(countries or country_labels, indicators or indicator_labels, [year.min(), year.max()])
+        if countries is not None:
+            c = np.array([panel.country_index[x] for x in country_labels])[c]
+        if indicators is not None:
+            k = np.array([panel.indicator_index[x] for x in indicator_labels])[k]
+        panel.values[c, k, year - panel.years[0]] = np.asarray(value, dtype=np.float32)
+        return panel
+
+    @classmethod
+    def open(cls, root=PANEL_ROOT):
+        """Panel over a saved directory; indicators load lazily."""
+        with open(os.path.join(root, "index.json")) as f:
+            index = json.load(f)
+        return cls(index["countries"], index["indicators"], index["years"], root=root)
+
+    def _path(self, indicator, root=None):
+        return os.path.join(root or self._root, indicator.replace(os.sep, "_") + ".npy")
+
+    def _ensure(self, idx):
+        for i in np.atleast_1d(idx):
+            if not self._loaded[i]:
+                self.values[:, i] = np.load(self._path(self.indicators[i]))
+                self._loaded[i] = True
+
+    def get(self, indicators=None):
+        """(country x year) for one indicator label, (country x indicator x year) for a list or all."""
+        if isinstance(indicators, str):
+            i = self.indicator_index[indicators]
+            self._ensure(i)
+            return self.values[:, i]
+        idx = np.arange(len(self.indicators)) if indicators is None else \
+            np.array([self.indicator_index[k] for k in indicators])
+        self._ensure(idx)
+        return self.values if indicators is None else self.values[:, idx]
+
+    def series(self, values, name=None):
+        """Per-country vector as a Series labelled by country."""
+        return pd.Series(values, index=pd.Index(self.countries, name="country"), name=name)
+
+    def frame(self, indicator):
+        """(year x country) DataFrame of one indicator."""
+        return pd.DataFrame(self.get(indicator).T, index=pd.Index(self.years, name="year"), columns=self.countries)
+
+    def latest(self, indicator):
+        """(value, year) Series of the last non-null year per country."""
+        value, pos = latest(self.get(indicator))
+        year = np.where(pos >= 0, self.years[np.maximum(pos, 0)], np.nan)
+        return self.series(value, indicator), self.series(year, "year")
+
+    def save(self, root=PANEL_ROOT):
+        os.makedirs(root, exist_ok=True)
+        self._ensure(np.arange(len(self.indicators)))
+        for i, indicator in enumerate(self.indicators):
+            np.save(self._path(indicator, root), self.values[:, i])
+        with open(os.path.join(root, "index.json"), "w") as f:
+            json.dump({"countries": self.countries, "indicators": self.indicators,
+                       "years": [int(self.years[0]), int(self.years[-1])]}, f)
+
+
+def synthetic_panel(n_countries=217, n_indicators=1400, n_years=60, missing=0.3, seed=42):
+    """Growth paths with country and indicator effects; `missing` share of cells NaN."""
+    rng = np.random.default_rng(seed)
+    level = rng.lognormal(3, 2, (n_countries, n_indicators, 1))
+    growth = rng.normal(0.02, 0.02, (n_countries, 1, 1)) + rng.normal(0, 0.01, (1, n_indicators, 1))
+    shocks = rng.normal(0, 0.03, (n_countries, n_indicators, n_years))
+    values = (level * np.exp(np.cumsum(growth + shocks, axis=-1))).astype(np.float32)
+    values[rng.random(values.shape) < missing] = np.nan
+    return Panel([f"C{i:03d}" for i in range(n_countries)], [f"IND.{i:04d}" for i in range(n_indicators)],
+                 [1964, 1964 + n_years - 1], values)
+
+
+def benchmark(n_countries, n_indicators, n_years):
+    panel = synthetic_panel(n_countries, n_indicators, n_years)
+    x = panel.values
+    print(f"{n_countries} countries x {n_indicators} indicators x {n_years} years, "
+          f"{x.nbytes / 1e6:,.0f} MB float32")
+    for name, fn in [("yoy_growth", yoy_growth), ("latest", latest), ("cagr", cagr),
+                     ("rank (latest)", lambda v: rank(latest(v)[0])), ("correlation", correlation)]:
+        t0 = time.perf_counter()
+        fn(x)
+        print(f"  {name:<16}{time.perf_counter() - t0:>8.3f}s")
+    import tempfile
+    root = tempfile.mkdtemp()
+    panel.save(root)
+    t0 = time.perf_counter()
+    lazy = Panel.open(root)
+    lazy.get(panel.indicators[:3])
+    print(f"  open + 3 indicators {time.perf_counter() - t0:.3f}s (lazy)")
+    t0 = time.perf_counter()
+    lazy.get()
+    print(f"  all indicators      {time.perf_counter() - t0:.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Panel engine throughput")
+    parser.add_argument("--countries", type=int, default=217)
+    parser.add_argument("--indicators", type=int, default=1400)
+    parser.add_argument("--years", type=int, default=60)
+    args = parser.parse_args()
+    benchmark(args.countries, args.indicators, args.years)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 """
 Geographic & Regional Performance – World Bank Development Indicators.
-Fetches GDP, GDP per capita, Urban population; analyzes regional trends and growth.
+Fetches GDP, GDP per capita, Urban population (scripts/wb_fetch.py); analyzes regional trends and growth.
 Run: python scripts/run_analysis.py
 """
 import os
+import sys
+import warnings
 import pandas as pd
 import numpy as np
 import matplotlib
@@ -11,6 +13,12 @@ matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from panel import PANEL_ROOT, Panel, cagr, correlation, latest, rank, yoy_growth
+from wb_fetch import fetch_indicators
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.render import Chart, render
+
 BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 RAW = os.path.join(BASE, 'data', 'raw')
 PROCESSED = os.path.join(BASE, 'data', 'processed')
@@ -28,44 +36,62 @@ INDICATORS = {
 
 # Key markets for multinational analysis (ING operates in 40+ countries)
 COUNTRIES = ["USA", "DEU", "FRA", "GBR", "NLD", "BRA", "IND", "CHN", "JPN"]
+START_YEAR, END_YEAR = 2008, 2023
 CACHE_PATH = os.path.join(RAW, "wb_indicators.csv")
+MAX_LABELLED = 20  # scatter points get country labels up to this many countries
+
+
+def fetch_worldbank():
+    """(rows of country, date, one column per indicator, fetch stats) through the batch cache."""
+    records, stats = fetch_indicators(list(INDICATORS), COUNTRIES, START_YEAR, END_YEAR)
+    print(f"World Bank API: {stats['cached']} cached + {stats['fetched']} fetched batches, "
+          f"{len(stats['failed'])} failed")
+    if records.empty:
+        return None, stats
+    df = records.pivot_table(index=["country", "year"], columns="indicator", values="value")
+    df = df.rename(columns=INDICATORS).reset_index()
+    df.insert(1, "date", pd.to_datetime(df.pop("year").astype(str)))
+    return df.rename_axis(columns=None), stats
+
 
+def _snapshot_rows(df):
+    """df as wb_indicators.csv text, one sorted line per country-year (row order ignored)."""
+    return sorted(df.to_csv(index=False, header=False, date_format="%Y-%m-%d").splitlines())
 
-def fetch_wbdata():
-    """Fetch World Bank data via wbdata API."""
-    try:
-        import wbdata
-    except ImportError:
-        print("Installing wbdata...")
-        import subprocess
-        subprocess.check_call(['pip', 'install', 'wbdata'])
-        import wbdata
 
-    print("Fetching World Bank data (2008-2023)...")
-    df = wbdata.get_dataframe(
-        INDICATORS,
-        country=COUNTRIES,
-        date=("2008", "2023"),
-        parse_dates=True
-    )
-    return df
+def save_snapshot(df):
+    """Write wb_indicators.csv only when its content changes - it is tracked in git."""
+    if os.path.exists(CACHE_PATH):
+        current = pd.read_csv(CACHE_PATH, parse_dates=["date"])
+        if list(current.columns) == list(df.columns) and _snapshot_rows(current) == _snapshot_rows(df):
+            return False
+    df.sort_values(["country", "date"], ascending=[True, False]).to_csv(CACHE_PATH, index=False)
+    return True
 
 
 def load_data():
-    """Load data from API or cached CSV."""
+    """Rows of (country, date, GDP, GDP_per_capita, Urban_pop_pct).
+
+    The API through the per-batch cache (only missing or stale batches are requested); when a
+    batch fails, the last complete snapshot in wb_indicators.csv; without one, synthetic data.
+    WB_OFFLINE=1 goes straight to the snapshot.
+    """
+    if os.environ.get("WB_OFFLINE") != "1":
+        try:
+            df, stats = fetch_worldbank()
+            if df is not None and not stats["failed"]:
+                if save_snapshot(df):
+                    print("Snapshot updated:", CACHE_PATH)
+                return df
+            if df is not None and not os.path.exists(CACHE_PATH):
+                return df
+        except Exception as e:
+            print("API fetch failed:", e)
+
     if os.path.exists(CACHE_PATH):
-        df = pd.read_csv(CACHE_PATH, index_col=0, parse_dates=True)
-        if len(df) > 50:
-            print("Using cached data from", CACHE_PATH)
-            return df
-
-    try:
-        df = fetch_wbdata()
-        if df is not None and not df.empty:
-            df.to_csv(CACHE_PATH)
-            return df
-    except Exception as e:
-        print("API fetch failed:", e)
+        hint = "" if os.environ.get("WB_OFFLINE") == "1" else " (set WB_OFFLINE=1 to skip the API)"
+        print(f"Using snapshot {CACHE_PATH}{hint}")
+        return pd.read_csv(CACHE_PATH, parse_dates=["date"])
 
     # Fallback: generate synthetic sample
     print("Using synthetic sample data.")
@@ -83,8 +109,68 @@ def load_data():
                 "GDP": base_gdp * (g ** i), "GDP_per_capita": base_pc * (g ** i),
                 "Urban_pop_pct": min(95, base_urb + i * 0.5)
             })
-    df = pd.DataFrame(rows).set_index("date")
-    return df
+    return pd.DataFrame(rows)
+
+
+def summarize(panel):
+    """Per country and indicator: latest value and year, cross-country rank, CAGR and latest YoY (%)."""
+    x = panel.get()
+    value, pos = latest(x)
+    stats = {
+        "latest": value,
+        "year": np.where(pos >= 0, panel.years[np.maximum(pos, 0)], np.nan),
+        "rank": rank(value),
+        "cagr_pct": cagr(x),
+        "yoy_pct": latest(yoy_growth(x))[0],
+    }
+    index = pd.MultiIndex.from_product([panel.countries, panel.indicators], names=["country", "indicator"])
+    return pd.DataFrame({k: v.ravel() for k, v in stats.items()}, index=index)
+
+
+def plot_country_bars(values, xlabel, title, style):
+    fig, ax = plt.subplots(figsize=(10, 5))
+    values.plot(kind="barh", ax=ax, **style)
+    ax.set_xlabel(xlabel)
+    ax.set_title(title)
+    ax.invert_yaxis()
+    fig.tight_layout()
+    return fig
+
+
+def plot_gdp_trajectory(gdp):
+    fig, ax = plt.subplots(figsize=(10, 5))
+    gdp.plot(ax=ax, marker="o", markersize=4)
+    ax.set_title("GDP Trajectory – Top 5 Countries")
+    ax.set_ylabel("GDP (current US$)")
+    ax.set_xlabel("Year")
+    ax.legend(bbox_to_anchor=(1.02, 1))
+    fig.tight_layout()
+    return fig
+
+
+def plot_gdp_yoy(yoy):
+    fig, ax = plt.subplots(figsize=(10, 5))
+    yoy.plot(kind="bar", ax=ax, color="coral", edgecolor="darkred", alpha=0.8)
+    ax.set_ylabel("YoY GDP Growth (%)")
+    ax.set_title("Year-over-Year GDP Growth by Country (Latest)")
+    ax.axhline(0, color="black", linestyle="-", linewidth=0.5)
+    plt.xticks(rotation=45)
+    fig.tight_layout()
+    return fig
+
+
+def plot_gdp_vs_urbanization(means, labels):
+    """Mean urban % against mean GDP per capita, one point per country; labelled up to MAX_LABELLED."""
+    fig, ax = plt.subplots(figsize=(8, 6))
+    ax.scatter(means[:, 0], means[:, 1], s=100, c=np.arange(len(means)), cmap="tab10")
+    if len(means) <= MAX_LABELLED:
+        for label, xy in zip(labels, means):
+            ax.annotate(label, xy, xytext=(6, 4), textcoords="offset points", fontsize=8)
+    ax.set_xlabel("Urban Population (%)")
+    ax.set_ylabel("GDP per Capita (US$)")
+    ax.set_title("GDP per Capita vs Urbanization by Country")
+    fig.tight_layout()
+    return fig
 
 
 def main():
@@ -93,95 +179,61 @@ def main():
         print("No data available.")
         return
 
-    # Flatten MultiIndex if present (wbdata returns country as index level)
-    if isinstance(df.index, pd.MultiIndex):
-        df = df.reset_index()
-    elif "country" not in df.columns and df.index.name != "date":
-        df = df.reset_index()
-
-    # Ensure we have country and date
-    if "country" not in df.columns:
-        df["country"] = df.index.get_level_values("country") if isinstance(df.index, pd.MultiIndex) else "USA"
-    if "date" not in df.columns and not isinstance(df.index, pd.DatetimeIndex):
-        df["date"] = df.index
-
     # Normalize column names
     df = df.rename(columns={c: c.replace(" ", "_") for c in df.columns if " " in c})
     numeric_cols = [c for c in ["GDP", "GDP_per_capita", "Urban_pop_pct"] if c in df.columns]
     if not numeric_cols:
         numeric_cols = [c for c in df.select_dtypes(include=[np.number]).columns]
 
-    print("Shape:", df.shape, "| Countries:", df["country"].nunique() if "country" in df.columns else "N/A")
+    print("Shape:", df.shape, "| Countries:", df["country"].nunique())
+
+    # One (country x indicator x year) cube; every chart below reads from it
+    panel = Panel.from_frame(df, "country", "date", numeric_cols)
+    panel.save(PANEL_ROOT)
+    summarize(panel).to_csv(os.path.join(PROCESSED, "regional_panel_summary.csv"))
+    if len(numeric_cols) >= 2:
+        corr = pd.DataFrame(correlation(panel.get(numeric_cols)), index=numeric_cols, columns=numeric_cols)
+        print("Indicator correlation (country-years):\n" + corr.round(2).to_string())
 
+    charts = []
     # 1. GDP per capita by country (latest year)
-    if "GDP_per_capita" in df.columns and "country" in df.columns:
-        latest = df.groupby("country")["GDP_per_capita"].last().sort_values(ascending=False)
-        fig, ax = plt.subplots(figsize=(10, 5))
-        latest.plot(kind="barh", ax=ax, color="steelblue", edgecolor="navy", alpha=0.8)
-        ax.set_xlabel("GDP per Capita (current US$)")
-        ax.set_title("GDP per Capita by Country (Latest Year)")
-        ax.invert_yaxis()
-        plt.tight_layout()
-        plt.savefig(os.path.join(VIZ, "gdp_per_capita_by_country.png"), dpi=100)
-        plt.close()
+    if "GDP_per_capita" in panel.indicator_index:
+        latest_pc = panel.latest("GDP_per_capita")[0].dropna().sort_values(ascending=False)
+        charts.append(Chart(os.path.join(VIZ, "gdp_per_capita_by_country.png"), plot_country_bars, {
+            "values": latest_pc, "xlabel": "GDP per Capita (current US$)",
+            "title": "GDP per Capita by Country (Latest Year)",
+            "style": {"color": "steelblue", "edgecolor": "navy", "alpha": 0.8}}))
 
     # 2. GDP growth trajectory (top 5 countries)
-    if "GDP" in df.columns and "country" in df.columns:
-        df_grp = df.groupby(["country", df.index.year if isinstance(df.index, pd.DatetimeIndex) else pd.to_datetime(df["date"]).dt.year])["GDP"].sum().unstack(0)
-        if df_grp.shape[1] >= 2:
-            top5 = df_grp.iloc[-1].nlargest(5).index.tolist()
-            plot_cols = [c for c in top5 if c in df_grp.columns]
-            if plot_cols:
-                df_grp[plot_cols].plot(figsize=(10, 5), marker="o", markersize=4)
-                plt.title("GDP Trajectory – Top 5 Countries")
-                plt.ylabel("GDP (current US$)")
-                plt.xlabel("Year")
-                plt.legend(bbox_to_anchor=(1.02, 1))
-                plt.tight_layout()
-                plt.savefig(os.path.join(VIZ, "gdp_trajectory.png"), dpi=100)
-                plt.close()
+    if "GDP" in panel.indicator_index and len(panel.years) >= 2:
+        gdp_rank = rank(latest(panel.get("GDP"))[0])
+        top5 = [panel.countries[i] for i in np.argsort(gdp_rank)[:5] if gdp_rank[i] <= 5]
+        if top5:
+            charts.append(Chart(os.path.join(VIZ, "gdp_trajectory.png"), plot_gdp_trajectory,
+                                {"gdp": panel.frame("GDP")[top5]}))
 
     # 3. Urban population % by country (latest)
-    if "Urban_pop_pct" in df.columns and "country" in df.columns:
-        urb = df.groupby("country")["Urban_pop_pct"].last().sort_values(ascending=False)
-        fig, ax = plt.subplots(figsize=(10, 5))
-        urb.plot(kind="barh", ax=ax, color="teal", alpha=0.8)
-        ax.set_xlabel("Urban Population (% of total)")
-        ax.set_title("Urbanization by Country (Latest Year)")
-        ax.invert_yaxis()
-        plt.tight_layout()
-        plt.savefig(os.path.join(VIZ, "urban_population_by_country.png"), dpi=100)
-        plt.close()
+    if "Urban_pop_pct" in panel.indicator_index:
+        urb = panel.latest("Urban_pop_pct")[0].dropna().sort_values(ascending=False)
+        charts.append(Chart(os.path.join(VIZ, "urban_population_by_country.png"), plot_country_bars, {
+            "values": urb, "xlabel": "Urban Population (% of total)",
+            "title": "Urbanization by Country (Latest Year)", "style": {"color": "teal", "alpha": 0.8}}))
 
     # 4. YoY GDP growth by country
-    if "GDP" in df.columns and "country" in df.columns:
-        df_sorted = df.sort_values(["country", "date"])
-        df_sorted["yoy_gdp"] = df_sorted.groupby("country")["GDP"].pct_change() * 100
-        yoy_latest = df_sorted.dropna(subset=["yoy_gdp"]).groupby("country")["yoy_gdp"].last().sort_values(ascending=False)
-        fig, ax = plt.subplots(figsize=(10, 5))
-        yoy_latest.plot(kind="bar", ax=ax, color="coral", edgecolor="darkred", alpha=0.8)
-        ax.set_ylabel("YoY GDP Growth (%)")
-        ax.set_title("Year-over-Year GDP Growth by Country (Latest)")
-        ax.axhline(0, color="black", linestyle="-", linewidth=0.5)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig(os.path.join(VIZ, "gdp_yoy_growth.png"), dpi=100)
-        plt.close()
+    if "GDP" in panel.indicator_index:
+        yoy_latest = panel.series(latest(yoy_growth(panel.get("GDP")))[0]).dropna().sort_values(ascending=False)
+        charts.append(Chart(os.path.join(VIZ, "gdp_yoy_growth.png"), plot_gdp_yoy, {"yoy": yoy_latest}))
 
     # 5. Correlation: GDP per capita vs Urban %
-    if "GDP_per_capita" in df.columns and "Urban_pop_pct" in df.columns:
-        pivot = df.pivot_table(values=["GDP_per_capita", "Urban_pop_pct"], index="country", aggfunc="mean")
-        if len(pivot) >= 3:
-            fig, ax = plt.subplots(figsize=(8, 6))
-            for c in pivot.index:
-                ax.scatter(pivot.loc[c, "Urban_pop_pct"], pivot.loc[c, "GDP_per_capita"], s=100, label=c)
-            ax.set_xlabel("Urban Population (%)")
-            ax.set_ylabel("GDP per Capita (US$)")
-            ax.set_title("GDP per Capita vs Urbanization by Country")
-            ax.legend(bbox_to_anchor=(1.02, 1))
-            plt.tight_layout()
-            plt.savefig(os.path.join(VIZ, "gdp_vs_urbanization.png"), dpi=100)
-            plt.close()
+    if {"GDP_per_capita", "Urban_pop_pct"} <= panel.indicator_index.keys():
+        with np.errstate(all="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # countries without data: all-NaN means
+            means = np.nanmean(panel.get(["Urban_pop_pct", "GDP_per_capita"]), axis=-1)
+        keep = ~np.isnan(means).any(axis=1)
+        if keep.sum() >= 3:
+            charts.append(Chart(os.path.join(VIZ, "gdp_vs_urbanization.png"), plot_gdp_vs_urbanization,
+                                {"means": means[keep], "labels": np.array(panel.countries)[keep]}))
+    render(charts)
 
     # Save processed
     df.to_csv(os.path.join(PROCESSED, "regional_indicators.csv"))
@@ -0,0 +1,52 @@
+"""
+Run the regional queries in sql/queries.sql against an embedded SQLite database.
+regional_indicators is loaded from the World Bank snapshot data/raw/wb_indicators.csv (or any CSV
+with the same columns, e.g. data/processed/regional_indicators.csv from run_analysis.py) only
+when the CSV changes; query results are cached until the table is reloaded.
+
+Run from project root:
+    python scripts/run_queries.py                     # all queries
+    python scripts/run_queries.py growth health       # queries whose name contains a word
+    python scripts/run_queries.py --csv data/processed/regional_indicators.csv
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.sql_runner import QueryRunner
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW = os.path.join(BASE, "data", "raw", "wb_indicators.csv")
+DB = os.path.join(BASE, "data", "processed", "regional.sqlite")
+SQL = os.path.join(BASE, "sql")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regional indicator queries (SQLite)")
+    parser.add_argument("names", nargs="*", help="run only queries whose name contains one of these")
+    parser.add_argument("--csv", default=RAW, help="regional_indicators source CSV")
+    parser.add_argument("--db", default=DB)
+    parser.add_argument("--reload", action="store_true", help="reload the table even if the CSV is unchanged")
+    parser.add_argument("--list", action="store_true", help="list query names and exit")
+    args = parser.parse_args()
+
+    runner = QueryRunner(args.db, {"regional_indicators": args.csv}, os.path.join(SQL, "queries.sql"),
+                         os.path.join(SQL, "database_schema.sql"))
+    if args.list:
+        print("\n".join(runner.queries))
+        return
+    t0 = time.perf_counter()
+    loaded = runner.load(force=args.reload)
+    for table, rows in loaded.items():
+        print(f"Loaded {table}: {rows:,} rows in {(time.perf_counter() - t0) * 1000:.0f} ms")
+    if not loaded:
+        print(f"regional_indicators unchanged since last load (version {runner.table_version('regional_indicators')})")
+    names = [n for n in runner.queries if not args.names or any(w.lower() in n.lower() for w in args.names)]
+    runner.run_all(names)
+    runner.close()
+
+
+if __name__ == "__main__":
+    main()
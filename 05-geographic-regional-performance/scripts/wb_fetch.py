@@ -0,0 +1,240 @@
+"""
+Concurrent, resumable World Bank API fetcher with a per-batch disk cache.
+Work is split into batches of one indicator x up to COUNTRY_BATCH countries over a date range.
+Each batch is one API request (plus its extra pages), and batches run as asyncio tasks over a
+bounded pool of keep-alive HTTP connections. Blocking http.client calls run on the pool's own
+threads, so at most POOL_SIZE requests are in flight. 429/5xx responses and connection errors
+are retried with exponential backoff and jitter, honouring Retry-After. A host that does not
+resolve or refuses connections (no network, wrong WB_API_URL) fails at once instead.
+Each finished batch is written atomically to
+    data/raw/wb_cache/<indicator>/<start>-<end>_<hash of the country list>.json
+so an interrupted run keeps what it finished. A later run requests only the batches that are
+missing or older than MAX_AGE_DAYS.
+
+WB_API_URL points the fetcher elsewhere, e.g. at scripts/wb_standin.py, which serves recorded
+responses locally.
+
+Run from project root:
+    python scripts/wb_fetch.py NY.GDP.MKTP.CD SP.URB.TOTL.IN.ZS --countries USA DEU --start 2008 --end 2023
+    python scripts/wb_fetch.py --standin          # fetch twice from the local stand-in: all, then none
+"""
+import os
+import json
+import time
+import random
+import socket
+import asyncio
+import hashlib
+import argparse
+import http.client
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_ROOT = os.path.join(BASE, "data", "raw", "wb_cache")
+API_URL = os.environ.get("WB_API_URL", "https://api.worldbank.org/v2")
+POOL_SIZE = 8
+COUNTRY_BATCH = 50
+PER_PAGE = 1_000
+RETRIES = 4
+BACKOFF_S = 0.5
+TIMEOUT_S = 30
+MAX_AGE_DAYS = float(os.environ.get("WB_MAX_AGE_DAYS", 30))
+RETRY_STATUS = {429, 500, 502, 503, 504}
+UNREACHABLE = (socket.gaierror, ConnectionRefusedError)  # not worth a retry: offline or wrong host
+
+
+class FetchError(RuntimeError):
+    """A request failed for good: a non-retryable status, an API error message, or retries used up."""
+
+
+class ConnectionPool:
+    """At most `size` keep-alive connections to the API host, shared by any number of coroutines."""
+
+    def __init__(self, base_url=API_URL, size=POOL_SIZE, timeout=TIMEOUT_S):
+        url = urlsplit(base_url)
+        self._connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        self._host, self._port, self._prefix = url.hostname, url.port, url.path.rstrip("/")
+        self._timeout = timeout
+        self._idle = []
+        self._slots = asyncio.Semaphore(size)
+        self._threads = ThreadPoolExecutor(max_workers=size)
+        self.requests = 0
+
+    def _request(self, conn, path):
+        conn.request("GET", self._prefix + path, headers={"Accept": "application/json"})
+        response = conn.getresponse()
+        return response.status, response.read(), response.getheader("Retry-After")
+
+    async def get(self, path):
+        """(status, body, Retry-After) for GET path; a connection that fails is dropped, not reused."""
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else self._connection_class(self._host, self._port,
+                                                                               timeout=self._timeout)
+            self.requests += 1
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(self._threads, self._request, conn, path)
+            except BaseException:
+                conn.close()
+                raise
+            self._idle.append(conn)
+            return result
+
+    def close(self):
+        for conn in self._idle:
+            conn.close()
+        self._idle.clear()
+        self._threads.shutdown()
+
+
+async def get_json(pool, path, retries=RETRIES, backoff=BACKOFF_S):
+    """Parsed JSON of GET path, retrying throttling, server errors and broken connections."""
+    for attempt in range(retries + 1):
+        retry_after = None
+        try:
+            status, body, retry_after = await pool.get(path)
+            if status == 200:
+                data = json.loads(body)
+                if isinstance(data, list) and len(data) == 1 and "message" in data[0]:
+                    raise FetchError(f"{path}: {data[0]['message']}")
+                return data
+            if status not in RETRY_STATUS:
+                raise FetchError(f"{path}: HTTP {status}")
+            error = f"HTTP {status}"
+        except UNREACHABLE as e:
+            raise FetchError(f"{path}: API host unreachable ({e!r})") from e
+        except (OSError, http.client.HTTPException, json.JSONDecodeError) as e:
+            error = repr(e)
+        if attempt == retries:
+            raise FetchError(f"{path}: {error} after {retries + 1} attempts")
+        delay = float(retry_after) if retry_after and retry_after.isdigit() else backoff * 2 ** attempt
+        await asyncio.sleep(delay * (0.5 + random.random()))
+
+
+def _records(rows):
+    return [[r["countryiso3code"], r["country"]["value"], int(r["date"]), r["value"]]
+            for r in rows or [] if r.get("value") is not None]
+
+
+async def fetch_batch(pool, indicator, countries, start, end):
+    """[[iso3, country name, year, value], ...] of one indicator for a batch of countries; pages fetched together."""
+    path = (f"/country/{';'.join(countries)}/indicator/{indicator}"
+            f"?format=json&date={start}:{end}&per_page={PER_PAGE}")
+    meta, rows = await get_json(pool, path + "&page=1")
+    records = _records(rows)
+    pages = await asyncio.gather(*(get_json(pool, f"{path}&page={p}") for p in range(2, int(meta["pages"]) + 1)))
+    for _, page_rows in pages:
+        records += _records(page_rows)
+    return records
+
+
+class BatchCache:
+    """One JSON file per (indicator, country batch, date range)."""
+
+    def __init__(self, root=CACHE_ROOT, max_age_days=MAX_AGE_DAYS):
+        self.root = root
+        self.max_age_s = max_age_days * 86_400
+
+    def path(self, indicator, countries, start, end):
+        key = hashlib.sha1(";".join(sorted(countries)).encode()).hexdigest()[:12]
+        return os.path.join(self.root, indicator, f"{start}-{end}_{key}.json")
+
+    def get(self, indicator, countries, start, end):
+        """Cached records, or None when the batch is missing or stale."""
+        fp = self.path(indicator, countries, start, end)
+        if not os.path.exists(fp):
+            return None
+        with open(fp) as f:
+            batch = json.load(f)
+        return batch["records"] if time.time() - batch["fetched_at"] <= self.max_age_s else None
+
+    def put(self, indicator, countries, start, end, records):
+        fp = self.path(indicator, countries, start, end)
+        os.makedirs(os.path.dirname(fp), exist_ok=True)
+        with open(fp + ".tmp", "w") as f:
+            json.dump({"indicator": indicator, "countries": sorted(countries), "date": [start, end],
+                       "fetched_at": time.time(), "records": records}, f)
+        os.replace(fp + ".tmp", fp)
+
+
+async def _fetch_missing(batches, cache, start, end, base_url, pool_size):
+    pool = ConnectionPool(base_url, pool_size)
+
+    async def one(indicator, countries):
+        records = await fetch_batch(pool, indicator, countries, start, end)
+        cache.put(indicator, countries, start, end, records)
+
+    try:
+        results = await asyncio.gather(*(one(*b) for b in batches), return_exceptions=True)
+    finally:
+        pool.close()
+    return [(b, r) for b, r in zip(batches, results) if isinstance(r, Exception)], pool.requests
+
+
+def fetch_indicators(indicators, countries, start, end, cache=None, base_url=API_URL, pool_size=POOL_SIZE,
+                     country_batch=COUNTRY_BATCH):
+    """(records, stats) for indicators x countries over years start..end.
+
+    records: DataFrame of indicator, iso3, country, year, value from every batch that is cached
+    or fetched now. stats: batches, cached, fetched, requests and failed [(batch, error)]; a
+    failed batch is simply missing and is retried on the next call.
+    """
+    cache = cache or BatchCache()
+    batches = [(indicator, tuple(countries[i:i + country_batch]))
+               for indicator in indicators for i in range(0, len(countries), country_batch)]
+    cached = {b: cache.get(*b, start, end) for b in batches}
+    missing = [b for b, records in cached.items() if records is None]
+    failed, requests = asyncio.run(_fetch_missing(missing, cache, start, end, base_url, pool_size)) if missing \
+        else ([], 0)
+    frames = []
+    for b in batches:
+        records = cached[b] if cached[b] is not None else cache.get(*b, start, end)
+        if records:
+            frames.append(pd.DataFrame(records, columns=["iso3", "country", "year", "value"]).assign(indicator=b[0]))
+    columns = ["indicator", "iso3", "country", "year", "value"]
+    df = pd.concat(frames, ignore_index=True)[columns] if frames else pd.DataFrame(columns=columns)
+    stats = {"batches": len(batches), "cached": len(batches) - len(missing), "fetched": len(missing) - len(failed),
+             "requests": requests, "failed": failed}
+    return df, stats
+
+
+def _report(stats, seconds):
+    print(f"{stats['batches']} batches: {stats['cached']} cached, {stats['fetched']} fetched "
+          f"({stats['requests']} requests), {len(stats['failed'])} failed in {seconds:.2f}s")
+    for (indicator, countries), error in stats["failed"][:5]:
+        print(f"  failed {indicator} [{countries[0]}..{countries[-1]}]: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch World Bank indicators into the batch cache")
+    parser.add_argument("indicators", nargs="*", default=["NY.GDP.MKTP.CD", "NY.GDP.PCAP.CD", "SP.URB.TOTL.IN.ZS"])
+    parser.add_argument("--countries", nargs="+", default=["USA", "DEU", "FRA", "GBR", "NLD", "BRA", "IND", "CHN", "JPN"])
+    parser.add_argument("--start", type=int, default=2008)
+    parser.add_argument("--end", type=int, default=2023)
+    parser.add_argument("--pool", type=int, default=POOL_SIZE)
+    parser.add_argument("--batch", type=int, default=COUNTRY_BATCH, help="countries per request")
+    parser.add_argument("--cache", default=CACHE_ROOT)
+    parser.add_argument("--standin", action="store_true",
+                        help="serve recorded responses locally (503s on 20%% of requests) into a temporary cache")
+    args = parser.parse_args()
+
+    base_url, cache = API_URL, BatchCache(args.cache)
+    if args.standin:
+        import tempfile
+        from wb_standin import serve
+        server, base_url = serve(fail_rate=0.2, latency=0.02)
+        cache = BatchCache(tempfile.mkdtemp())
+    for _ in range(2 if args.standin else 1):
+        t0 = time.perf_counter()
+        df, stats = fetch_indicators(args.indicators, args.countries, args.start, args.end, cache, base_url,
+                                     args.pool, args.batch)
+        _report(stats, time.perf_counter() - t0)
+    print(f"{len(df):,} observations, {df['iso3'].nunique()} countries, {df['indicator'].nunique()} indicators")
+    if args.standin:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
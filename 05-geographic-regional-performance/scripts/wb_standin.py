@@ -0,0 +1,103 @@
+"""
+Local stand-in for the World Bank v2 indicator API, serving recorded responses - no network.
+Recorded responses live in data/raw/wb_recorded/<indicator>.json in the API's own layout
+([paging metadata, observations]), one file per indicator covering every recorded country and
+year. Requests are answered like the API answers them:
+    GET /v2/country/<ISO3;ISO3;...|all>/indicator/<indicator>?format=json&date=<start>:<end>&per_page=&page=
+An unknown indicator gets the API's error message. fail_rate answers that share of requests
+with 503 (and Retry-After: 0), and latency delays every response, so retries and concurrency
+can be exercised.
+
+Run from project root:
+    python scripts/wb_standin.py --port 8765 [--fail-rate 0.2 --latency 0.05]
+    WB_API_URL=http://127.0.0.1:8765/v2 python scripts/run_analysis.py
+"""
+import os
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RECORDED = os.path.join(BASE, "data", "raw", "wb_recorded")
+INVALID = [{"message": [{"id": "120", "key": "Invalid value", "value": "The provided parameter value is not valid"}]}]
+
+
+def load_recorded(root=RECORDED):
+    """{indicator: [observation, ...]} from the recorded response files."""
+    recorded = {}
+    for name in sorted(os.listdir(root)):
+        if name.endswith(".json"):
+            with open(os.path.join(root, name)) as f:
+                recorded[name[:-len(".json")]] = json.load(f)[1]
+    return recorded
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, payload, headers=()):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in headers:
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        server.requests += 1
+        time.sleep(server.latency)
+        if random.random() < server.fail_rate:
+            return self._send(503, {"error": "Service unavailable"}, [("Retry-After", "0")])
+        url = urlsplit(self.path)
+        parts = url.path.strip("/").split("/")
+        if len(parts) != 5 or parts[1] != "country" or parts[3] != "indicator":
+            return self._send(404, {"error": "Not found"})
+        observations = server.recorded.get(parts[4])
+        if observations is None:
+            return self._send(200, INVALID)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        countries = None if parts[2].lower() == "all" else set(parts[2].upper().split(";"))
+        start, _, end = query.get("date", "0:9999").partition(":")
+        rows = [r for r in observations if (countries is None or r["countryiso3code"] in countries)
+                and int(start) <= int(r["date"]) <= int(end or start)]
+        per_page, page = int(query.get("per_page", 50)), int(query.get("page", 1))
+        pages = max(-(-len(rows) // per_page), 1)
+        meta = {"page": page, "pages": pages, "per_page": per_page, "total": len(rows)}
+        self._send(200, [meta, rows[(page - 1) * per_page:page * per_page]])
+
+
+def serve(port=0, fail_rate=0.0, latency=0.0, root=RECORDED):
+    """Start the stand-in on a background thread; returns (server, base URL). Stop with server.shutdown()."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StandInHandler)
+    server.daemon_threads = True
+    server.recorded, server.fail_rate, server.latency, server.requests = load_recorded(root), fail_rate, latency, 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v2"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded World Bank API responses locally")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    args = parser.parse_args()
+    server, url = serve(args.port, args.fail_rate, args.latency)
+    print(f"Serving {', '.join(sorted(server.recorded))} at {url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+-- Table definitions for Geographic & Regional Performance
+-- Used by scripts/run_queries.py (SQLite); portable to PostgreSQL.
+-- regional_indicators: one row per country-year, as in data/raw/wb_indicators.csv
+-- (World Bank snapshot) and data/processed/regional_indicators.csv (run_analysis.py output).
+
+CREATE TABLE regional_indicators (
+    country        VARCHAR(100),
+    date           DATE,
+    GDP            FLOAT,
+    GDP_per_capita FLOAT,
+    Urban_pop_pct  FLOAT
+);
+
+-- Indexes for common filters
+CREATE INDEX idx_regional_country_date ON regional_indicators(country, date);
+CREATE INDEX idx_regional_date ON regional_indicators(date);
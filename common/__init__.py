@@ -0,0 +1,4 @@
+"""
+Code shared by the portfolio projects.
+Project scripts put the repository root on sys.path and import from here.
+"""
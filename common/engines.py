@@ -0,0 +1,129 @@
+"""
+Pluggable model engines for the classification projects.
+    logistic        LogisticRegression on standardized features
+    random_forest   RandomForestClassifier, trees built on all cores
+    hist_gb         HistGradientBoostingClassifier: features binned once into uint8
+                    histograms, multi-threaded (OpenMP), early stopping on a validation split
+Tree engines take raw features; only engines in SCALED_ENGINES need the StandardScaler pass.
+benchmark() compares engines on wall time, peak memory and ROC-AUC, each in a fresh process.
+"""
+import sys
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, peak RSS is reported as NaN
+    resource = None
+
+# Early stopping for hist_gb: stop after N_ITER_NO_CHANGE rounds without improvement
+# of the validation loss on VALIDATION_FRACTION of the training rows
+HIST_GB_MAX_ITER = 500
+VALIDATION_FRACTION = 0.1
+N_ITER_NO_CHANGE = 20
+
+def _logistic(random_state, n_jobs, class_weight, **params):
+    return LogisticRegression(max_iter=1000, class_weight=class_weight, random_state=random_state, **params)
+
+def _random_forest(random_state, n_jobs, class_weight, **params):
+    params.setdefault("n_estimators", 100)
+    return RandomForestClassifier(class_weight=class_weight, n_jobs=n_jobs, random_state=random_state, **params)
+
+def _hist_gb(random_state, n_jobs, class_weight, **params):
+    # Thread count follows OpenMP (OMP_NUM_THREADS); n_jobs does not apply
+    params.setdefault("max_iter", HIST_GB_MAX_ITER)
+    return HistGradientBoostingClassifier(early_stopping=True, validation_fraction=VALIDATION_FRACTION,
+                                          n_iter_no_change=N_ITER_NO_CHANGE, class_weight=class_weight,
+                                          random_state=random_state, **params)
+
+ENGINES = {
+    "logistic": _logistic,
+    "random_forest": _random_forest,
+    "hist_gb": _hist_gb,
+}
+ENGINE_LABELS = {
+    "logistic": "Logistic Regression",
+    "random_forest": "Random Forest",
+    "hist_gb": "Hist Gradient Boosting",
+}
+SCALED_ENGINES = ("logistic",)
+
+def make_model(engine, random_state=42, n_jobs=-1, class_weight=None, **params):
+    """Unfitted estimator for an engine name; extra params override the engine defaults."""
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine} (choose from {', '.join(ENGINES)})")
+    return ENGINES[engine](random_state, n_jobs, class_weight, **params)
+
+def needs_scaling(engine):
+    return engine in SCALED_ENGINES
+
+def n_iterations(model):
+    """Trees / boosting rounds actually fitted (after early stopping), or None."""
+    if hasattr(model, "n_iter_"):
+        return int(np.max(model.n_iter_))
+    return getattr(model, "n_estimators", None)
+
+def feature_importance(model, feature_names, X=None, y=None, random_state=42):
+    """Impurity importance where the model has it, else permutation importance on (X, y)."""
+    if hasattr(model, "feature_importances_"):
+        values = model.feature_importances_
+    else:
+        from sklearn.inspection import permutation_importance
+        values = permutation_importance(model, X, y, scoring="roc_auc", n_repeats=5,
+                                        random_state=random_state).importances_mean
+    return pd.Series(values, index=feature_names).sort_values(ascending=False)
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far (NaN where it cannot be measured)."""
+    if resource is None:
+        return float("nan")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB on Linux
+
+def _run_engine(engine, X_train, y_train, X_test, y_test, random_state, n_jobs, class_weight):
+    """Fit + score one engine in this (fresh) process; returns one benchmark row."""
+    from sklearn.metrics import roc_auc_score
+    from sklearn.preprocessing import StandardScaler
+    baseline = peak_rss_mb()
+    t0 = time.perf_counter()
+    if needs_scaling(engine):
+        scaler = StandardScaler().fit(X_train)
+        X_train, X_test = scaler.transform(X_train), scaler.transform(X_test)
+    model = make_model(engine, random_state, n_jobs, class_weight).fit(X_train, y_train)
+    t1 = time.perf_counter()
+    proba = model.predict_proba(X_test)[:, 1]
+    t2 = time.perf_counter()
+    return {
+        "engine": engine,
+        "fit_s": t1 - t0,
+        "predict_s": t2 - t1,
+        "peak_rss_mb": peak_rss_mb(),
+        "added_rss_mb": peak_rss_mb() - baseline,
+        "roc_auc": roc_auc_score(y_test, proba),
+        "iterations": n_iterations(model),
+    }
+
+def benchmark(X_train, y_train, X_test, y_test, engines=tuple(ENGINES), random_state=42, n_jobs=-1,
+              class_weight=None):
+    """Run each engine on raw features in its own spawned process so peak RSS is per engine."""
+    X_train, X_test = np.asarray(X_train, dtype=np.float32), np.asarray(X_test, dtype=np.float32)
+    y_train, y_test = np.asarray(y_train), np.asarray(y_test)
+    rows = []
+    ctx = multiprocessing.get_context("spawn")
+    for engine in engines:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            rows.append(pool.submit(_run_engine, engine, X_train, y_train, X_test, y_test,
+                                    random_state, n_jobs, class_weight).result())
+    return rows
+
+def print_benchmark(rows):
+    print(f"{'engine':<16}{'fit s':>9}{'predict s':>11}{'peak RSS MB':>13}{'added MB':>10}{'ROC-AUC':>9}{'iters':>7}")
+    for r in rows:
+        print(f"{r['engine']:<16}{r['fit_s']:>9.2f}{r['predict_s']:>11.3f}{r['peak_rss_mb']:>13.0f}"
+              f"{r['added_rss_mb']:>10.0f}{r['roc_auc']:>9.4f}{r['iterations'] or '':>7}")
@@ -0,0 +1,102 @@
+"""
+Binary classifier evaluation from a single sort of the scores.
+score_curve() computes confusion counts, precision, recall, F1 and business cost at
+every distinct threshold in O(n log n); ROC-AUC comes from the same cumulative counts.
+Evaluator caches predict_proba per model so each model is scored once.
+"""
+import numpy as np
+import pandas as pd
+from sklearn.metrics import classification_report
+
+def score_curve(y_true, scores, cost_fp=1.0, cost_fn=1.0, sample_weight=None):
+    """Metrics for "predict 1 when score >= threshold" at every distinct score.
+
+    Rows are ordered by decreasing threshold; the first row (threshold=inf) predicts nothing.
+    cost = cost_fp * false positives + cost_fn * false negatives. sample_weight lets
+    pre-binned scores (one row per score and label, weighted by its count) stand in for raw rows.
+    """
+    y = np.asarray(y_true).astype(bool)
+    s = np.asarray(scores, dtype=np.float64)
+    w = np.ones(len(y), dtype=np.int64) if sample_weight is None else np.asarray(sample_weight)
+    order = np.argsort(-s, kind="mergesort")
+    s_sorted, y_sorted, w_sorted = s[order], y[order], w[order]
+    # Last position of each run of equal scores: everything up to it is predicted positive
+    last = np.r_[np.flatnonzero(np.diff(s_sorted)), len(s) - 1]
+    tp = np.r_[0, np.cumsum(w_sorted * y_sorted)[last]]
+    fp = np.r_[0, np.cumsum(w_sorted * ~y_sorted)[last]]
+    pos = tp[-1]
+    neg = fp[-1]
+    fn, tn = pos - tp, neg - fp
+    with np.errstate(invalid="ignore", divide="ignore"):
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 0.0)
+        recall = tp / pos if pos else np.zeros(len(tp))
+        f1 = np.where(2 * tp + fp + fn > 0, 2 * tp / (2 * tp + fp + fn), 0.0)
+    return pd.DataFrame({
+        "threshold": np.r_[np.inf, s_sorted[last]],
+        "tp": tp, "fp": fp, "fn": fn, "tn": tn,
+        "precision": precision, "recall": recall, "f1": f1,
+        "cost": cost_fp * fp + cost_fn * fn,
+    })
+
+def curve_auc(curve):
+    """ROC-AUC from a score_curve (trapezoids over the ROC points; ties handled like sklearn)."""
+    pos = curve["tp"].iloc[-1]
+    neg = curve["fp"].iloc[-1]
+    if pos == 0 or neg == 0:
+        return float("nan")
+    tpr = curve["tp"].to_numpy() / pos
+    fpr = curve["fp"].to_numpy() / neg
+    return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+
+class ScoreEvaluation:
+    """Curve, AUC and threshold selection for one model's scores on a fixed test set."""
+
+    def __init__(self, y_true, proba, cost_fp=1.0, cost_fn=1.0, sample_weight=None):
+        self.y_true = np.asarray(y_true)
+        self.proba = np.asarray(proba)
+        self.sample_weight = sample_weight
+        self.curve = score_curve(self.y_true, self.proba, cost_fp, cost_fn, sample_weight)
+        self.auc = curve_auc(self.curve)
+        self._reports = {}
+
+    def best_threshold(self, objective="f1", bounds=(0.0, 1.0)):
+        """(threshold, value) maximizing F1 or minimizing cost among thresholds within bounds."""
+        lo, hi = bounds
+        c = self.curve[(self.curve["threshold"] >= lo) & (self.curve["threshold"] <= hi)]
+        if c.empty:
+            return 0.5, float("nan")
+        i = c["cost"].idxmin() if objective == "cost" else c[objective].idxmax()
+        return float(c.at[i, "threshold"]), float(c.at[i, objective])
+
+    def predict(self, threshold=None):
+        """Labels at threshold; None reproduces model.predict (proba > 0.5)."""
+        if threshold is None:
+            return (self.proba > 0.5).astype(int)
+        return (self.proba >= threshold).astype(int)
+
+    def report(self, threshold=None):
+        """classification_report at threshold, computed once per threshold."""
+        if threshold not in self._reports:
+            self._reports[threshold] = classification_report(self.y_true, self.predict(threshold),
+                                                             sample_weight=self.sample_weight)
+        return self._reports[threshold]
+
+class Evaluator:
+    """Scores each model on the test set once and caches its ScoreEvaluation by name."""
+
+    def __init__(self, X_test, y_test, cost_fp=1.0, cost_fn=1.0):
+        self.X_test = X_test
+        self.y_test = y_test
+        self.cost_fp = cost_fp
+        self.cost_fn = cost_fn
+        self.results = {}
+
+    def evaluate(self, name, model=None, X_test=None):
+        """ScoreEvaluation for model, calling predict_proba only the first time name is seen.
+
+        X_test overrides the shared test matrix (e.g. unscaled features for tree models).
+        """
+        if name not in self.results:
+            proba = model.predict_proba(self.X_test if X_test is None else X_test)[:, 1]
+            self.results[name] = ScoreEvaluation(self.y_test, proba, self.cost_fp, self.cost_fn)
+        return self.results[name]
@@ -0,0 +1,160 @@
+"""
+Chart rendering as declared jobs, shared by the project run_analysis.py scripts.
+A Chart names its output PNG, a plot function and the data the function draws. Its key hashes
+the data (arrays and frames by content), the source of the plot function's whole module (its
+helpers and constants) and of this module (scatter() and friends), and the renderer settings.
+The key is stored in the PNG's own metadata, so render() skips every chart whose PNG already
+carries the current key - unchanged inputs are never redrawn - and draws the rest on a process
+pool. Plot functions take the data as keyword arguments and return a matplotlib Figure; they
+must be module-level functions so worker processes can import them.
+
+scatter() draws point clouds of FAST_SCATTER_POINTS or more as a binned density image (mean
+colour value per bin when colours are given) instead of one marker per point: the cost is one
+2-D histogram however many points there are, and the image is a single raster.
+"""
+import os
+import time
+import inspect
+import hashlib
+from typing import Callable, NamedTuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import seaborn as sns
+from matplotlib.colors import LogNorm
+
+RENDER_JOBS = int(os.environ.get("RENDER_JOBS", 0)) or os.cpu_count()
+FAST_SCATTER_POINTS = 1_000_000
+DENSITY_BINS = 300
+KEY_FIELD = "ChartKey"  # PNG text chunk holding the chart key
+
+
+class Chart(NamedTuple):
+    path: str
+    plot: Callable
+    data: dict
+    dpi: int = 100
+
+
+def _digest(obj, h):
+    """Feed a stable byte representation of obj into hash h."""
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(repr((type(obj).__name__, obj.shape, list(map(str, obj.dtypes if obj.ndim == 2 else [obj.dtype])),
+                       obj.columns.tolist() if obj.ndim == 2 else obj.name)).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+        if obj.ndim == 2:
+            h.update(pd.util.hash_pandas_object(obj.columns.to_series(), index=False).to_numpy().tobytes())
+    elif isinstance(obj, pd.Index):
+        h.update(pd.util.hash_pandas_object(obj.to_series(), index=False).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(repr((obj.dtype.str, obj.shape)).encode())
+        h.update(np.ascontiguousarray(obj).tobytes() if obj.dtype != object else repr(obj.tolist()).encode())
+    elif isinstance(obj, dict):
+        for key in sorted(obj, key=str):
+            h.update(repr(key).encode())
+            _digest(obj[key], h)
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"{type(obj).__name__}{len(obj)}".encode())
+        for item in obj:
+            _digest(item, h)
+    else:
+        h.update(repr(obj).encode())
+
+
+def _source(obj):
+    """Source text of a module or function; the function's own source when its module has none."""
+    try:
+        return inspect.getsource(inspect.getmodule(obj) or obj)
+    except (OSError, TypeError):
+        return inspect.getsource(obj)
+
+
+def chart_key(chart):
+    """Hash of everything the PNG depends on: data, plot code, dpi and library versions.
+
+    Plot code is the plot function's module and common/render.py, so editing a helper or a
+    constant such as a label limit redraws the charts that may use it.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{chart.plot.__module__}.{chart.plot.__qualname__}:{chart.dpi}:{matplotlib.__version__}".encode())
+    h.update(_source(chart.plot).encode())
+    h.update(_source(_render).encode())
+    _digest(chart.data, h)
+    return h.hexdigest()
+
+
+def stored_key(path):
+    """Key a PNG was rendered with, or None (missing file, no key, unreadable)."""
+    from PIL import Image
+    try:
+        with Image.open(path) as image:
+            return image.text.get(KEY_FIELD)
+    except (OSError, SyntaxError, ValueError):
+        return None
+
+
+def _render(chart, key):
+    fig = chart.plot(**chart.data)
+    tmp = chart.path + ".tmp"
+    fig.savefig(tmp, dpi=chart.dpi, format="png", metadata={KEY_FIELD: key})
+    plt.close(fig)
+    os.replace(tmp, chart.path)  # a PNG carrying a key is always complete
+    return chart.path
+
+
+def render(charts, n_jobs=None, force=False, verbose=True):
+    """Draw the charts whose PNG is missing or was rendered from other inputs; returns their paths."""
+    t0 = time.perf_counter()
+    keys = [chart_key(c) for c in charts]
+    todo = [(c, k) for c, k in zip(charts, keys) if force or stored_key(c.path) != k]
+    n_jobs = min(n_jobs or RENDER_JOBS, len(todo))
+    if n_jobs <= 1:
+        done = [_render(c, k) for c, k in todo]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            done = list(pool.map(_render, *zip(*todo)))
+    if verbose:
+        print(f"Charts: {len(done)} rendered, {len(charts) - len(done)} unchanged "
+              f"({time.perf_counter() - t0:.1f}s, {max(n_jobs, 1)} worker(s))")
+    return done
+
+
+def scatter(ax, x, y, c=None, cmap="viridis", fast_above=FAST_SCATTER_POINTS, bins=DENSITY_BINS, **kwargs):
+    """ax.scatter, or from fast_above points on, a density image (log counts, or mean c per bin)."""
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    if fast_above is None or len(x) < fast_above:
+        return ax.scatter(x, y, c=c, cmap=cmap, **kwargs)
+    ok = np.isfinite(x) & np.isfinite(y)
+    counts, xe, ye = np.histogram2d(x[ok], y[ok], bins=bins)
+    if c is None:
+        image, norm = np.where(counts > 0, counts, np.nan), LogNorm()
+    else:
+        sums = np.histogram2d(x[ok], y[ok], bins=[xe, ye], weights=np.asarray(c, dtype=np.float64)[ok])[0]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            image, norm = sums / counts, None
+    return ax.imshow(image.T, origin="lower", extent=(xe[0], xe[-1], ye[0], ye[-1]), aspect="auto", cmap=cmap,
+                     norm=norm, interpolation="nearest", alpha=kwargs.get("alpha"))
+
+
+def plot_feature_importance(imp, title):
+    fig, ax = plt.subplots(figsize=(8, 5))
+    imp.plot(kind="barh", ax=ax)
+    ax.set_title(title)
+    fig.tight_layout()
+    return fig
+
+
+def plot_confusion_matrix(cm, title, figsize=None):
+    fig = plt.figure(figsize=figsize)
+    ax = fig.add_subplot()
+    sns.heatmap(cm, annot=True, fmt="d", cmap="Blues", ax=ax)
+    ax.set_xlabel("Predicted")
+    ax.set_ylabel("Actual")
+    ax.set_title(title)
+    fig.tight_layout()
+    return fig
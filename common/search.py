@@ -0,0 +1,172 @@
+"""
+Hyperparameter search with successive halving / Hyperband over a process pool.
+The training rows are shuffled once and written to .npy files that every worker opens
+with mmap_mode="r": rung budgets are row prefixes, i.e. views of the shared file, so no
+worker receives a pickled copy of the matrix. Each finished trial is appended to
+trials.jsonl; rerunning the same search skips trials already recorded there.
+"""
+import os
+import json
+import math
+import time
+import hashlib
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from common.engines import make_model
+
+# Parameter grids per engine (engine defaults apply to anything not listed)
+SEARCH_SPACES = {
+    "logistic": {"C": [0.01, 0.1, 1.0, 10.0]},
+    "random_forest": {
+        "max_depth": [None, 8, 16],
+        "min_samples_leaf": [1, 5, 20],
+        "max_features": ["sqrt", 0.5],
+    },
+    "hist_gb": {
+        "learning_rate": [0.05, 0.1, 0.2],
+        "max_leaf_nodes": [15, 31, 63],
+        "l2_regularization": [0.0, 1.0],
+    },
+}
+ETA = 3  # keep the best 1/ETA of each rung, give survivors ETA times the rows
+MIN_ROWS = 2_000
+VALIDATION_FRACTION = 0.2
+
+_DATA = {}
+
+def _init_worker(data_dir):
+    from threadpoolctl import threadpool_limits
+    threadpool_limits(1)  # parallelism comes from the pool; keep OpenMP/BLAS from oversubscribing
+    for name in ("X_train", "y_train", "X_val", "y_val"):
+        _DATA[name] = np.load(os.path.join(data_dir, f"{name}.npy"), mmap_mode="r")
+
+def _run_trial(engine, params, rows, fixed):
+    """Fit on the first `rows` shuffled training rows (a memmap view), score on validation."""
+    from sklearn.metrics import roc_auc_score
+    t0 = time.perf_counter()
+    model = make_model(engine, n_jobs=1, **fixed, **params)
+    model.fit(_DATA["X_train"][:rows], _DATA["y_train"][:rows])
+    auc = roc_auc_score(_DATA["y_val"], model.predict_proba(_DATA["X_val"])[:, 1])
+    return {"auc": float(auc), "fit_s": time.perf_counter() - t0}
+
+def grid(space):
+    """All parameter combinations of a {name: [values]} grid, in a stable order."""
+    names = sorted(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+def _trial_key(engine, params, rows, fixed):
+    return hashlib.sha1(json.dumps([engine, params, rows, fixed], sort_keys=True, default=str).encode()).hexdigest()
+
+def _fingerprint(*arrays):
+    h = hashlib.sha1()
+    for a in arrays:
+        a = np.ascontiguousarray(a)
+        h.update(str((a.shape, a.dtype.str)).encode())
+        h.update(a.data)
+    return h.hexdigest()
+
+def _write_shared(search_dir, X, y, val_fraction, random_state):
+    """Shuffled train/validation split as .npy files; reused while the data is unchanged."""
+    from sklearn.model_selection import train_test_split
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y)
+    fingerprint = _fingerprint(X, y)
+    meta_fp = os.path.join(search_dir, "meta.json")
+    if os.path.exists(meta_fp):
+        with open(meta_fp) as f:
+            meta = json.load(f)
+        if meta["fingerprint"] == fingerprint and meta["val_fraction"] == val_fraction:
+            return meta
+    for name in os.listdir(search_dir):  # different data: previous trials no longer apply
+        os.remove(os.path.join(search_dir, name))
+    X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=val_fraction, stratify=y,
+                                                      random_state=random_state, shuffle=True)
+    for name, arr in (("X_train", X_train), ("y_train", y_train), ("X_val", X_val), ("y_val", y_val)):
+        np.save(os.path.join(search_dir, f"{name}.npy"), arr)
+    meta = {"fingerprint": fingerprint, "val_fraction": val_fraction, "train_rows": len(y_train)}
+    with open(meta_fp, "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+def _load_trials(fp):
+    """Finished trials by key; a torn last line from an interrupted run is cut off."""
+    done = {}
+    if not os.path.exists(fp):
+        return done
+    with open(fp, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+    for line in data[:end].splitlines():
+        trial = json.loads(line)
+        done[trial["key"]] = trial
+    return done
+
+def _brackets(configs, max_rows, min_rows, eta, method, rng):
+    """(configs, s) per bracket; a bracket starts at max_rows / eta**s rows and halves s times."""
+    s_max = max(0, int(math.floor(math.log(max_rows / min_rows, eta) + 1e-9)))
+    if method == "halving":
+        return [(configs, s_max)]
+    if method != "hyperband":
+        raise ValueError(f"Unknown search method: {method}")
+    out = []
+    for s in range(s_max, -1, -1):
+        n = min(len(configs), int(math.ceil((s_max + 1) / (s + 1) * eta ** s)))
+        out.append(([configs[i] for i in sorted(rng.choice(len(configs), n, replace=False))], s))
+    return out
+
+def search(engine, X, y, search_dir, space=None, fixed=None, method="halving", eta=ETA, min_rows=MIN_ROWS,
+           n_jobs=None, val_fraction=VALIDATION_FRACTION, random_state=42, verbose=True):
+    """Tune engine hyperparameters by validation ROC-AUC.
+
+    fixed holds parameters every trial shares (e.g. class_weight). Returns (best params, trials
+    DataFrame). Interrupted searches resume from search_dir/trials.jsonl.
+    """
+    os.makedirs(search_dir, exist_ok=True)
+    fixed = dict(fixed or {}, random_state=random_state)
+    configs = grid(space if space is not None else SEARCH_SPACES[engine])
+    meta = _write_shared(search_dir, X, y, val_fraction, random_state)
+    max_rows = meta["train_rows"]
+    trials_fp = os.path.join(search_dir, "trials.jsonl")
+    done = _load_trials(trials_fp)
+    rng = np.random.default_rng(random_state)
+    n_jobs = n_jobs or os.cpu_count()
+
+    evaluated = []
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(search_dir,)) as pool, \
+            open(trials_fp, "a") as log:
+        for b, (bracket, s) in enumerate(_brackets(configs, max_rows, min(min_rows, max_rows), eta, method, rng)):
+            rung = 0
+            while True:
+                rows = int(max_rows / eta ** (s - rung))
+                keys = [_trial_key(engine, p, rows, fixed) for p in bracket]
+                futures = {pool.submit(_run_trial, engine, p, rows, fixed): (k, p)
+                           for k, p in zip(keys, bracket) if k not in done}
+                for fut in as_completed(futures):
+                    key, params = futures[fut]
+                    trial = dict(fut.result(), key=key, params=params, rows=rows, bracket=b, rung=rung)
+                    done[key] = trial
+                    log.write(json.dumps(trial) + "\n")
+                    log.flush()
+                evaluated += keys
+                scores = [done[k]["auc"] for k in keys]
+                if verbose:
+                    print(f"  bracket {b} rung {rung}: {len(bracket)} configs x {rows:,} rows, "
+                          f"best AUC {max(scores):.4f} ({len(futures)} run, {len(keys) - len(futures)} resumed)")
+                if rung >= s:
+                    break
+                order = np.argsort(-np.asarray(scores), kind="stable")
+                bracket = [bracket[i] for i in order[:max(1, len(bracket) // eta)]]
+                rung = s if len(bracket) == 1 else rung + 1  # a lone survivor goes straight to full data
+
+    trials = [done[k] for k in dict.fromkeys(evaluated)]
+    # Best = highest validation AUC among configs trained on all rows
+    best = max((t for t in trials if t["rows"] == max_rows), key=lambda t: t["auc"])
+    table = pd.DataFrame([dict(t["params"], auc=t["auc"], rows=t["rows"], fit_s=t["fit_s"],
+                               bracket=t["bracket"], rung=t["rung"]) for t in trials])
+    return best["params"], table
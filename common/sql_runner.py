@@ -0,0 +1,170 @@
+"""
+Embedded SQL runner for the projects' sql/ folders (SQLite, Python standard library).
+Raw CSVs are loaded once into indexed tables defined by sql/database_schema.sql and
+reloaded only when the CSV changes; a table with DDL gets only the columns it declares, so
+wide extracts can be queried through a narrow schema. Every active statement in sql/queries.sql is a
+named query (named after the "-- N. Title" comment above it); results are cached in the
+database keyed by the query text and the version of each table it reads.
+"""
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+LOAD_BLOCK_BYTES = 8 << 20  # CSV is parsed and inserted one Arrow block at a time
+
+_BLOCK_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_TITLE = re.compile(r"^--\s*(\d+\.\s*.+?)\s*$")
+
+def _strip_block_comments(text):
+    return _BLOCK_COMMENT.sub("", text)
+
+def parse_queries(path):
+    """{name: sql} for the active (not commented-out) statements of a queries.sql file."""
+    queries = {}
+    title = None
+    statement = []
+    for line in _strip_block_comments(open(path).read()).splitlines():
+        m = _TITLE.match(line.strip())
+        if m:
+            title = m.group(1)
+            continue
+        if line.strip().startswith("--") or not (line.strip() or statement):
+            continue
+        statement.append(line)
+        if line.rstrip().endswith(";"):
+            sql = "\n".join(statement).strip()
+            name = title or f"query {len(queries) + 1}"
+            queries[name if name not in queries else f"{name} ({len(queries) + 1})"] = sql
+            statement = []
+    return queries
+
+def parse_schema(path):
+    """{table: [CREATE TABLE ..., CREATE INDEX ...]} from a database_schema.sql file."""
+    ddl = {}
+    text = "\n".join(l for l in _strip_block_comments(open(path).read()).splitlines() if not l.strip().startswith("--"))
+    for stmt in (s.strip() for s in text.split(";")):
+        m = re.match(r"CREATE\s+(?:TABLE\s+(\w+)|(?:UNIQUE\s+)?INDEX\s+\w+\s+ON\s+(\w+))", stmt, re.I)
+        if m:
+            ddl.setdefault(m.group(1) or m.group(2), []).append(stmt)
+    return ddl
+
+def ddl_columns(create_table):
+    """Column names declared by a CREATE TABLE statement (one definition per comma)."""
+    body = create_table[create_table.index("(") + 1:create_table.rindex(")")]
+    return [re.match(r'\s*"?(\w+)', part).group(1) for part in re.split(r",(?![^()]*\))", body) if part.strip()]
+
+def _create_from_schema(table, schema):
+    """CREATE TABLE for a CSV without DDL, column types from the Arrow schema."""
+    def sql_type(t):
+        if pa.types.is_integer(t) or pa.types.is_boolean(t):
+            return "INTEGER"
+        return "REAL" if pa.types.is_floating(t) else "TEXT"
+    columns = ", ".join(f'"{f.name}" {sql_type(f.type)}' for f in schema)
+    return f"CREATE TABLE {table} ({columns})"
+
+def _values(column):
+    """Python values of an Arrow column; dates/timestamps as ISO text, as SQLite stores them."""
+    if pa.types.is_temporal(column.type):
+        column = column.cast(pa.string())
+    return column.to_pylist()
+
+def source_version(fp):
+    """Changes whenever the source file is replaced or modified."""
+    st = os.stat(fp)
+    return hashlib.sha1(f"{os.path.abspath(fp)}:{st.st_size}:{st.st_mtime_ns}".encode()).hexdigest()[:16]
+
+class QueryRunner:
+    """SQLite database of a project's tables plus its named queries."""
+
+    def __init__(self, db_path, tables, queries_path, schema_path=None):
+        self.db_path = db_path
+        self.tables = tables  # {table: csv path}
+        self.queries = parse_queries(queries_path)
+        self.ddl = parse_schema(schema_path) if schema_path and os.path.exists(schema_path) else {}
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS _table_versions (name TEXT PRIMARY KEY, version TEXT, loaded_rows INTEGER);
+            CREATE TABLE IF NOT EXISTS _query_cache (key TEXT PRIMARY KEY, name TEXT, columns TEXT, rows TEXT);
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    def table_version(self, table):
+        row = self.conn.execute("SELECT version FROM _table_versions WHERE name = ?", (table,)).fetchone()
+        return row[0] if row else None
+
+    def load(self, force=False):
+        """(Re)load every table whose CSV changed since it was loaded; returns {table: rows loaded}."""
+        loaded = {}
+        for table, fp in self.tables.items():
+            version = source_version(fp)
+            if not force and self.table_version(table) == version:
+                continue
+            loaded[table] = self._load_table(table, fp)
+            with self.conn:
+                self.conn.execute("INSERT OR REPLACE INTO _table_versions VALUES (?, ?, ?)", (table, version, loaded[table]))
+        return loaded
+
+    def _load_table(self, table, fp):
+        convert = pacsv.ConvertOptions()
+        if table in self.ddl:  # declared columns only; ones missing from the CSV load as NULL
+            convert = pacsv.ConvertOptions(include_columns=ddl_columns(self.ddl[table][0]),
+                                           include_missing_columns=True)
+        reader = pacsv.open_csv(fp, read_options=pacsv.ReadOptions(block_size=LOAD_BLOCK_BYTES),
+                                convert_options=convert)
+        header = [f'"{name}"' for name in reader.schema.names]
+        insert = f"INSERT INTO {table} ({', '.join(header)}) VALUES ({', '.join('?' * len(header))})"
+        indexes = self.ddl.get(table, [])[1:]
+        rows = 0
+        with self.conn:
+            self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self.conn.execute(self.ddl[table][0] if table in self.ddl else _create_from_schema(table, reader.schema))
+            for batch in reader:
+                # Typed Arrow values bind directly; no per-value text conversion in SQLite
+                self.conn.executemany(insert, zip(*(_values(col) for col in batch.columns)))
+                rows += batch.num_rows
+            for stmt in indexes:  # after the bulk insert: one sort per index instead of per-row updates
+                self.conn.execute(stmt)
+            self.conn.execute(f"ANALYZE {table}")
+        return rows
+
+    def _cache_key(self, sql):
+        versions = {t: self.table_version(t) for t in self.tables if re.search(rf"\b{t}\b", sql)}
+        return hashlib.sha1(json.dumps([sql, versions], sort_keys=True).encode()).hexdigest()
+
+    def run(self, name):
+        """(DataFrame, seconds, cache hit) for a named query."""
+        t0 = time.perf_counter()
+        sql = self.queries[name]
+        key = self._cache_key(sql)
+        row = self.conn.execute("SELECT columns, rows FROM _query_cache WHERE key = ?", (key,)).fetchone()
+        if row:
+            return pd.DataFrame(json.loads(row[1]), columns=json.loads(row[0])), time.perf_counter() - t0, True
+        cur = self.conn.execute(sql)
+        columns = [d[0] for d in cur.description]
+        rows = cur.fetchall()
+        with self.conn:
+            self.conn.execute("DELETE FROM _query_cache WHERE name = ?", (name,))
+            self.conn.execute("INSERT INTO _query_cache VALUES (?, ?, ?, ?)",
+                              (key, name, json.dumps(columns), json.dumps(rows)))
+        return pd.DataFrame(rows, columns=columns), time.perf_counter() - t0, False
+
+    def run_all(self, names=None, verbose=True):
+        """Run the named queries (default: all) and return {name: DataFrame}."""
+        results = {}
+        for name in names or self.queries:
+            df, seconds, hit = self.run(name)
+            results[name] = df
+            if verbose:
+                print(f"\n-- {name}  [{seconds * 1000:.1f} ms{', cached' if hit else ''}]")
+                print(df.to_string(index=False))
+        return results